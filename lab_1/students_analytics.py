@@ -0,0 +1,114 @@
+from typing import Iterable, Dict, Tuple, Union
+from datetime import date
+import time
+
+import numpy as np
+
+from students_reader_task import Student, SESSION_FIELDS_COUNT, SESSION_PRESENCE, SESSION_NUMBER, \
+    SESSION_MARK, SESSION_DATE, _ordinal_to_date
+
+
+def _group_mean(keys: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Среднее values по одинаковым keys: (уникальные ключи, средние)
+    """
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    sums = np.bincount(inverse, weights=values, minlength=unique_keys.size)
+    counts = np.bincount(inverse, minlength=unique_keys.size)
+    return unique_keys, sums / counts
+
+
+class RosterArrays:
+    """
+    Список студентов, один раз переложенный в массивы NumPy.
+    Колонки студентов: unique_ids, groups, subgroups.
+    Колонки занятий: student_index (индекс студента в колонках студентов), presence, numbers, marks, dates (ordinal).
+    Время перекладки хранится в conversion_time, чтобы его можно было сравнить с выигрышем от агрегатов.
+    """
+
+    def __init__(self, students: Iterable[Student]):
+        t = time.perf_counter()
+        unique_ids, groups, subgroups, counts, records = [], [], [], [], []
+        for student in students:
+            unique_ids.append(student.unique_id)
+            groups.append(student.group)
+            subgroups.append(student.subgroup)
+            with student.session_records as student_records:
+                counts.append(len(student_records) // SESSION_FIELDS_COUNT)
+                records.append(student_records.tobytes())
+
+        self.unique_ids = np.array(unique_ids, dtype=np.int64)
+        self.groups = np.array(groups, dtype=np.int64)
+        self.subgroups = np.array(subgroups, dtype=np.int64)
+        self.student_index = np.repeat(np.arange(self.unique_ids.size), np.array(counts, dtype=np.int64))
+        sessions = np.frombuffer(b''.join(records), dtype=np.int32).reshape(-1, SESSION_FIELDS_COUNT)
+        self.presence = sessions[:, SESSION_PRESENCE].astype(bool)
+        self.numbers = sessions[:, SESSION_NUMBER]
+        self.marks = sessions[:, SESSION_MARK]
+        self.dates = sessions[:, SESSION_DATE]
+        self.conversion_time = time.perf_counter() - t
+
+    @property
+    def students_count(self) -> int:
+        return self.unique_ids.size
+
+    @property
+    def sessions_count(self) -> int:
+        return self.student_index.size
+
+    def _graded(self) -> np.ndarray:
+        """
+        Маска занятий, на которых студент был и получил оценку
+        """
+        return self.presence & (self.marks >= 0)
+
+    def attendance_by_group(self, by_subgroup: bool = False) -> Dict[Union[int, Tuple[int, int]], float]:
+        """
+        Доля посещённых занятий по группам или по парам (группа, подгруппа)
+        """
+        groups = self.groups[self.student_index]
+        if by_subgroup:
+            base = self.subgroups.max(initial=0) + 1
+            keys, rates = _group_mean(groups * base + self.subgroups[self.student_index], self.presence)
+            return {(int(key // base), int(key % base)): float(rate) for key, rate in zip(keys, rates)}
+        keys, rates = _group_mean(groups, self.presence)
+        return {int(key): float(rate) for key, rate in zip(keys, rates)}
+
+    def mean_mark_by_lab(self) -> Dict[int, float]:
+        """
+        Средняя оценка по номеру л.р.
+        """
+        graded = self._graded()
+        keys, means = _group_mean(self.numbers[graded], self.marks[graded])
+        return {int(key): float(mean) for key, mean in zip(keys, means)}
+
+    def mean_mark_by_date(self) -> Dict[date, float]:
+        """
+        Средняя оценка по дате занятия
+        """
+        graded = self._graded()
+        keys, means = _group_mean(self.dates[graded], self.marks[graded])
+        return {_ordinal_to_date(int(key)): float(mean) for key, mean in zip(keys, means)}
+
+    def mean_mark_by_student(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Средняя оценка студентов: (unique_ids, средние), студенты без оценок получают nan
+        """
+        graded = self._graded()
+        index = self.student_index[graded]
+        sums = np.bincount(index, weights=self.marks[graded], minlength=self.students_count)
+        counts = np.bincount(index, minlength=self.students_count)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.unique_ids, sums / counts
+
+    def failing(self, pass_mark: float = 3.0, max_absences: Union[int, None] = None) -> np.ndarray:
+        """
+        unique_id студентов со средней оценкой ниже pass_mark (или без оценок),
+        а также, если задано max_absences, с числом пропусков больше max_absences
+        """
+        unique_ids, means = self.mean_mark_by_student()
+        failed = ~(means >= pass_mark)
+        if max_absences is not None:
+            absences = np.bincount(self.student_index[~self.presence], minlength=self.students_count)
+            failed |= absences > max_absences
+        return unique_ids[failed]
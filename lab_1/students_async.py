@@ -0,0 +1,82 @@
+"""
+Асинхронные обёртки над чтением и записью списков студентов.
+Чтение файла и разбор выполняются в executor, поэтому цикл событий не блокируется.
+С ProcessPoolExecutor разбор идёт в отдельном процессе и не конкурирует с циклом за GIL,
+а студенты возвращаются в компактном виде (см. student_to_compact).
+"""
+from typing import Union, List, Iterable, Callable
+from concurrent.futures import Executor, ProcessPoolExecutor
+import asyncio
+
+from students_reader_task import Student, load_students_json, load_students_csv, \
+    write_students_json, write_students_csv, student_from_compact, _load_students_compact
+
+DEFAULT_CONCURRENCY_LIMIT = 4
+REBUILD_BATCH_SIZE = 1024
+
+
+async def _run(executor: Union[Executor, None], func: Callable, *args):
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+
+async def _load_async(file_path: str, loader: Callable, executor: Union[Executor, None]) -> Union[List[Student], None]:
+    if isinstance(executor, ProcessPoolExecutor):
+        compact = await _run(executor, _load_students_compact, file_path, loader)
+        if compact is None:
+            return None
+        students = []
+        # студенты собираются в цикле событий, поэтому пачками с передачей управления между ними
+        for first in range(0, len(compact), REBUILD_BATCH_SIZE):
+            students.extend(student_from_compact(student) for student in compact[first: first + REBUILD_BATCH_SIZE])
+            await asyncio.sleep(0)
+        return students
+    return await _run(executor, loader, file_path)
+
+
+async def load_students_json_async(file_path: str, executor: Union[Executor, None] = None) -> Union[List[Student], None]:
+    """
+    Асинхронный load_students_json.
+    param: executor: пул для чтения и разбора, None - пул потоков цикла событий по умолчанию
+    """
+    return await _load_async(file_path, load_students_json, executor)
+
+
+async def load_students_csv_async(file_path: str, executor: Union[Executor, None] = None) -> Union[List[Student], None]:
+    """
+    Асинхронный load_students_csv.
+    param: executor: пул для чтения и разбора, None - пул потоков цикла событий по умолчанию
+    """
+    return await _load_async(file_path, load_students_csv, executor)
+
+
+async def save_students_json_async(file_path: str, students: Iterable[Student],
+                                   executor: Union[Executor, None] = None) -> None:
+    """
+    Асинхронный write_students_json. Студенты передаются в пул как есть, поэтому нужен пул потоков.
+    """
+    await _run(executor, write_students_json, file_path, students)
+
+
+async def save_students_csv_async(file_path: str, students: Iterable[Student],
+                                  executor: Union[Executor, None] = None) -> None:
+    """
+    Асинхронный write_students_csv. Студенты передаются в пул как есть, поэтому нужен пул потоков.
+    """
+    await _run(executor, write_students_csv, file_path, students)
+
+
+async def load_students_many_async(file_paths: Iterable[str], limit: int = DEFAULT_CONCURRENCY_LIMIT,
+                                   executor: Union[Executor, None] = None) -> List[Union[List[Student], None]]:
+    """
+    Одновременное чтение нескольких json/csv файлов, не больше limit файлов за раз.
+    Возвращает списки студентов в порядке file_paths (None для отсутствующих файлов).
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def load(file_path: str):
+        async with semaphore:
+            if file_path.lower().endswith('.csv'):
+                return await load_students_csv_async(file_path, executor)
+            return await load_students_json_async(file_path, executor)
+
+    return list(await asyncio.gather(*(load(file_path) for file_path in file_paths)))
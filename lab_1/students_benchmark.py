@@ -0,0 +1,428 @@
+"""
+Замеры скорости и памяти для чтения/записи списков студентов.
+Запуск из каталога lab_1:
+    python students_benchmark.py
+"""
+from typing import Callable, Dict, List
+from datetime import datetime, date
+import multiprocessing
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import resource
+import tempfile
+import time
+import json
+import os
+
+from students_reader_task import Student, _load_student, load_students_json, iter_students_json, \
+    parse_session_date, session_date_cache_info, SESSION_DATE_FORMAT, STUDENT_KEYS, LAB_WORK_SESSION_KEYS, \
+    write_students_json, write_students_csv, load_students_many, LabWorkSession, \
+    save_students_binary, load_students_binary
+from students_repository import StudentRepository
+from students_analytics import RosterArrays
+from students_incremental import IncrementalStudentsLoader
+from students_async import load_students_json_async
+
+BENCHMARK_STUDENTS_COUNT = 100000
+BENCHMARK_SESSIONS_COUNT = 4
+
+
+def write_synthetic_roster_json(file_path: str, n_students: int = BENCHMARK_STUDENTS_COUNT,
+                                n_sessions: int = BENCHMARK_SESSIONS_COUNT) -> None:
+    """
+    Записывает синтетический список студентов в формате students.json
+    """
+    with open(file_path, 'wt', encoding='utf-8') as output_file:
+        output_file.write('{\n"students":[\n')
+        for unique_id in range(n_students):
+            record = {
+                "unique_id": unique_id,
+                "name": f"Имя{unique_id}",
+                "surname": f"Фамилия{unique_id}",
+                "group": 6400 + unique_id % 10,
+                "subgroup": 1 + unique_id % 2,
+                "lab_works_sessions": [{"presence": 1,
+                                        "lab_work_n": lab + 1,
+                                        "lab_work_mark": 2 + (unique_id + lab) % 4,
+                                        "date": f"15:{9 + lab % 4}:23"} for lab in range(n_sessions)]
+            }
+            output_file.write(json.dumps(record, ensure_ascii=False))
+            output_file.write(',\n' if unique_id != n_students - 1 else '\n')
+        output_file.write(']}')
+
+
+def _load_students_json_in_memory(file_path: str) -> List[Student]:
+    """
+    Прежний способ чтения: json.load всего файла и сбор всех студентов в словарь
+    """
+    students_raw: Dict[int, Student] = {}
+    with open(file_path, 'rt', encoding='utf-8') as input_file:
+        json_data = json.load(input_file)
+        for student_data in json_data.get("students", []):
+            unique_id = student_data.get("unique_id")
+            if unique_id is not None:
+                students_raw[unique_id] = _load_student(student_data)
+    return list(students_raw.values())
+
+
+def _peak_rss() -> int:
+    """
+    Пиковый RSS текущего процесса в КБ. ru_maxrss наследуется через fork/exec от родителя
+    и завышает пик дочернего процесса, если родитель большой, поэтому по возможности берётся VmHWM
+    """
+    try:
+        with open('/proc/self/status', 'rt') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _measure_in_child(loader: Callable, file_path: str, queue) -> None:
+    t = time.perf_counter()
+    result = loader(file_path)
+    t = time.perf_counter() - t
+    queue.put((len(result), t, _peak_rss()))
+
+
+def measure_peak_rss(loader: Callable, file_path: str):
+    """
+    Запускает loader в отдельном процессе и возвращает (число студентов, время, пиковый RSS в КБ)
+    """
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_measure_in_child, args=(loader, file_path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def json_loaders_benchmark(n_students: int = BENCHMARK_STUDENTS_COUNT) -> None:
+    print(f"json loaders benchmark, students: {n_students}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, 'students.json')
+        write_synthetic_roster_json(file_path, n_students)
+        print(f"file size: {os.path.getsize(file_path) / 2 ** 20:.1f} MB")
+        for name, loader in (("json.load", _load_students_json_in_memory),
+                             ("streaming", load_students_json)):
+            count, elapsed, max_rss = measure_peak_rss(loader, file_path)
+            print(f"{name:>12}: {count} students, {elapsed:.3f} s, peak rss {max_rss / 1024:.1f} MB")
+
+
+def date_parser_benchmark(n_rows: int = 1000000, n_dates: int = 40) -> None:
+    print(f"date parser benchmark, rows: {n_rows}, distinct dates: {n_dates}")
+    distinct = [f"{1 + i % 28}:{1 + i % 12}:2{i % 10}" for i in range(n_dates)]
+    rows = [distinct[i % n_dates] for i in range(n_rows)]
+
+    t = time.perf_counter()
+    expected = [datetime.strptime(row, SESSION_DATE_FORMAT).date() for row in rows]
+    t_strptime = time.perf_counter() - t
+
+    parse_session_date.cache_clear()
+    t = time.perf_counter()
+    parsed = [parse_session_date(row) for row in rows]
+    t_cached = time.perf_counter() - t
+
+    assert parsed == expected
+    print(f"    strptime: {t_strptime:.3f} s ({n_rows / t_strptime:.0f} rows/s)")
+    print(f"      cached: {t_cached:.3f} s ({n_rows / t_cached:.0f} rows/s), {session_date_cache_info()}")
+
+
+def _save_students_json_per_record(file_path: str, students: List[Student]) -> None:
+    """
+    Прежний способ записи: Student.__str__ и write на каждого студента
+    """
+    with open(file_path, 'w', encoding='utf-8') as output_file:
+        output_file.write('{\n"students":[\n')
+        for elem in students[:-1]:
+            output_file.write(str(elem) + ',\n')
+        output_file.write(str(students[-1]) + '\n')
+        output_file.write(']}')
+
+
+def _save_students_csv_per_row(file_path: str, students: List[Student]) -> None:
+    """
+    Прежний способ записи: str() каждой ячейки и write на каждую строку
+    """
+    with open(file_path, 'w', encoding='utf-8') as output_file:
+        output_file.write(';'.join(STUDENT_KEYS[:-1] + LAB_WORK_SESSION_KEYS) + '\n')
+        for student in students:
+            for lab_work in student.lab_work_sessions:
+                data = [student.unique_id, student.name, student.surname, student.group, student.subgroup,
+                        lab_work.lab_work_date.strftime(SESSION_DATE_FORMAT), int(lab_work.presence),
+                        lab_work.lab_work_number, lab_work.lab_work_mark]
+                output_file.write(';'.join(str(x) for x in data) + '\n')
+
+
+def writers_benchmark(n_students: int = BENCHMARK_STUDENTS_COUNT) -> None:
+    print(f"writers benchmark, students: {n_students}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source_path = os.path.join(tmp_dir, 'students.json')
+        output_path = os.path.join(tmp_dir, 'output')
+        write_synthetic_roster_json(source_path, n_students)
+        students = list(iter_students_json(source_path))
+        n_rows = sum(1 for student in students for _ in student.lab_work_sessions)
+        for name, writer in (("json str()", _save_students_json_per_record),
+                             ("json buffered", write_students_json),
+                             ("csv per row", _save_students_csv_per_row),
+                             ("csv buffered", write_students_csv)):
+            t = time.perf_counter()
+            writer(output_path, students)
+            t = time.perf_counter() - t
+            size = os.path.getsize(output_path) / 2 ** 20
+            print(f"{name:>14}: {t:.3f} s, {n_rows / t:.0f} rows/s, {size / t:.1f} MB/s")
+
+
+def load_many_benchmark(n_files: int = 16, n_students: int = 20000) -> None:
+    workers = os.cpu_count() or 1
+    print(f"multi-file loading benchmark, files: {n_files}, students per file: {n_students}, cores: {workers}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_paths = []
+        for index in range(n_files):
+            file_path = os.path.join(tmp_dir, f'students_{index}.json')
+            write_synthetic_roster_json(file_path, n_students)
+            if index % 2:
+                csv_path = os.path.join(tmp_dir, f'students_{index}.csv')
+                write_students_csv(csv_path, iter_students_json(file_path))
+                file_path = csv_path
+            file_paths.append(file_path)
+        for n_workers in sorted({1, workers}):
+            result = load_students_many(file_paths, workers=n_workers)
+            parse_time = sum(report.elapsed for report in result.reports)
+            print(f"{n_workers:>4} workers: {len(result.students)} students, wall {result.elapsed:.3f} s, "
+                  f"parse {parse_time:.3f} s")
+
+
+def make_synthetic_students(n_students: int, n_sessions: int = BENCHMARK_SESSIONS_COUNT) -> List[Student]:
+    dates = [date(2023, 9 + lab % 4, 15) for lab in range(n_sessions)]
+    students = []
+    for unique_id in range(n_students):
+        student = Student(unique_id, f"Имя{unique_id}", f"Фамилия{unique_id}", 6400 + unique_id % 100,
+                          1 + unique_id % 2)
+        for lab in range(n_sessions):
+            if (unique_id + lab) % 10:
+                student.append_lab_work_session(LabWorkSession(True, lab + 1, 2 + (unique_id + lab) % 4, dates[lab]))
+            else:
+                student.append_lab_work_session(LabWorkSession(False, -1, -1, dates[lab]))
+        students.append(student)
+    return students
+
+
+def _query_time(query: Callable, repeats: int) -> float:
+    t = time.perf_counter()
+    for _ in range(repeats):
+        query()
+    return (time.perf_counter() - t) / repeats
+
+
+def repository_benchmark(n_students: int = 1000000) -> None:
+    print(f"repository benchmark, students: {n_students}")
+    students = make_synthetic_students(n_students)
+    t = time.perf_counter()
+    repository = StudentRepository(students)
+    print(f"    index build: {time.perf_counter() - t:.3f} s")
+    queries = (
+        ("by unique_id", lambda: repository.get(n_students // 2), 10000,
+         lambda: next(student for student in students if student.unique_id == n_students // 2)),
+        ("group 6408 subgroup 2", lambda: repository.by_group(6408, 2), 10,
+         lambda: [student for student in students if student.group == 6408 and student.subgroup == 2]),
+        ("absent on 15:11:23 in 6408", lambda: repository.absent_on("15:11:23", 6408), 3,
+         lambda: [student for student in students if student.group == 6408 and
+                  any(not session.presence and session.lab_work_date == date(2023, 11, 15)
+                      for session in student.lab_work_sessions)]),
+    )
+    for name, query, repeats, scan in queries:
+        print(f"{name:>27}: index {_query_time(query, repeats) * 1e3:.4f} ms, "
+              f"linear scan {_query_time(scan, 1) * 1e3:.1f} ms")
+
+
+def _loop_analytics(students: List[Student]):
+    attendance: Dict[int, List[int]] = {}
+    by_lab: Dict[int, List[int]] = {}
+    by_date: Dict[date, List[int]] = {}
+    failing = []
+    for student in students:
+        marks = []
+        for session in student.lab_work_sessions:
+            counters = attendance.setdefault(student.group, [0, 0])
+            counters[0] += int(session.presence)
+            counters[1] += 1
+            if session.presence and session.lab_work_mark >= 0:
+                marks.append(session.lab_work_mark)
+                by_lab.setdefault(session.lab_work_number, []).append(session.lab_work_mark)
+                by_date.setdefault(session.lab_work_date, []).append(session.lab_work_mark)
+        if not marks or sum(marks) / len(marks) < 3.0:
+            failing.append(student.unique_id)
+    return ({key: value[0] / value[1] for key, value in attendance.items()},
+            {key: sum(value) / len(value) for key, value in by_lab.items()},
+            {key: sum(value) / len(value) for key, value in by_date.items()},
+            failing)
+
+
+def analytics_benchmark(n_students: int = BENCHMARK_STUDENTS_COUNT) -> None:
+    print(f"analytics benchmark, students: {n_students}")
+    students = make_synthetic_students(n_students)
+
+    t = time.perf_counter()
+    expected = _loop_analytics(students)
+    t_loop = time.perf_counter() - t
+
+    roster = RosterArrays(students)
+    t = time.perf_counter()
+    result = (roster.attendance_by_group(), roster.mean_mark_by_lab(), roster.mean_mark_by_date(),
+              roster.failing().tolist())
+    t_vectorized = time.perf_counter() - t
+
+    assert result[0].keys() == expected[0].keys() and result[3] == expected[3]
+    print(f"   python loops: {t_loop:.3f} s")
+    print(f"     conversion: {roster.conversion_time:.3f} s")
+    print(f"     vectorized: {t_vectorized:.3f} s (aggregates only)")
+
+
+def binary_snapshot_benchmark(n_students: int = 1000000) -> None:
+    print(f"binary snapshot benchmark, students: {n_students}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_path = os.path.join(tmp_dir, 'students.json')
+        binary_path = os.path.join(tmp_dir, 'students.bin')
+        write_synthetic_roster_json(json_path, n_students)
+        save_students_binary(binary_path, iter_students_json(json_path))
+
+        t = time.perf_counter()
+        students = load_students_json(json_path)
+        t_json = time.perf_counter() - t
+
+        t = time.perf_counter()
+        snapshot = load_students_binary(binary_path)
+        middle = snapshot[len(snapshot) // 2]
+        t_binary = time.perf_counter() - t
+
+        t = time.perf_counter()
+        lossless = all(str(left) == str(right) for left, right in zip(students, snapshot))
+        t_full = time.perf_counter() - t
+        lossless = lossless and len(students) == len(snapshot) and str(middle) == str(students[len(students) // 2])
+        snapshot.close()
+
+        print(f"json size {os.path.getsize(json_path) / 2 ** 20:.1f} MB, "
+              f"binary size {os.path.getsize(binary_path) / 2 ** 20:.1f} MB")
+        print(f"       json load: {t_json:.3f} s")
+        print(f"     binary open: {t_binary * 1e3:.3f} ms (with one student access)")
+        print(f"  binary compare: {t_full:.3f} s for a full pass, lossless: {lossless}")
+
+
+def trusted_construction_benchmark(n_students: int = BENCHMARK_STUDENTS_COUNT,
+                                   n_sessions: int = BENCHMARK_SESSIONS_COUNT) -> None:
+    import numpy as np
+    print(f"construction benchmark, students: {n_students}, sessions per student: {n_sessions}")
+    unique_ids = list(range(n_students))
+    names = [f"Имя{unique_id}" for unique_id in unique_ids]
+    surnames = [f"Фамилия{unique_id}" for unique_id in unique_ids]
+    groups = [6400 + unique_id % 100 for unique_id in unique_ids]
+    subgroups = [1 + unique_id % 2 for unique_id in unique_ids]
+    session_date = date(2023, 9, 15)
+    sessions = np.tile(np.array([1, 1, 5, session_date.toordinal()], dtype=np.int32), (n_students * n_sessions, 1))
+
+    t = time.perf_counter()
+    for row in range(n_students):
+        student = Student(unique_ids[row], names[row], surnames[row], groups[row], subgroups[row])
+        for _ in range(n_sessions):
+            student.append_lab_work_session(LabWorkSession(True, 1, 5, session_date))
+    t_checked = time.perf_counter() - t
+
+    t = time.perf_counter()
+    result = Student.from_trusted_rows(unique_ids, names, surnames, groups, subgroups,
+                                       np.full(n_students, n_sessions), sessions)
+    t_trusted = time.perf_counter() - t
+
+    assert len(result.students) == n_students and result.bad_rows.size == 0
+    print(f"  per object checks: {n_students / t_checked:.0f} students/s")
+    print(f"   trusted columns: {n_students / t_trusted:.0f} students/s")
+
+
+def incremental_reload_benchmark(n_students: int = BENCHMARK_STUDENTS_COUNT, n_changed: int = 10) -> None:
+    print(f"incremental reload benchmark, students: {n_students}, changed: {n_changed}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, 'students.json')
+        students = make_synthetic_students(n_students)
+        write_students_json(file_path, students)
+        loader = IncrementalStudentsLoader(file_path)
+        t = time.perf_counter()
+        loader.refresh()
+        t_first = time.perf_counter() - t
+
+        for student in students[::max(1, n_students // n_changed)][:n_changed]:
+            student.name = student.name + "*"
+        write_students_json(file_path, students)
+
+        t = time.perf_counter()
+        load_students_json(file_path)
+        t_full = time.perf_counter() - t
+
+        os.utime(file_path, ns=(0, 0))
+        t = time.perf_counter()
+        diff = loader.refresh()
+        t_refresh = time.perf_counter() - t
+
+        print(f"     first load: {t_first:.3f} s")
+        print(f"    full reload: {t_full:.3f} s")
+        print(f"        refresh: {t_refresh:.3f} s, modified: {len(diff.modified)}")
+
+
+async def _max_loop_lag(load, tick: float = 0.001) -> float:
+    """
+    Максимальная задержка пробуждения тикера цикла событий, пока выполняется load()
+    """
+    loop = asyncio.get_running_loop()
+    max_lag = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal max_lag
+        while not done:
+            t = loop.time()
+            await asyncio.sleep(tick)
+            max_lag = max(max_lag, loop.time() - t - tick)
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(tick)
+    await load()
+    done = True
+    await ticker_task
+    return max_lag
+
+
+def async_loop_latency_benchmark(n_students: int = BENCHMARK_STUDENTS_COUNT) -> None:
+    print(f"event loop latency benchmark, students: {n_students}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, 'students.json')
+        write_synthetic_roster_json(file_path, n_students)
+
+        async def blocking():
+            load_students_json(file_path)
+
+        async def in_thread():
+            await load_students_json_async(file_path)
+
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            async def in_process():
+                await load_students_json_async(file_path, executor)
+
+            for name, load in (("blocking", blocking), ("thread", in_thread), ("process", in_process)):
+                t = time.perf_counter()
+                lag = asyncio.run(_max_loop_lag(load))
+                print(f"{name:>10}: load {time.perf_counter() - t:.3f} s, max loop lag {lag * 1e3:.1f} ms")
+
+
+if __name__ == '__main__':
+    json_loaders_benchmark()
+    date_parser_benchmark()
+    writers_benchmark()
+    load_many_benchmark()
+    repository_benchmark()
+    analytics_benchmark()
+    binary_snapshot_benchmark()
+    trusted_construction_benchmark()
+    incremental_reload_benchmark()
+    async_loop_latency_benchmark()
@@ -0,0 +1,248 @@
+from typing import Union, Dict, Set, Tuple, Iterator, Callable
+from collections import namedtuple
+import hashlib
+import json
+import mmap
+import os
+import re
+
+from students_reader_task import Student, LoadErrors, PrintLoadErrors, _try_load_student
+
+RECORD_DIGEST_SIZE = 16
+# глубина вложенности скобок внутри записи, для которой граница записи ищется одним регулярным выражением;
+# более глубокие записи проходятся по скобкам
+RECORD_REGEX_DEPTH = 4
+
+_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+_STRING_RE = re.compile(_STRING)
+_SCALAR = rb'[^ \t\n\r,:"{}\[\]]+'
+# символы вне строк и скобок: серия всегда максимальна, поэтому выражение не откатывается экспоненциально
+_RUN = rb'[^"{}\[\]]*'
+_BRACKETS_RE = re.compile(_STRING + rb'|[\[{]|[\]}]')
+
+
+def _container_pattern(depth: int) -> bytes:
+    """
+    Объект или массив с вложенностью не глубже depth. Парность видов скобок не проверяется:
+    новые записи всё равно проходят через json.loads
+    """
+    nested = _STRING if depth <= 1 else _STRING + b'|' + _container_pattern(depth - 1)
+    return rb'[{\[]' + _RUN + rb'(?:(?:' + nested + rb')' + _RUN + rb')*[}\]]'
+
+
+_VALUE_RE = re.compile(_STRING + b'|' + _SCALAR + b'|' + _container_pattern(RECORD_REGEX_DEPTH))
+
+
+def _json_error(message: str, position: int) -> json.JSONDecodeError:
+    return json.JSONDecodeError(message, '', position)
+
+
+def _value_end(buffer, position: int) -> int:
+    """
+    Конец json значения, начинающегося с position, без разбора самого значения
+    """
+    match = _VALUE_RE.match(buffer, position)
+    if match is not None:
+        return match.end()
+    depth = 0
+    while True:
+        match = _BRACKETS_RE.search(buffer, position)
+        if match is None:
+            raise _json_error("Unterminated value", position)
+        position = match.end()
+        token = buffer[match.start()]
+        if token in b'[{':
+            depth += 1
+        elif token in b']}':
+            depth -= 1
+            if depth <= 0:
+                return position
+
+
+def _skip(buffer, position: int, char: bytes) -> int:
+    position = _WHITESPACE.match(buffer, position).end()
+    if buffer[position: position + 1] != char:
+        raise _json_error(f"Expecting '{char.decode()}'", position)
+    return position + 1
+
+
+def _iter_json_array_spans(buffer, array_key: str,
+                           element_end: Callable[[bytes, int], int] = _value_end) -> Iterator[Tuple[int, int]]:
+    """
+    Границы (начало, конец) элементов массива array_key корневого json объекта в байтах buffer.
+    Элементы и остальные значения корневого объекта не разбираются, разбираются только ключи.
+    param: element_end: функция (buffer, начало элемента) -> конец элемента
+    """
+    position = _skip(buffer, 0, b'{')
+    position = _WHITESPACE.match(buffer, position).end()
+    if buffer[position: position + 1] == b'}':
+        return
+    while True:
+        position = _WHITESPACE.match(buffer, position).end()
+        match = _STRING_RE.match(buffer, position)
+        if match is None:
+            raise _json_error("Expecting property name enclosed in double quotes", position)
+        key = json.loads(match.group())
+        position = _WHITESPACE.match(buffer, _skip(buffer, match.end(), b':')).end()
+        if key == array_key and buffer[position: position + 1] == b'[':
+            position = _WHITESPACE.match(buffer, position + 1).end()
+            if buffer[position: position + 1] != b']':
+                while True:
+                    end = element_end(buffer, position)
+                    yield position, end
+                    position = _WHITESPACE.match(buffer, end).end()
+                    if buffer[position: position + 1] != b',':
+                        break
+                    position = _WHITESPACE.match(buffer, position + 1).end()
+            position = _skip(buffer, position, b']')
+        else:
+            position = _value_end(buffer, position)
+        position = _WHITESPACE.match(buffer, position).end()
+        if buffer[position: position + 1] != b',':
+            break
+        position += 1
+    _skip(buffer, position, b'}')
+
+
+class RosterDiff(namedtuple("RosterDiff", "added, removed, modified")):
+    """
+    Изменения списка студентов после IncrementalStudentsLoader.refresh: множества unique_id
+    """
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+
+class IncrementalStudentsLoader:
+    """
+    Повторное чтение json файла со студентами, при котором заново создаются только изменившиеся студенты.
+    Файл отображается в память, записи массива "students" находятся по байтам и узнаются по хешу байтов,
+    через json.loads проходят только записи с новым хешем. Если mtime и размер файла не изменились,
+    файл не читается вовсе.
+    Как и в load_students_json, при повторе unique_id остаётся последняя запись.
+    """
+
+    def __init__(self, file_path: str, errors: Union[LoadErrors, None] = None):
+        assert isinstance(file_path, str)
+        self._file_path = file_path
+        self._errors = PrintLoadErrors() if errors is None else errors
+        self._file_state: Union[Tuple[int, int], None] = None
+        # unique_id -> хеш последней записи студента
+        self._digests: Dict[int, bytes] = {}
+        # хеш записи -> unique_id из записи (None, если его нет)
+        self._record_ids: Dict[bytes, Union[int, None]] = {}
+        self._students: Dict[int, Student] = {}
+
+    @property
+    def file_path(self) -> str:
+        return self._file_path
+
+    @property
+    def students(self) -> Dict[int, Student]:
+        """
+        Текущие студенты по unique_id
+        """
+        return self._students
+
+    def _scan(self, buffer) -> Tuple[Dict[int, bytes], Dict[bytes, Union[int, None]], Dict[int, dict]]:
+        """
+        Проход по записям файла.
+        Граница записи сначала ищется по концу строки: в json тексте перевод строки не может быть внутри строки,
+        поэтому записи, сохранённые по одной в строке, находятся поиском перевода строки.
+        Строка принимается за запись, если её хеш уже известен или она целиком разбирается json.loads,
+        иначе граница ищется по скобкам (_value_end).
+        :return: (unique_id -> хеш последней записи, хеш -> unique_id, unique_id -> данные изменившихся записей)
+        """
+        record_ids: Dict[bytes, Union[int, None]] = {}
+        # записи с новым хешем, разобранные при поиске границ
+        parsed: Dict[bytes, dict] = {}
+        # начало записи -> хеш записи, найденной по строке
+        line_digests: Dict[int, bytes] = {}
+
+        def record_end(data, start: int) -> int:
+            line_end = data.find(b'\n', start)
+            line = data[start: len(data) if line_end < 0 else line_end].rstrip()
+            if line.endswith(b','):
+                line = line[:-1].rstrip()
+            digest = hashlib.blake2b(line, digest_size=RECORD_DIGEST_SIZE).digest()
+            if digest not in record_ids and digest not in self._record_ids:
+                try:
+                    parsed[digest] = json.loads(line)
+                except ValueError:
+                    return _value_end(data, start)
+            line_digests[start] = digest
+            return start + len(line)
+
+        # unique_id -> (хеш, начало, конец) последней записи студента
+        records: Dict[int, Tuple[bytes, int, int]] = {}
+        for start, end in _iter_json_array_spans(buffer, "students", record_end):
+            digest = line_digests.pop(start, None)
+            if digest is None:
+                digest = hashlib.blake2b(buffer[start: end], digest_size=RECORD_DIGEST_SIZE).digest()
+            if digest in record_ids:
+                unique_id = record_ids[digest]
+            elif digest in self._record_ids:
+                unique_id = record_ids[digest] = self._record_ids[digest]
+            else:
+                if digest not in parsed:
+                    parsed[digest] = json.loads(buffer[start: end])
+                student_data = parsed[digest]
+                unique_id = record_ids[digest] = \
+                    student_data.get("unique_id") if isinstance(student_data, dict) else None
+            if unique_id is not None:
+                # при повторе unique_id остаётся последняя запись
+                records[unique_id] = (digest, start, end)
+
+        changed: Dict[int, dict] = {}
+        for unique_id, (digest, start, end) in records.items():
+            if self._digests.get(unique_id) != digest:
+                # запись с известным хешем разбирается, если она стала последней для повторного unique_id
+                changed[unique_id] = parsed[digest] if digest in parsed else json.loads(buffer[start: end])
+        return {unique_id: record[0] for unique_id, record in records.items()}, record_ids, changed
+
+    def refresh(self) -> RosterDiff:
+        """
+        Перечитывает файл и пересоздаёт только добавленных и изменённых студентов.
+        Если файл удалён, все студенты считаются удалёнными.
+        """
+        if not os.path.exists(self._file_path):
+            removed = set(self._students)
+            self._file_state = None
+            self._digests.clear()
+            self._record_ids.clear()
+            self._students.clear()
+            return RosterDiff(set(), removed, set())
+
+        stat = os.stat(self._file_path)
+        file_state = (stat.st_mtime_ns, stat.st_size)
+        if file_state == self._file_state:
+            return RosterDiff(set(), set(), set())
+
+        if stat.st_size == 0:
+            raise _json_error("Expecting '{'", 0)
+        with open(self._file_path, 'rb') as input_file, \
+                mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            digests, record_ids, changed = self._scan(buffer)
+
+        added: Set[int] = set()
+        modified: Set[int] = set()
+        removed: Set[int] = set()
+        for unique_id in self._digests.keys() - digests.keys():
+            if self._students.pop(unique_id, None) is not None:
+                removed.add(unique_id)
+        for unique_id, student_data in changed.items():
+            student = _try_load_student(student_data, self._errors)
+            existed = unique_id in self._students
+            if student is None:
+                if existed:
+                    del self._students[unique_id]
+                    removed.add(unique_id)
+                continue
+            self._students[unique_id] = student
+            (modified if existed else added).add(unique_id)
+
+        self._digests = digests
+        self._record_ids = record_ids
+        self._file_state = file_state
+        return RosterDiff(added, removed, modified)
@@ -1,54 +1,38 @@
 import datetime
-from typing import Union, List, Dict
+from typing import Union, List, Dict, Iterator, Iterable, Tuple, Callable, TYPE_CHECKING
 from collections import namedtuple
+from functools import lru_cache
+from itertools import repeat
 from datetime import date, datetime
 import os.path
+import shutil
+import struct
+import mmap
+import sys
+import tempfile
+import time
 import json
+import csv
+import re
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+if TYPE_CHECKING:
+    # numpy нужен только пакетным методам и импортируется в них, здесь - для аннотаций
+    import numpy as np
 
 LAB_WORK_SESSION_KEYS = ("date", "presence", "lab_work_n", "lab_work_mark")
 STUDENT_KEYS = ("unique_id", "name", "surname", "group",
                 "subgroup", "lab_works_sessions")
 
 
-class LabWorkSession:
+class LabWorkSessionBase:
     """
-    Информация о лабораторном занятии, которое могло или не могло быть посещено студентом
+    Свойства лабораторного занятия и проверки в их сеттерах.
+    Поля _presence, _lab_work_number, _lab_work_mark и _lab_work_date задаёт наследник:
+    LabWorkSession хранит их в слотах, LabWorkSessionView - в LabWorkSessionsStore.
     """
-
-    def __init__(self, presence: bool, lab_work_number: int, lab_work_mark: int, lab_work_date: date):
-        self._presence = presence
-        self._lab_work_number = lab_work_number
-        self._lab_work_mark = lab_work_mark
-        self._lab_work_date = lab_work_date
-
-    def __new__(cls, presence: bool, lab_work_number: int, lab_work_mark: int, lab_work_date: date):
-        if not cls._validate_args(presence, lab_work_number, lab_work_mark, lab_work_date):
-            raise ValueError(f"LabWorkSession ::"
-                             f"incorrect args :\n"
-                             f"presence       : {presence},\n"
-                             f"lab_work_number: {lab_work_number},\n"
-                             f"lab_work_mark  : {lab_work_mark},\n"
-                             f"lab_work_date  : {lab_work_date}")
-
-        return super().__new__(cls)
-
-    @staticmethod
-    def _validate_args(presence: bool, lab_work_number: int, lab_work_mark: int, lab_work_date: date) -> bool:
-        """
-            param: presence: присутствие студента на л.р.(bool)
-            param: lab_work_number: номер л.р.(int)
-            param: lab_work_mark: оценка за л.р.(int)
-            param: lab_work_date: дата л.р.(date)
-        """
-        if not presence and lab_work_number != -1:
-            return False
-        if lab_work_number == -1 and lab_work_mark != -1:
-            return False
-        if lab_work_date is None and lab_work_number != -1:
-            return False
-        if lab_work_date is None and lab_work_mark != -1:
-            return False
-        return True
+    __slots__ = ()
 
     def __str__(self) -> str:
         """
@@ -116,9 +100,198 @@ class LabWorkSession:
         self._lab_work_date = value
 
 
+
+class LabWorkSession(LabWorkSessionBase):
+    """
+    Информация о лабораторном занятии, которое могло или не могло быть посещено студентом
+    """
+    __slots__ = ('_presence', '_lab_work_number', '_lab_work_mark', '_lab_work_date')
+
+    def __init__(self, presence: bool, lab_work_number: int, lab_work_mark: int, lab_work_date: date):
+        self._presence = presence
+        self._lab_work_number = lab_work_number
+        self._lab_work_mark = lab_work_mark
+        self._lab_work_date = lab_work_date
+
+    def __new__(cls, presence: bool, lab_work_number: int, lab_work_mark: int, lab_work_date: date):
+        if not cls._validate_args(presence, lab_work_number, lab_work_mark, lab_work_date):
+            raise ValueError(f"LabWorkSession ::"
+                             f"incorrect args :\n"
+                             f"presence       : {presence},\n"
+                             f"lab_work_number: {lab_work_number},\n"
+                             f"lab_work_mark  : {lab_work_mark},\n"
+                             f"lab_work_date  : {lab_work_date}")
+
+        return super().__new__(cls)
+
+    @staticmethod
+    def _validate_args(presence: bool, lab_work_number: int, lab_work_mark: int, lab_work_date: date) -> bool:
+        """
+            param: presence: присутствие студента на л.р.(bool)
+            param: lab_work_number: номер л.р.(int)
+            param: lab_work_mark: оценка за л.р.(int)
+            param: lab_work_date: дата л.р.(date)
+        """
+        if not presence and lab_work_number != -1:
+            return False
+        if lab_work_number == -1 and lab_work_mark != -1:
+            return False
+        if lab_work_date is None and lab_work_number != -1:
+            return False
+        if lab_work_date is None and lab_work_mark != -1:
+            return False
+        return True
+
+    @staticmethod
+    def _validate_columns(records) -> 'np.ndarray':
+        """
+        Векторная версия _validate_args для упакованных записей занятий.
+            param: records: массив (n, SESSION_FIELDS_COUNT) в формате LabWorkSessionsStore
+            return: маска корректных записей
+        """
+        import numpy as np
+        records = np.asarray(records).reshape(-1, SESSION_FIELDS_COUNT)
+        presence = records[:, SESSION_PRESENCE]
+        number = records[:, SESSION_NUMBER]
+        mark = records[:, SESSION_MARK]
+        no_date = records[:, SESSION_DATE] == NO_DATE_ORDINAL
+        valid = (presence == 0) | (presence == 1)
+        valid &= (presence == 1) | (number == -1)
+        valid &= (number != -1) | (mark == -1)
+        valid &= ~no_date | ((number == -1) & (mark == -1))
+        return valid
+
+
+# Поля записи лабораторного занятия в LabWorkSessionsStore
+SESSION_PRESENCE = 0
+SESSION_NUMBER = 1
+SESSION_MARK = 2
+SESSION_DATE = 3
+SESSION_FIELDS_COUNT = 4
+# дата отсутствует
+NO_DATE_ORDINAL = 0
+
+
+def _date_to_ordinal(value: Union[date, None]) -> int:
+    return NO_DATE_ORDINAL if value is None else value.toordinal()
+
+
+def _ordinal_to_date(value: int) -> Union[date, None]:
+    return None if value == NO_DATE_ORDINAL else date.fromordinal(value)
+
+
+def _iter_session_values(records: Union[array, memoryview]) -> Iterator[Tuple[int, int, int, int]]:
+    """
+    Занятия из упакованных записей в виде кортежей (присутствие, номер л.р., оценка, ordinal даты)
+    """
+    return zip(records[SESSION_PRESENCE::SESSION_FIELDS_COUNT], records[SESSION_NUMBER::SESSION_FIELDS_COUNT],
+               records[SESSION_MARK::SESSION_FIELDS_COUNT], records[SESSION_DATE::SESSION_FIELDS_COUNT])
+
+
+class LabWorkSessionsStore:
+    """
+    Компактное хранилище лабораторных занятий одного студента.
+    Занятия упакованы в один массив int по SESSION_FIELDS_COUNT чисел на занятие:
+    присутствие, номер л.р., оценка и дата в виде ordinal (NO_DATE_ORDINAL, если даты нет).
+    Доступ к занятию выдаётся через LabWorkSessionView.
+    """
+    __slots__ = ('_records',)
+
+    def __init__(self):
+        self._records = array('i')
+
+    def __len__(self) -> int:
+        return len(self._records) // SESSION_FIELDS_COUNT
+
+    def __getitem__(self, index: int) -> 'LabWorkSessionView':
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"LabWorkSessionsStore::index {index} out of range")
+        return LabWorkSessionView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield LabWorkSessionView(self, index)
+
+    @property
+    def records(self) -> array:
+        """
+        Метод доступа к упакованным записям занятий
+        """
+        return self._records
+
+    def iter_values(self) -> Iterator[Tuple[int, int, int, int]]:
+        """
+        Занятия в виде кортежей (присутствие, номер л.р., оценка, ordinal даты)
+        """
+        return _iter_session_values(self._records)
+
+    def append_values(self, presence: bool, lab_work_number: int, lab_work_mark: int, lab_work_date_ordinal: int):
+        """
+        Добавление уже проверенного занятия
+        """
+        self._records.extend((int(bool(presence)), lab_work_number, lab_work_mark, lab_work_date_ordinal))
+
+    def extend_records(self, records: Union[bytes, array]) -> None:
+        """
+        Добавление уже проверенных упакованных записей (см. records)
+        """
+        if isinstance(records, array):
+            self._records.extend(records)
+        else:
+            self._records.frombytes(records)
+
+    def append(self, session: LabWorkSessionBase):
+        self.append_values(session.presence, session.lab_work_number, session.lab_work_mark,
+                           _date_to_ordinal(session.lab_work_date))
+
+    def get_field(self, index: int, field: int) -> int:
+        return self._records[index * SESSION_FIELDS_COUNT + field]
+
+    def set_field(self, index: int, field: int, value: int) -> None:
+        self._records[index * SESSION_FIELDS_COUNT + field] = value
+
+
+def _session_field(field: int, decode, encode):
+    def getter(self):
+        return decode(self._store.get_field(self._index, field))
+
+    def setter(self, value):
+        self._store.set_field(self._index, field, encode(value))
+
+    return property(getter, setter)
+
+
+class LabWorkSessionView(LabWorkSessionBase):
+    """
+    Представление занятия, хранящегося в LabWorkSessionsStore.
+    Поля читаются и пишутся прямо в хранилище, поэтому свойства и проверки в сеттерах
+    LabWorkSessionBase работают так же, как у LabWorkSession. Слотов LabWorkSession представление не несёт.
+    """
+    __slots__ = ('_store', '_index')
+
+    _presence = _session_field(SESSION_PRESENCE, bool, lambda value: int(bool(value)))
+    _lab_work_number = _session_field(SESSION_NUMBER, int, int)
+    _lab_work_mark = _session_field(SESSION_MARK, int, int)
+    _lab_work_date = _session_field(SESSION_DATE, _ordinal_to_date, _date_to_ordinal)
+
+    def __init__(self, store: LabWorkSessionsStore, index: int):
+        # занятие уже проверено при добавлении в хранилище
+        self._store = store
+        self._index = index
+
+
+class TrustedRowsResult(namedtuple("TrustedRowsResult", "students, bad_rows, bad_sessions")):
+    """
+    Результат Student.from_trusted_rows: созданные студенты,
+    индексы отброшенных строк студентов и индексы отброшенных записей занятий
+    """
+
+
 class Student:
     __slots__ = ('_unique_id', '_name', '_surname',
-                 '_group', '_subgroup', '_lab_work_sessions')
+                 '_group', '_subgroup', '_lab_work_sessions', '_session_listeners')
 
     def __init__(self, unique_id: int, name: str, surname: str, group: int, subgroup: int):
         """
@@ -136,7 +309,98 @@ class Student:
         self._surname = surname
         self._group = group
         self._subgroup = subgroup
-        self._lab_work_sessions: List[LabWorkSession] = []
+        self._lab_work_sessions = LabWorkSessionsStore()
+        self._session_listeners: Tuple[Callable[['Student', int], None], ...] = ()
+
+    @classmethod
+    def _from_trusted(cls, unique_id: int, name: str, surname: str, group: int, subgroup: int) -> 'Student':
+        """
+        Создание студента без _validate_args, аргументы уже проверены вызывающим кодом
+        """
+        student = cls.__new__(cls)
+        student._unique_id = unique_id
+        student._name = name
+        student._surname = surname
+        student._group = group
+        student._subgroup = subgroup
+        student._lab_work_sessions = LabWorkSessionsStore()
+        student._session_listeners = ()
+        return student
+
+    @classmethod
+    def from_trusted_rows(cls, unique_ids, names, surnames, groups, subgroups,
+                          session_counts=None, sessions=None) -> TrustedRowsResult:
+        """
+        Пакетное создание студентов из колонок без проверки каждого объекта.
+        Колонки проверяются целиком (_validate_columns, LabWorkSession._validate_columns),
+        строки с ошибками пропускаются, а их индексы возвращаются в результате.
+            param: unique_ids, names, surnames, groups, subgroups: колонки полей студентов
+            param: session_counts: число занятий каждого студента
+            param: sessions: записи занятий всех студентов подряд, массив (n, SESSION_FIELDS_COUNT)
+                   в формате LabWorkSessionsStore
+        """
+        import numpy as np
+        valid = cls._validate_columns(names, surnames, groups, subgroups)
+        n_rows = valid.size
+        if len(unique_ids) != n_rows:
+            raise ValueError(f"Student::from_trusted_rows::columns length mismatch: "
+                             f"{len(unique_ids)} unique_ids for {n_rows} rows")
+
+        if session_counts is None:
+            if sessions is not None:
+                raise ValueError("Student::from_trusted_rows error... sessions passed without session_counts")
+            counts = np.zeros(n_rows, dtype=np.int64)
+            records = np.zeros((0, SESSION_FIELDS_COUNT), dtype=np.int32)
+        else:
+            counts = np.asarray(session_counts, dtype=np.int64)
+            records = np.ascontiguousarray(sessions, dtype=np.int32).reshape(-1, SESSION_FIELDS_COUNT)
+            if counts.size != n_rows or counts.sum() != records.shape[0]:
+                raise ValueError(f"Student::from_trusted_rows::session_counts do not match sessions: "
+                                 f"{counts.size} counts for {n_rows} rows, "
+                                 f"{counts.sum()} sessions counted, {records.shape[0]} passed")
+        valid_sessions = LabWorkSession._validate_columns(records)
+        if not valid_sessions.all():
+            owners = np.repeat(np.arange(n_rows), counts)
+            counts = np.bincount(owners[valid_sessions], minlength=n_rows)
+            records = records[valid_sessions]
+        bounds = np.concatenate(([0], np.cumsum(counts))) * (4 * SESSION_FIELDS_COUNT)
+        raw_records = np.ascontiguousarray(records).tobytes()
+
+        # np.asarray для списка смешанных типов привёл бы числа к строкам, поэтому списки берутся как есть
+        unique_ids, groups, subgroups = (column.tolist() if isinstance(column, np.ndarray) else list(column)
+                                         for column in (unique_ids, groups, subgroups))
+        bounds = bounds.tolist()
+        students = []
+        for row in np.flatnonzero(valid).tolist():
+            student = cls._from_trusted(unique_ids[row], names[row], surnames[row], groups[row], subgroups[row])
+            if bounds[row] != bounds[row + 1]:
+                student._lab_work_sessions.extend_records(raw_records[bounds[row]: bounds[row + 1]])
+            students.append(student)
+        return TrustedRowsResult(students, np.flatnonzero(~valid), np.flatnonzero(~valid_sessions))
+
+    @staticmethod
+    def _validate_columns(names, surnames, groups, subgroups) -> 'np.ndarray':
+        """
+        Векторная версия _validate_args для колонок полей студентов.
+            return: маска корректных строк
+        """
+        import numpy as np
+        n_rows = len(names)
+        if not len(surnames) == len(groups) == len(subgroups) == n_rows:
+            raise ValueError(f"Student::_validate_columns::columns length mismatch: {n_rows} names, "
+                             f"{len(surnames)} surnames, {len(groups)} groups, {len(subgroups)} subgroups")
+        valid = np.ones(n_rows, dtype=bool)
+        for column in (names, surnames):
+            valid &= np.fromiter(map(isinstance, column, repeat(str, n_rows)), dtype=bool, count=n_rows)
+            valid &= np.fromiter(map(bool, column), dtype=bool, count=n_rows)
+        for column in (groups, subgroups):
+            values = np.asarray(column)
+            if values.dtype.kind in 'iu':
+                valid &= values > 0
+            else:
+                valid &= np.fromiter((isinstance(value, int) and value > 0 for value in column),
+                                     dtype=bool, count=n_rows)
+        return valid
 
     @staticmethod
     def _validate_args(unique_id: int, name: str, surname: str, group: int, subgroup: int) -> bool:
@@ -280,11 +544,69 @@ class Student:
         for s in self._lab_work_sessions:
             yield s
 
-    def append_lab_work_session(self, session: LabWorkSession):
+    @property
+    def session_records(self) -> memoryview:
+        """
+        Метод доступа только для чтения к упакованным записям занятий (см. LabWorkSessionsStore):
+        memoryview формата 'i', SESSION_FIELDS_COUNT чисел на занятие.
+        Пока представление не освобождено, добавить занятие нельзя (BufferError),
+        поэтому его не хранят дольше чтения или освобождают через release()
+        """
+        return memoryview(self._lab_work_sessions.records).toreadonly()
+
+    def lab_work_session(self, index: int) -> LabWorkSessionView:
+        """
+        Метод доступа к занятию с номером index в порядке регистрации
+        """
+        return self._lab_work_sessions[index]
+
+    def append_lab_work_session(self, session: LabWorkSessionBase):
         """
         Метод для регистрации нового лабораторного занятия
         """
         self._lab_work_sessions.append(session)
+        for listener in self._session_listeners:
+            listener(self, len(self._lab_work_sessions) - 1)
+
+    def add_session_listener(self, listener: Callable[['Student', int], None]) -> None:
+        """
+        Регистрация обработчика добавления занятия, вызывается как listener(student, индекс занятия)
+        """
+        self._session_listeners += (listener,)
+
+    def remove_session_listener(self, listener: Callable[['Student', int], None]) -> None:
+        self._session_listeners = tuple(item for item in self._session_listeners if item != listener)
+
+
+SESSION_DATE_FORMAT = "%d:%m:%y"
+SESSION_DATE_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=SESSION_DATE_CACHE_SIZE)
+def parse_session_date(text: str) -> date:
+    """
+    Разбор даты занятия в формате SESSION_DATE_FORMAT ("15:9:23").
+    За семестр встречается несколько десятков разных дат, поэтому результаты кешируются.
+    Частый случай "день:месяц:год" разбирается через split и int,
+    всё остальное отдаётся в datetime.strptime.
+    """
+    parts = text.split(':')
+    # isdigit пропускает и не-ASCII цифры, которые strptime не принимает
+    if len(parts) == 3 and text.isascii():
+        day, month, year = parts
+        if 0 < len(day) <= 2 and 0 < len(month) <= 2 and len(year) == 2 and \
+                day.isdigit() and month.isdigit() and year.isdigit():
+            # правило %y: 69-99 -> 1969-1999, 00-68 -> 2000-2068
+            year = int(year)
+            return date(year + (1900 if year >= 69 else 2000), int(month), int(day))
+    return datetime.strptime(text, SESSION_DATE_FORMAT).date()
+
+
+def session_date_cache_info():
+    """
+    Статистика кеша parse_session_date: hits, misses, maxsize, currsize
+    """
+    return parse_session_date.cache_info()
 
 
 def _load_lab_work_session(json_node) -> LabWorkSession:
@@ -302,20 +624,78 @@ def _load_lab_work_session(json_node) -> LabWorkSession:
                 f"load_lab_work_session:: key not present in json_node")
 
     result = LabWorkSession(
-        bool(json_node['presence']),
+        bool(int(json_node['presence'])),
         int(json_node['lab_work_n']),
         int(json_node['lab_work_mark']),
-        datetime.strptime(json_node['date'].strip('"'), "%d:%m:%y").date()
+        parse_session_date(json_node['date'].strip('"')) if json_node['date'] else None
     )
 
     return result
 
 
-def _load_student(json_node) -> Student:
+class LoadAbortedError(RuntimeError):
+    """
+    Чтение прервано: число ошибок превысило LoadErrors.max_errors
+    """
+
+    def __init__(self, errors: 'LoadErrors'):
+        super().__init__(f"loading aborted after {errors.total} errors:\n{errors}")
+        self.errors = errors
+
+
+class LoadErrors:
+    """
+    Сборщик ошибок чтения студентов.
+    Хранит число ошибок по видам (имя класса исключения) и несколько примеров каждого вида.
+    При превышении max_errors бросает LoadAbortedError.
+    """
+
+    def __init__(self, max_errors: Union[int, None] = None, samples_per_kind: int = 5):
+        self.max_errors = max_errors
+        self.samples_per_kind = samples_per_kind
+        self.total = 0
+        self.counts: Dict[str, int] = {}
+        self.samples: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return self.total
+
+    def __str__(self) -> str:
+        lines = []
+        for kind, count in sorted(self.counts.items(), key=lambda item: -item[1]):
+            lines.append(f"{kind}: {count}")
+            lines.extend(f"\t{sample}" for sample in self.samples.get(kind, ()))
+        return '\n'.join(lines)
+
+    def report(self, error: Exception, context: str = '') -> None:
+        """
+        Регистрация ошибки, context - где она случилась (например, unique_id студента)
+        """
+        kind = type(error).__name__
+        self.total += 1
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+        samples = self.samples.setdefault(kind, [])
+        if len(samples) < self.samples_per_kind:
+            samples.append(f"{context}: {error}" if context else str(error))
+        if self.max_errors is not None and self.total > self.max_errors:
+            raise LoadAbortedError(self)
+
+
+class PrintLoadErrors(LoadErrors):
+    """
+    Сборщик, который дополнительно печатает каждую ошибку (поведение загрузчиков по умолчанию)
+    """
+
+    def report(self, error: Exception, context: str = '') -> None:
+        print(error)
+        super().report(error, context)
+
+
+def _load_student(json_node, errors: Union[LoadErrors, None] = None) -> Student:
     """
         Создание из под-дерева json файла экземпляра класса Student.
         Если в процессе создания LabWorkSession у студента случается ошибка,
-        создание самого студента ломаться не должно.
+        создание самого студента ломаться не должно, ошибка передаётся в errors.
     """
     for key in STUDENT_KEYS:
         if key not in json_node:
@@ -331,18 +711,25 @@ def _load_student(json_node) -> Student:
     for session in json_node['lab_works_sessions']:
         try:
             student.append_lab_work_session(_load_lab_work_session(session))
-        except ValueError as er:
-            print(er)
-            continue
-        except KeyError as er:
-            print(er)
-            continue
         except Exception as er:
-            print(er)
+            if errors is None:
+                errors = PrintLoadErrors()
+            errors.report(er, f"unique_id {student.unique_id}")
             continue
     return student
 
 
+def _try_load_student(json_node, errors: LoadErrors) -> Union[Student, None]:
+    """
+    Создание студента, ошибка создания передаётся в errors и не прерывает чтение всего файла
+    """
+    try:
+        return _load_student(json_node, errors)
+    except (KeyError, ValueError, TypeError) as er:
+        errors.report(er, f"unique_id {json_node.get('unique_id')}")
+        return None
+
+
 # csv header
 #     0    |   1  |   2   |   3  |    4    |  5  |    6    |        7       |       8     |
 # unique_id; name; surname; group; subgroup; date; presence; lab_work_number; lab_work_mark
@@ -357,7 +744,47 @@ LAB_WORK_NUMBER = 7
 LAB_WORK_MARK = 8
 
 
-def load_students_csv(file_path: str) -> Union[List[Student], None]:
+def iter_students_csv(file_path: str, errors: Union[LoadErrors, None] = None) -> Iterator[Student]:
+    """
+    Потоковое чтение студентов из csv файла.
+    Строки читаются по одной и группируются по подряд идущим unique_id,
+    студент отдаётся сразу, как только закончились его строки.
+    В памяти одновременно хранятся только строки одного студента.
+    param: errors: сборщик ошибок чтения, по умолчанию ошибки печатаются
+    """
+    assert isinstance(file_path, str)
+    if errors is None:
+        errors = PrintLoadErrors()
+
+    with open(file_path, 'rt', encoding='utf-8', newline='') as input_file:
+        reader = csv.reader(input_file, delimiter=';')
+        headers = next(reader, None)
+        if headers is None:
+            return
+        headers = [header.strip() for header in headers]
+        student_headers = headers[:LAB_WORK_DATE]
+        session_headers = headers[LAB_WORK_DATE:]
+
+        student_dict = None
+        for row in reader:
+            if not row:
+                continue
+            if student_dict is None or row[UNIQUE_ID] != student_dict['unique_id']:
+                if student_dict is not None:
+                    student = _try_load_student(student_dict, errors)
+                    if student is not None:
+                        yield student
+                student_dict = dict(zip(student_headers, row[:LAB_WORK_DATE]))
+                student_dict['lab_works_sessions'] = []
+            student_dict['lab_works_sessions'].append(dict(zip(session_headers, row[LAB_WORK_DATE:])))
+
+        if student_dict is not None:
+            student = _try_load_student(student_dict, errors)
+            if student is not None:
+                yield student
+
+
+def load_students_csv(file_path: str, errors: Union[LoadErrors, None] = None) -> Union[List[Student], None]:
     # csv header
     #     0    |   1  |   2   |   3  |    4    |  5  |    6    |        7       |       8     |
     # unique_id; name; surname; group; subgroup; date; presence; lab_work_number; lab_work_mark
@@ -365,53 +792,171 @@ def load_students_csv(file_path: str) -> Union[List[Student], None]:
     if not os.path.exists(file_path):
         return None
 
-    with open(file_path, 'rt', encoding='utf-8') as input_file:
-        lines = input_file.readlines()
+    return list(iter_students_csv(file_path, errors))
 
-    headers = lines[0].strip().split(';')
-    lab_session = []
-    students = []
 
-    for line in lines[1:]:
-        line_lst = line.strip().split(';')
-        lab_session.append(dict(zip(headers[5:], line_lst[5:])))
+_JSON_DECODER = json.JSONDecoder()
+_JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+JSON_READ_CHUNK_SIZE = 1 << 16
+
 
-    for line in lines[1::4]:
-        line_lst = line.replace('"', "").split(';')[:-1]
-        student_dict = dict(zip(headers[:5], line_lst[:5]))
-        student_dict['lab_works_sessions'] = []
-        for i in range(4):
-            student_dict['lab_works_sessions'].append(lab_session[0])
-            del lab_session[0]
-        students.append(_load_student(student_dict))
+# символы, которыми может продолжаться json число
+_JSON_NUMBER_CHARS = frozenset('0123456789.eE+-')
 
-    return students
 
+class _JsonStreamReader:
+    """
+    Последовательное чтение json текста кусками фиксированного размера.
+    В буфере хранится только ещё не разобранная часть файла.
+    """
+
+    def __init__(self, input_file, chunk_size: int = JSON_READ_CHUNK_SIZE):
+        self._input_file = input_file
+        self._chunk_size = max(1, chunk_size)
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
 
-def load_students_json(file_path: str) -> Union[List[Student], None]:
+    def _fill(self) -> bool:
+        """
+        Дочитывает следующий кусок файла в буфер, уже разобранная часть буфера отбрасывается.
+        Размер куска растёт вместе с буфером, чтобы длинные значения не разбирались заново слишком часто.
+        """
+        if self._eof:
+            return False
+        chunk = self._input_file.read(max(self._chunk_size, len(self._buffer) - self._pos))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Пропускает пробельные символы и возвращает следующий символ ('' в конце файла)
+        """
+        while True:
+            self._pos = _JSON_WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self._buffer, self._pos)
+        self._pos += 1
+
+    def value(self, with_raw: bool = False):
+        """
+        Разбирает следующее json значение целиком.
+        param: with_raw: вернуть пару (значение, исходный текст значения)
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _JSON_DECODER.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # число на границе куска могло быть прочитано не полностью: "1." или "1.5e" разбираются как 1 и 1.5
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and \
+                    (end == len(self._buffer) or self._buffer[end] in _JSON_NUMBER_CHARS) and self._fill():
+                continue
+            start, self._pos = self._pos, end
+            return (value, self._buffer[start:end]) if with_raw else value
+
+
+def _iter_json_array(input_file, array_key: str, chunk_size: int = JSON_READ_CHUNK_SIZE,
+                     with_raw: bool = False) -> Iterator:
+    """
+    Проходит по элементам массива array_key корневого json объекта по одному.
+    Остальные ключи корневого объекта разбираются и отбрасываются.
+    param: with_raw: отдавать пары (элемент, исходный текст элемента)
+    """
+    stream = _JsonStreamReader(input_file, chunk_size)
+    stream.expect('{')
+    if stream.peek() == '}':
+        return
+    while True:
+        key = stream.value()
+        stream.expect(':')
+        if key == array_key and stream.peek() == '[':
+            stream.expect('[')
+            if stream.peek() != ']':
+                while True:
+                    yield stream.value(with_raw)
+                    if stream.peek() != ',':
+                        break
+                    stream.expect(',')
+            stream.expect(']')
+        else:
+            stream.value()
+        if stream.peek() != ',':
+            break
+        stream.expect(',')
+    stream.expect('}')
+
+
+def iter_students_json(file_path: str, skip_duplicates: bool = False,
+                       chunk_size: int = JSON_READ_CHUNK_SIZE,
+                       errors: Union[LoadErrors, None] = None) -> Iterator[Student]:
+    """
+    Потоковое чтение студентов из json файла.
+    Массив "students" разбирается по одному элементу, студенты отдаются по мере чтения.
+    param: skip_duplicates: пропускать студентов с уже встречавшимся unique_id (остаётся первый корректный)
+    param: chunk_size: размер куска чтения файла в символах
+    param: errors: сборщик ошибок чтения, по умолчанию ошибки печатаются
+    """
+    assert isinstance(file_path, str)
+    if errors is None:
+        errors = PrintLoadErrors()
+
+    seen_ids = set()
+    with open(file_path, 'rt', encoding='utf-8') as input_file:
+        for student_data in _iter_json_array(input_file, "students", chunk_size):
+            unique_id = student_data.get("unique_id")
+            if unique_id is None:
+                continue
+            if skip_duplicates and unique_id in seen_ids:
+                continue
+            student = _try_load_student(student_data, errors)
+            if student is not None:
+                # запись с ошибкой не занимает unique_id: следующая корректная запись с ним не пропускается
+                if skip_duplicates:
+                    seen_ids.add(unique_id)
+                yield student
+
+
+def load_students_json(file_path: str, dedupe: bool = True,
+                       errors: Union[LoadErrors, None] = None) -> Union[List[Student], None]:
     """
     Загрузка списка студентов из json файла.
     Ошибка создания экземпляра класса Student не должна приводить к поломке всего чтения.
+    param: dedupe: студенты с одинаковым unique_id заменяются последним из них
+    param: errors: сборщик ошибок чтения, по умолчанию ошибки печатаются
     """
     assert isinstance(file_path, str)
     if not os.path.exists(file_path):
         return None
+    if errors is None:
+        errors = PrintLoadErrors()
 
     students_raw: Dict[int, Student] = {}
+    students: List[Student] = []
 
-    with open(file_path, 'rt', encoding='utf-8') as input_file:
-        try:
-            json_data = json.load(input_file)
-            students_list = json_data.get("students", [])
-
-            for student_data in students_list:
-                unique_id = student_data.get("unique_id")
-                if unique_id is not None:
-                    students_raw[unique_id] = _load_student(student_data)
-        except json.JSONDecodeError as ex:
-            print(ex)
+    try:
+        for student in iter_students_json(file_path, errors=errors):
+            if dedupe:
+                students_raw[student.unique_id] = student
+            else:
+                students.append(student)
+    except json.JSONDecodeError as ex:
+        errors.report(ex, file_path)
 
-    return list(students_raw.values())
+    return list(students_raw.values()) if dedupe else students
 
 
 def get_variable_name(var, namespace=None):
@@ -424,55 +969,408 @@ def get_variable_name(var, namespace=None):
     return None
 
 
-def save_students_json(file_path: str, students: List[Student]):
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+@lru_cache(maxsize=SESSION_DATE_CACHE_SIZE)
+def _format_session_date(date_ordinal: int) -> str:
     """
-    Запись списка студентов в json файл
+    Дата занятия в формате SESSION_DATE_FORMAT, '' если даты нет
+    """
+    if date_ordinal == NO_DATE_ORDINAL:
+        return ''
+    return date.fromordinal(date_ordinal).strftime(SESSION_DATE_FORMAT)
+
+
+def _session_json_record(presence: int, number: int, mark: int, date_ordinal: int) -> str:
+    session_date = 'null' if date_ordinal == NO_DATE_ORDINAL else f'"{_format_session_date(date_ordinal)}"'
+    return f'{{"presence": {presence}, "lab_work_n": {number}, "lab_work_mark": {mark}, "date": {session_date}}}'
+
+
+def _student_json_record(student: Student) -> str:
+    with student.session_records as records:
+        sessions = ', '.join(_session_json_record(*values) for values in _iter_session_values(records))
+    return f'{{"unique_id": {student.unique_id}, ' \
+           f'"name": {json.dumps(student.name, ensure_ascii=False)}, ' \
+           f'"surname": {json.dumps(student.surname, ensure_ascii=False)}, ' \
+           f'"group": {student.group}, "subgroup": {student.subgroup}, ' \
+           f'"lab_works_sessions": [{sessions}]}}'
+
+
+def _csv_field(value: str) -> str:
+    if ';' in value or '"' in value or '\n' in value or '\r' in value:
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def _write_buffered(output_file, parts: Iterable[str], buffer_size: int) -> None:
+    """
+    Запись строк в файл кусками не меньше buffer_size символов
+    """
+    chunk: List[str] = []
+    chunk_size = 0
+    for part in parts:
+        chunk.append(part)
+        chunk_size += len(part)
+        if chunk_size >= buffer_size:
+            output_file.write(''.join(chunk))
+            chunk.clear()
+            chunk_size = 0
+    if chunk:
+        output_file.write(''.join(chunk))
+
+
+def write_students_json(file_path: str, students: Iterable[Student], key: str = "students",
+                        buffer_size: int = WRITE_BUFFER_SIZE) -> None:
     """
+    Потоковая запись студентов в json файл, одна запись студента на строку.
+    param: students: любая последовательность или генератор студентов
+    param: key: ключ массива студентов в корневом объекте
+    param: buffer_size: размер куска, которым текст сбрасывается в файл
+    """
+    assert isinstance(file_path, str)
 
+    def parts():
+        yield f'{{\n{json.dumps(key, ensure_ascii=False)}: [\n'
+        separator = ''
+        for student in students:
+            yield separator
+            yield _student_json_record(student)
+            separator = ',\n'
+        yield '\n]}\n'
+
+    with open(file_path, 'wt', encoding='utf-8', buffering=buffer_size) as output_file:
+        _write_buffered(output_file, parts(), buffer_size)
+
+
+def write_students_csv(file_path: str, students: Iterable[Student], buffer_size: int = WRITE_BUFFER_SIZE) -> None:
+    """
+    Потоковая запись студентов в csv файл, по строке на лабораторное занятие.
+    param: students: любая последовательность или генератор студентов
+    param: buffer_size: размер куска, которым текст сбрасывается в файл
+    """
     assert isinstance(file_path, str)
 
-    with open(file_path, 'w', encoding='utf-8') as output_file:
-        init = f'{{\n\"{get_variable_name(students)}\":[\n'
-        output_file.write(init)
+    def parts():
+        yield ';'.join(STUDENT_KEYS[:-1] + LAB_WORK_SESSION_KEYS) + '\n'
+        for student in students:
+            prefix = f'{student.unique_id};{_csv_field(student.name)};{_csv_field(student.surname)};' \
+                     f'{student.group};{student.subgroup};'
+            with student.session_records as records:
+                for presence, number, mark, ordinal in _iter_session_values(records):
+                    yield f'{prefix}{_format_session_date(ordinal)};{presence};{number};{mark}\n'
 
-        for elem in students[:-1]:
-            output_file.write(str(elem) + ',\n')
+    with open(file_path, 'wt', encoding='utf-8', buffering=buffer_size) as output_file:
+        _write_buffered(output_file, parts(), buffer_size)
 
-        output_file.write(str(elem) + '\n')
 
-        output_file.write(']}')
+def save_students_json(file_path: str, students: Iterable[Student]):
+    """
+    Запись списка студентов в json файл
+    """
+    write_students_json(file_path, students)
 
 
-def save_students_csv(file_path: str, students: List[Student]):
+def save_students_csv(file_path: str, students: Iterable[Student]):
     """
     Запись списка студентов в csv файл
     """
+    write_students_csv(file_path, students)
 
-    assert isinstance(file_path, str)
 
-    headers = list(STUDENT_KEYS[:-1])
-    headers.extend(list(LAB_WORK_SESSION_KEYS))
+# Бинарный снимок списка студентов (little-endian):
+# заголовок | записи студентов | записи занятий | таблица строк utf-8
+BINARY_MAGIC = b'STDB'
+BINARY_VERSION = 1
+# magic, версия, число студентов, число занятий, смещение занятий, смещение строк, размер таблицы строк
+BINARY_HEADER = struct.Struct('<4sIQQQQQ')
+# unique_id, group, subgroup, смещение и длина name, смещение и длина surname, первое занятие, число занятий
+BINARY_STUDENT = struct.Struct('<qiiQIQIQI')
+# presence, lab_work_n, lab_work_mark, ordinal даты - тот же порядок, что и в LabWorkSessionsStore
+BINARY_SESSION_SIZE = 4 * SESSION_FIELDS_COUNT
+
+
+def _records_to_le_bytes(records: Union[array, memoryview]) -> bytes:
+    if sys.byteorder == 'little':
+        return records.tobytes()
+    records = array('i', records)
+    records.byteswap()
+    return records.tobytes()
+
 
-    with open(file_path, 'w', encoding='utf-8') as output_file:
-        header_line = ';'.join(headers)
-        output_file.write(f'{header_line}\n')
+def _records_from_le_bytes(data) -> array:
+    records = array('i')
+    records.frombytes(data)
+    if sys.byteorder != 'little':
+        records.byteswap()
+    return records
 
+
+def save_students_binary(file_path: str, students: Iterable[Student]) -> None:
+    """
+    Запись студентов в бинарный снимок фиксированного формата (см. BINARY_HEADER, BINARY_STUDENT).
+    Записи студентов пишутся сразу в файл, занятия и строки - во временные файлы,
+    которые дописываются в конец, поэтому память не зависит от размера списка.
+    """
+    assert isinstance(file_path, str)
+
+    n_students = 0
+    n_sessions = 0
+    strings_size = 0
+    with open(file_path, 'wb') as output_file, \
+            tempfile.TemporaryFile() as sessions_file, tempfile.TemporaryFile() as strings_file:
+        output_file.write(bytes(BINARY_HEADER.size))
         for student in students:
-            for lab_work in student.lab_work_sessions:
-                data = [
-                    student.unique_id,
-                    student.name,
-                    student.surname,
-                    student.group,
-                    student.subgroup,
-                    lab_work.lab_work_date.strftime('%d:%m:%y'),
-                    int(lab_work.presence),
-                    lab_work.lab_work_number,
-                    lab_work.lab_work_mark
-                ]
-                line = ';'.join(str(x) for x in data)
-
-                output_file.write(f'{line}\n')
+            name = student.name.encode('utf-8')
+            surname = student.surname.encode('utf-8')
+            with student.session_records as records:
+                sessions_count = len(records) // SESSION_FIELDS_COUNT
+                sessions_file.write(_records_to_le_bytes(records))
+            output_file.write(BINARY_STUDENT.pack(student.unique_id, student.group, student.subgroup,
+                                                  strings_size, len(name), strings_size + len(name), len(surname),
+                                                  n_sessions, sessions_count))
+            strings_file.write(name)
+            strings_file.write(surname)
+            strings_size += len(name) + len(surname)
+            n_sessions += sessions_count
+            n_students += 1
+
+        sessions_offset = BINARY_HEADER.size + n_students * BINARY_STUDENT.size
+        strings_offset = sessions_offset + n_sessions * BINARY_SESSION_SIZE
+        for section in (sessions_file, strings_file):
+            section.seek(0)
+            shutil.copyfileobj(section, output_file)
+        output_file.seek(0)
+        output_file.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, n_students, n_sessions,
+                                             sessions_offset, strings_offset, strings_size))
+
+
+class StudentsSnapshot:
+    """
+    Список студентов из бинарного снимка, отображённого в память через mmap.
+    Файл не читается целиком: студент собирается из своих записей только при обращении по индексу.
+    """
+
+    def __init__(self, file_path: str):
+        self._sessions_view: Union[memoryview, None] = None
+        with open(file_path, 'rb') as input_file:
+            self._mmap = mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        if len(self._view) < BINARY_HEADER.size:
+            self.close()
+            raise ValueError(f"StudentsSnapshot:: file \"{file_path}\" is too small")
+        magic, version, self._n_students, self._n_sessions, self._sessions_offset, self._strings_offset, \
+            strings_size = BINARY_HEADER.unpack_from(self._view, 0)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            self.close()
+            raise ValueError(f"StudentsSnapshot:: file \"{file_path}\" is not a students snapshot "
+                             f"(magic {magic}, version {version})")
+
+    def __len__(self) -> int:
+        return self._n_students
+
+    def _check_open(self) -> None:
+        if self._mmap is None:
+            raise ValueError("StudentsSnapshot:: snapshot is closed")
+
+    def __getitem__(self, index: int) -> Student:
+        self._check_open()
+        if index < 0:
+            index += self._n_students
+        if not 0 <= index < self._n_students:
+            raise IndexError(f"StudentsSnapshot::index {index} out of range")
+        unique_id, group, subgroup, name_offset, name_len, surname_offset, surname_len, sessions_first, \
+            sessions_count = BINARY_STUDENT.unpack_from(self._view, BINARY_HEADER.size + index * BINARY_STUDENT.size)
+        strings = self._strings_offset
+        student = Student._from_trusted(
+            unique_id,
+            str(self._view[strings + name_offset: strings + name_offset + name_len], 'utf-8'),
+            str(self._view[strings + surname_offset: strings + surname_offset + surname_len], 'utf-8'),
+            group, subgroup)
+        sessions = self._sessions_offset + sessions_first * BINARY_SESSION_SIZE
+        student._lab_work_sessions.extend_records(
+            _records_from_le_bytes(self._view[sessions: sessions + sessions_count * BINARY_SESSION_SIZE]))
+        return student
+
+    def __iter__(self) -> Iterator[Student]:
+        for index in range(self._n_students):
+            yield self[index]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def sessions_count(self) -> int:
+        return self._n_sessions
+
+    def sessions_buffer(self) -> memoryview:
+        """
+        Все записи занятий без копирования (little-endian int32, SESSION_FIELDS_COUNT чисел на занятие).
+        Буфер действителен до close(): снимок хранит его и освобождает при закрытии.
+        """
+        self._check_open()
+        if self._sessions_view is None:
+            self._sessions_view = \
+                self._view[self._sessions_offset: self._sessions_offset + self._n_sessions * BINARY_SESSION_SIZE]
+        return self._sessions_view
+
+    def close(self) -> None:
+        """
+        Закрывает отображение. Повторный вызов ничего не делает.
+        Если на буфер занятий ещё ссылаются объекты, построенные поверх него (например, np.frombuffer),
+        отображение освобождается, когда пропадёт последний из них.
+        """
+        if self._mmap is None:
+            return
+        try:
+            for view in (self._sessions_view, self._view):
+                if view is not None:
+                    try:
+                        view.release()
+                    except BufferError:
+                        pass
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass
+        finally:
+            self._sessions_view = None
+            self._view = None
+            self._mmap = None
+
+
+def load_students_binary(file_path: str) -> Union[StudentsSnapshot, None]:
+    """
+    Открытие бинарного снимка, записанного save_students_binary.
+    Снимок держит файл открытым, пока не вызван close (или не закончился блок with).
+    """
+    assert isinstance(file_path, str)
+    if not os.path.exists(file_path):
+        return None
+    return StudentsSnapshot(file_path)
+
+
+# Компактное представление студента для передачи между процессами:
+# (unique_id, name, surname, group, subgroup, упакованные записи занятий в bytes)
+CompactStudent = Tuple[int, str, str, int, int, bytes]
+MERGE_POLICIES = ("last", "first", "merge")
+
+
+def student_to_compact(student: Student) -> CompactStudent:
+    with student.session_records as records:
+        return student.unique_id, student.name, student.surname, student.group, student.subgroup, records.tobytes()
+
+
+def student_from_compact(compact: CompactStudent) -> Student:
+    unique_id, name, surname, group, subgroup, records = compact
+    student = Student._from_trusted(unique_id, name, surname, group, subgroup)
+    student._lab_work_sessions.extend_records(records)
+    return student
+
+
+class FileLoadReport(namedtuple("FileLoadReport", "file_path, students_count, elapsed, error")):
+    """
+    Результат чтения одного файла: путь, число студентов, время разбора в секундах
+    и описание ошибки, если файл не удалось прочитать (None при успешном чтении)
+    """
+
+
+class MultiLoadResult(namedtuple("MultiLoadResult", "students, reports, elapsed")):
+    """
+    Результат load_students_many: объединённый список студентов,
+    отчёты по файлам (FileLoadReport) и общее время в секундах
+    """
+
+    @property
+    def failed(self) -> List[FileLoadReport]:
+        """
+        Отчёты по файлам, которые не удалось прочитать
+        """
+        return [report for report in self.reports if report.error is not None]
+
+
+def _load_students_compact(file_path: str, loader: Union[Callable, None] = None) \
+        -> Union[List[CompactStudent], None]:
+    """
+    Чтение одного файла в процессе-обработчике функцией loader (load_students_csv или load_students_json),
+    студенты возвращаются в компактном виде. Если loader равен None, формат выбирается по расширению.
+    Для отсутствующего файла возвращается None, как и у load_students_*
+    """
+    if loader is None:
+        loader = load_students_csv if file_path.lower().endswith('.csv') else load_students_json
+    students = loader(file_path)
+    if students is None:
+        return None
+    return [student_to_compact(student) for student in students]
+
+
+def _load_students_file_compact(file_path: str) \
+        -> Tuple[str, Union[List[CompactStudent], None], float, Union[str, None]]:
+    """
+    Чтение одного файла для load_students_many: (путь, студенты в компактном виде, время, ошибка).
+    Если файл отсутствует или не читается, вместо студентов возвращается None, а ошибка описывает причину
+    """
+    t = time.perf_counter()
+    try:
+        compact = _load_students_compact(file_path)
+    except OSError as er:
+        return file_path, None, time.perf_counter() - t, f"{type(er).__name__}: {er}"
+    return file_path, compact, time.perf_counter() - t, None if compact is not None else "file not found"
+
+
+def load_students_many(file_paths: Iterable[str], workers: Union[int, None] = None,
+                       merge_policy: str = "last") -> MultiLoadResult:
+    """
+    Параллельное чтение нескольких json/csv файлов со студентами в пуле процессов.
+    Студенты объединяются по unique_id в порядке следования файлов:
+    "last"  - остаётся студент из последнего файла,
+    "first" - остаётся студент из первого файла,
+    "merge" - данные студента из первого файла, занятия из всех файлов по порядку.
+    Отсутствующие и нечитаемые файлы не прерывают чтение остальных: их отчёты содержат error
+    и перечислены в MultiLoadResult.failed.
+    param: workers: число процессов, None - по числу ядер, 1 - без пула, в текущем процессе
+    """
+    if merge_policy not in MERGE_POLICIES:
+        raise ValueError(f"load_students_many:: unknown merge policy \"{merge_policy}\", "
+                         f"expected one of {MERGE_POLICIES}")
+    file_paths = list(file_paths)
+    t = time.perf_counter()
+
+    if workers == 1 or len(file_paths) <= 1:
+        results = map(_load_students_file_compact, file_paths)
+        merged = _merge_compact_students(results, merge_policy)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(_load_students_file_compact, file_paths)
+            merged = _merge_compact_students(results, merge_policy)
+
+    students, reports = merged
+    return MultiLoadResult(students, reports, time.perf_counter() - t)
+
+
+def _merge_compact_students(results, merge_policy: str) -> Tuple[List[Student], List[FileLoadReport]]:
+    merged: Dict[int, List] = {}
+    reports: List[FileLoadReport] = []
+    for file_path, compact_students, elapsed, error in results:
+        reports.append(FileLoadReport(file_path, 0 if compact_students is None else len(compact_students),
+                                      elapsed, error))
+        for compact in compact_students or ():
+            unique_id = compact[0]
+            if unique_id not in merged or merge_policy == "last":
+                merged[unique_id] = [compact]
+            elif merge_policy == "merge":
+                merged[unique_id].append(compact)
+
+    students = []
+    for parts in merged.values():
+        student = student_from_compact(parts[0])
+        for compact in parts[1:]:
+            student._lab_work_sessions.extend_records(compact[-1])
+        students.append(student)
+    return students, reports
 
 
 if __name__ == '__main__':
@@ -0,0 +1,148 @@
+from typing import Union, List, Dict, Iterable, Iterator, Tuple
+from collections import defaultdict
+from datetime import date
+
+from students_reader_task import Student, LabWorkSessionBase, parse_session_date
+
+# student unique_id -> индексы занятий студента
+SessionsIndex = Dict[int, List[int]]
+
+
+class StudentRepository:
+    """
+    Хранилище студентов с хеш-индексами по unique_id, (группа, подгруппа), номеру л.р. и дате занятия,
+    а также отдельными индексами пропущенных занятий по дате и по (дата, группа).
+    Индексы занятий обновляются при вызове Student.append_lab_work_session у добавленных студентов.
+    Изменение номера л.р. или даты через сеттеры LabWorkSession индексы не обновляет,
+    для этого студента нужно удалить и добавить заново.
+    """
+
+    def __init__(self, students: Iterable[Student] = ()):
+        self._by_id: Dict[int, Student] = {}
+        self._by_group: Dict[int, Dict[int, Student]] = defaultdict(dict)
+        self._by_subgroup: Dict[Tuple[int, int], Dict[int, Student]] = defaultdict(dict)
+        self._by_lab: Dict[int, SessionsIndex] = defaultdict(dict)
+        self._by_date: Dict[date, SessionsIndex] = defaultdict(dict)
+        self._absent_by_date: Dict[date, SessionsIndex] = defaultdict(dict)
+        self._absent_by_date_group: Dict[Tuple[date, int], SessionsIndex] = defaultdict(dict)
+        self.extend(students)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, unique_id: int) -> bool:
+        return unique_id in self._by_id
+
+    def __iter__(self) -> Iterator[Student]:
+        return iter(self._by_id.values())
+
+    def add(self, student: Student) -> None:
+        """
+        Добавление студента, студент с тем же unique_id заменяется
+        """
+        if student.unique_id in self._by_id:
+            self.remove(student.unique_id)
+        self._by_id[student.unique_id] = student
+        self._by_group[student.group][student.unique_id] = student
+        self._by_subgroup[(student.group, student.subgroup)][student.unique_id] = student
+        for index, session in enumerate(student.lab_work_sessions):
+            self._add_session(student, index, session)
+        student.add_session_listener(self._index_session)
+
+    def extend(self, students: Iterable[Student]) -> None:
+        for student in students:
+            self.add(student)
+
+    def remove(self, unique_id: int) -> Union[Student, None]:
+        """
+        Удаление студента вместе со всеми его записями в индексах
+        """
+        student = self._by_id.pop(unique_id, None)
+        if student is None:
+            return None
+        student.remove_session_listener(self._index_session)
+        self._discard(self._by_group, student.group, unique_id)
+        self._discard(self._by_subgroup, (student.group, student.subgroup), unique_id)
+        for session in student.lab_work_sessions:
+            session_date = session.lab_work_date
+            self._discard(self._by_lab, session.lab_work_number, unique_id)
+            self._discard(self._by_date, session_date, unique_id)
+            self._discard(self._absent_by_date, session_date, unique_id)
+            self._discard(self._absent_by_date_group, (session_date, student.group), unique_id)
+        return student
+
+    @staticmethod
+    def _discard(index: dict, key, unique_id: int) -> None:
+        bucket = index.get(key)
+        if bucket is None:
+            return
+        bucket.pop(unique_id, None)
+        if not bucket:
+            del index[key]
+
+    def _index_session(self, student: Student, session_index: int) -> None:
+        self._add_session(student, session_index, student.lab_work_session(session_index))
+
+    def _add_session(self, student: Student, session_index: int, session: LabWorkSessionBase) -> None:
+        unique_id = student.unique_id
+        self._by_lab[session.lab_work_number].setdefault(unique_id, []).append(session_index)
+        session_date = session.lab_work_date
+        self._by_date[session_date].setdefault(unique_id, []).append(session_index)
+        if not session.presence:
+            self._absent_by_date[session_date].setdefault(unique_id, []).append(session_index)
+            self._absent_by_date_group[(session_date, student.group)].setdefault(unique_id, []).append(session_index)
+
+    def _sessions(self, bucket: SessionsIndex) -> List[Tuple[Student, LabWorkSessionBase]]:
+        return [(self._by_id[unique_id], self._by_id[unique_id].lab_work_session(index))
+                for unique_id, indices in bucket.items() for index in indices]
+
+    def get(self, unique_id: int) -> Union[Student, None]:
+        return self._by_id.get(unique_id)
+
+    def by_group(self, group: int, subgroup: Union[int, None] = None) -> List[Student]:
+        """
+        Студенты группы или подгруппы группы
+        """
+        if subgroup is None:
+            bucket = self._by_group.get(group, {})
+        else:
+            bucket = self._by_subgroup.get((group, subgroup), {})
+        return list(bucket.values())
+
+    def sessions_by_lab(self, lab_work_number: int) -> List[Tuple[Student, LabWorkSessionBase]]:
+        """
+        Пары (студент, занятие) для всех занятий с номером л.р. lab_work_number
+        """
+        return self._sessions(self._by_lab.get(lab_work_number, {}))
+
+    def sessions_on(self, session_date: Union[date, str, None]) -> List[Tuple[Student, LabWorkSessionBase]]:
+        """
+        Пары (студент, занятие) для всех занятий в дату session_date (date или строка "15:11:23")
+        """
+        if isinstance(session_date, str):
+            session_date = parse_session_date(session_date)
+        return self._sessions(self._by_date.get(session_date, {}))
+
+    def absent_on(self, session_date: Union[date, str, None],
+                  group: Union[int, None] = None, subgroup: Union[int, None] = None) -> List[Student]:
+        """
+        Студенты, пропустившие занятие в дату session_date, при необходимости только из группы/подгруппы.
+        С group просматриваются только пропуски группы (индекс по (дата, группа))
+        """
+        if isinstance(session_date, str):
+            session_date = parse_session_date(session_date)
+        if group is None:
+            bucket = self._absent_by_date.get(session_date, {})
+        else:
+            bucket = self._absent_by_date_group.get((session_date, group), {})
+        students = (self._by_id[unique_id] for unique_id in bucket)
+        if subgroup is None:
+            return list(students)
+        return [student for student in students if student.subgroup == subgroup]
+
+    def without_lab(self, lab_work_number: int) -> List[Student]:
+        """
+        Студенты, у которых нет ни одного занятия с номером л.р. lab_work_number
+        """
+        done = self._by_lab.get(lab_work_number, {})
+        return [student for unique_id, student in self._by_id.items() if unique_id not in done]
@@ -0,0 +1,72 @@
+"""
+Проверки RosterArrays. Запуск из каталога lab_1:
+    python -m pytest test_students_analytics.py
+"""
+from datetime import date
+import math
+import unittest
+
+from students_reader_task import Student, LabWorkSession
+from students_analytics import RosterArrays
+from students_benchmark import make_synthetic_students, _loop_analytics
+
+
+class RosterArraysTest(unittest.TestCase):
+    def _assert_dicts_almost_equal(self, actual, expected):
+        self.assertEqual(actual.keys(), expected.keys())
+        for key, value in expected.items():
+            self.assertAlmostEqual(actual[key], value, places=12, msg=key)
+
+    def test_matches_loops(self):
+        students = make_synthetic_students(300, n_sessions=7)
+        # студент без занятий и студент, пропустивший всё
+        students.append(Student(1000, "Имя", "Фамилия", 6500, 1))
+        absent = Student(1001, "Имя", "Фамилия", 6500, 2)
+        absent.append_lab_work_session(LabWorkSession(False, -1, -1, date(2023, 9, 15)))
+        students.append(absent)
+        attendance, by_lab, by_date, failing = _loop_analytics(students)
+
+        roster = RosterArrays(students)
+        self.assertEqual((roster.students_count, roster.sessions_count), (302, 300 * 7 + 1))
+        self._assert_dicts_almost_equal(roster.attendance_by_group(), attendance)
+        self._assert_dicts_almost_equal(roster.mean_mark_by_lab(), by_lab)
+        self._assert_dicts_almost_equal(roster.mean_mark_by_date(), by_date)
+        self.assertEqual(roster.failing().tolist(), failing)
+
+    def test_attendance_by_subgroup(self):
+        students = make_synthetic_students(40, n_sessions=5)
+        expected = {}
+        for student in students:
+            counters = expected.setdefault((student.group, student.subgroup), [0, 0])
+            for session in student.lab_work_sessions:
+                counters[0] += int(session.presence)
+                counters[1] += 1
+        self._assert_dicts_almost_equal(RosterArrays(students).attendance_by_group(by_subgroup=True),
+                                        {key: value[0] / value[1] for key, value in expected.items()})
+
+    def test_mean_mark_by_student_and_absences(self):
+        day = date(2023, 9, 15)
+        graded = Student(1, "Имя", "Фамилия", 6400, 1)
+        graded.append_lab_work_session(LabWorkSession(True, 1, 5, day))
+        graded.append_lab_work_session(LabWorkSession(False, -1, -1, day))
+        graded.append_lab_work_session(LabWorkSession(False, -1, -1, day))
+        empty = Student(2, "Имя", "Фамилия", 6400, 1)
+        roster = RosterArrays([graded, empty])
+        unique_ids, means = roster.mean_mark_by_student()
+        self.assertEqual(unique_ids.tolist(), [1, 2])
+        self.assertEqual(means[0], 5.0)
+        self.assertTrue(math.isnan(means[1]))
+        self.assertEqual(roster.failing().tolist(), [2])
+        self.assertEqual(roster.failing(max_absences=1).tolist(), [1, 2])
+        self.assertEqual(roster.failing(max_absences=2).tolist(), [2])
+
+    def test_empty_roster(self):
+        roster = RosterArrays([])
+        self.assertEqual((roster.students_count, roster.sessions_count), (0, 0))
+        self.assertEqual(roster.attendance_by_group(), {})
+        self.assertEqual(roster.mean_mark_by_lab(), {})
+        self.assertEqual(roster.failing().tolist(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Проверки асинхронного чтения студентов. Запуск из каталога lab_1:
+    python -m pytest test_students_async.py
+"""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import os.path
+import tempfile
+import unittest
+
+from students_reader_task import write_students_csv, write_students_json, student_to_compact, load_students_json, \
+    load_students_csv
+from students_async import load_students_csv_async, load_students_json_async, save_students_json_async, \
+    save_students_csv_async, load_students_many_async
+from test_students_reader_task import _make_students
+
+
+class LoadAsyncTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._students = _make_students()
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _check_loader(self, writer, loader_async, file_name: str):
+        file_path = os.path.join(self._tmp_dir.name, file_name)
+        writer(file_path, self._students)
+        expected = [student_to_compact(student) for student in self._students]
+        for executor_type in (ThreadPoolExecutor, ProcessPoolExecutor):
+            with self.subTest(executor=executor_type.__name__), executor_type(max_workers=1) as executor:
+                students = asyncio.run(loader_async(file_path, executor))
+                self.assertEqual([student_to_compact(student) for student in students], expected)
+
+    def test_csv_without_csv_extension(self):
+        self._check_loader(write_students_csv, load_students_csv_async, 'students.txt')
+
+    def test_json_with_csv_extension(self):
+        self._check_loader(write_students_json, load_students_json_async, 'students.csv')
+
+    def test_save_round_trip(self):
+        for saver, loader, file_name in ((save_students_json_async, load_students_json, 'saved.json'),
+                                         (save_students_csv_async, load_students_csv, 'saved.csv')):
+            with self.subTest(saver=saver.__name__):
+                file_path = os.path.join(self._tmp_dir.name, file_name)
+                asyncio.run(saver(file_path, self._students))
+                self.assertEqual([student_to_compact(student) for student in loader(file_path)],
+                                 [student_to_compact(student) for student in self._students])
+
+    def test_load_many_keeps_order_and_missing_files(self):
+        file_paths = [os.path.join(self._tmp_dir.name, name) for name in ('a.json', 'missing.json', 'b.csv')]
+        write_students_json(file_paths[0], self._students[:2])
+        write_students_csv(file_paths[2], self._students[2:])
+        for executor_type in (ThreadPoolExecutor, ProcessPoolExecutor):
+            for limit in (0, 1, 3):
+                with self.subTest(executor=executor_type.__name__, limit=limit), \
+                        executor_type(max_workers=2) as executor:
+                    results = asyncio.run(load_students_many_async(file_paths, limit, executor))
+                    self.assertEqual([None if result is None else [student.unique_id for student in result]
+                                      for result in results], [[0, 1], None, [2]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+"""
+Проверки IncrementalStudentsLoader. Запуск из каталога lab_1:
+    python -m pytest test_students_incremental.py
+"""
+from unittest import mock
+import json
+import os
+import tempfile
+import unittest
+
+from students_reader_task import load_students_json, LoadErrors
+from students_incremental import IncrementalStudentsLoader
+
+
+def _record(unique_id: int, name: str = None, **extra) -> dict:
+    record = {"unique_id": unique_id, "name": name or f"Имя{unique_id}", "surname": f"Фамилия{unique_id}",
+              "group": 6400, "subgroup": 1,
+              "lab_works_sessions": [{"presence": 1, "lab_work_n": 1, "lab_work_mark": 5, "date": "15:09:23"}]}
+    record.update(extra)
+    return record
+
+
+class IncrementalStudentsLoaderTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._file_path = os.path.join(self._tmp_dir.name, 'students.json')
+        self._version = 0
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _write(self, records, indent=None, **other_keys):
+        document = dict(other_keys)
+        document["students"] = records
+        with open(self._file_path, 'wt', encoding='utf-8') as output_file:
+            if indent is None:
+                # по одной записи в строке, как пишет write_students_json
+                output_file.write('{"students": [\n' + ',\n'.join(json.dumps(record, ensure_ascii=False)
+                                                                   for record in records) + '\n]')
+                for key, value in other_keys.items():
+                    output_file.write(f', {json.dumps(key)}: {json.dumps(value)}')
+                output_file.write('}\n')
+            else:
+                json.dump(document, output_file, indent=indent, ensure_ascii=False)
+        # mtime может не измениться между записями в пределах одного теста
+        self._version += 1
+        os.utime(self._file_path, ns=(self._version, self._version))
+
+    def _assert_matches_full_load(self, loader: IncrementalStudentsLoader):
+        expected = {student.unique_id: str(student) for student in load_students_json(self._file_path)}
+        self.assertEqual({unique_id: str(student) for unique_id, student in loader.students.items()}, expected)
+
+    def test_diffs(self):
+        for indent in (None, 2):
+            with self.subTest(indent=indent):
+                self._write([_record(1), _record(2), _record(3)], indent)
+                loader = IncrementalStudentsLoader(self._file_path)
+                self.assertEqual(loader.refresh(), ({1, 2, 3}, set(), set()))
+                self.assertFalse(loader.refresh())
+
+                self._write([_record(1), _record(3, "Новое имя"), _record(4)], indent)
+                self.assertEqual(loader.refresh(), ({4}, {2}, {3}))
+                self._assert_matches_full_load(loader)
+
+                os.remove(self._file_path)
+                self.assertEqual(loader.refresh(), (set(), {1, 3, 4}, set()))
+                self.assertEqual(loader.students, {})
+
+    def test_only_changed_records_are_decoded(self):
+        records = [_record(unique_id) for unique_id in range(100)]
+        self._write(records)
+        loader = IncrementalStudentsLoader(self._file_path)
+        loader.refresh()
+        records[10] = _record(10, "Изменённое имя")
+        records[50] = _record(50, "Изменённое имя")
+        self._write(records)
+        with mock.patch('students_incremental.json.loads', wraps=json.loads) as loads:
+            diff = loader.refresh()
+        self.assertEqual(diff.modified, {10, 50})
+        # ключ корневого объекта и две изменившиеся записи
+        self.assertEqual(loads.call_count, 3)
+        self._assert_matches_full_load(loader)
+
+    def test_last_duplicate_wins(self):
+        first, second = _record(5, "Первый"), _record(5, "Второй")
+        self._write([first, _record(6), second])
+        loader = IncrementalStudentsLoader(self._file_path)
+        loader.refresh()
+        self.assertEqual(loader.students[5].name, "Второй")
+        self._write([second, _record(6), first])
+        self.assertEqual(loader.refresh().modified, {5})
+        self.assertEqual(loader.students[5].name, "Первый")
+
+    def test_records_that_are_not_one_per_line(self):
+        for indent in (None, 2):
+            with self.subTest(indent=indent):
+                tricky = [_record(1, 'Имя с "кавычками", скобками ]}{[ и\nпереводом строки'),
+                          _record(2, extra=[[[[[[1, {"a": "]"}]]]]]]),
+                          _record(3)]
+                self._write(tricky, indent, comment={"nested": [1, [2, "}"]]})
+                loader = IncrementalStudentsLoader(self._file_path)
+                self.assertEqual(loader.refresh().added, {1, 2, 3})
+                self._assert_matches_full_load(loader)
+                tricky[1] = _record(2, "Новое имя", extra=[[[[[[2]]]]]])
+                self._write(tricky, indent, comment={"nested": [1, [2, "}"]]})
+                self.assertEqual(loader.refresh(), (set(), set(), {2}))
+                self._assert_matches_full_load(loader)
+
+        with open(self._file_path, 'wt', encoding='utf-8') as output_file:
+            output_file.write('{"students": [' + ', '.join(json.dumps(record) for record in tricky) + ']}')
+        loader = IncrementalStudentsLoader(self._file_path)
+        self.assertEqual(loader.refresh().added, {1, 2, 3})
+        self._assert_matches_full_load(loader)
+
+    def test_invalid_record_is_reported(self):
+        errors = LoadErrors()
+        self._write([_record(1), _record(2, group="not a number")])
+        loader = IncrementalStudentsLoader(self._file_path, errors)
+        self.assertEqual(loader.refresh().added, {1})
+        self.assertEqual(len(errors), 1)
+        self._write([_record(1), _record(2)])
+        self.assertEqual(loader.refresh().added, {2})
+
+    def test_malformed_file(self):
+        for text in ('', '{"students": [{"unique_id": 1}', '[]', '{"students": [{"unique_id": 1},]}'):
+            with self.subTest(text=text):
+                with open(self._file_path, 'wt', encoding='utf-8') as output_file:
+                    output_file.write(text)
+                with self.assertRaises(json.JSONDecodeError):
+                    IncrementalStudentsLoader(self._file_path).refresh()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,538 @@
+"""
+Проверки чтения и записи студентов. Запуск из каталога lab_1:
+    python -m pytest test_students_reader_task.py
+"""
+from datetime import date, datetime
+import contextlib
+import inspect
+import io
+import json
+import os.path
+import random
+import tempfile
+import unittest
+
+from students_reader_task import Student, LabWorkSession, LabWorkSessionBase, LabWorkSessionsStore, \
+    NO_DATE_ORDINAL, save_students_binary, load_students_binary, _iter_json_array, load_students_many, \
+    write_students_json, write_students_csv, load_students_json, load_students_csv, student_to_compact, _csv_field, \
+    iter_students_json, LoadErrors, iter_students_csv, _load_student, parse_session_date, session_date_cache_info, \
+    SESSION_DATE_FORMAT, LoadAbortedError
+
+
+def _make_students(n_students: int = 3):
+    students = []
+    for unique_id in range(n_students):
+        student = Student(unique_id, f"Имя{unique_id}", f"Фамилия{unique_id}", 6400, 1)
+        student.append_lab_work_session(LabWorkSession(True, 1, 4, date(2023, 9, 15)))
+        students.append(student)
+    return students
+
+
+class LabWorkSessionViewTest(unittest.TestCase):
+    def setUp(self):
+        self._student = _make_students(1)[0]
+        self._student.append_lab_work_session(LabWorkSession(False, -1, -1, date(2023, 9, 22)))
+
+    def test_matches_session(self):
+        sessions = [LabWorkSession(True, 1, 4, date(2023, 9, 15)), LabWorkSession(False, -1, -1, date(2023, 9, 22))]
+        views = list(self._student.lab_work_sessions)
+        self.assertEqual([str(view) for view in views], [str(session) for session in sessions])
+        self.assertEqual(str(self._student.lab_work_session(-1)), str(sessions[1]))
+        with self.assertRaises(IndexError):
+            self._student.lab_work_session(2)
+
+    def test_setters_write_to_store(self):
+        view = self._student.lab_work_session(0)
+        view.lab_work_mark = 5
+        view.lab_work_number = 3
+        with self._student.session_records as records:
+            self.assertEqual(records.tolist()[:4], [1, 3, 5, date(2023, 9, 15).toordinal()])
+        with self.assertRaises(ValueError):
+            self._student.lab_work_session(1).lab_work_mark = 5
+
+    def test_store_records(self):
+        store = LabWorkSessionsStore()
+        store.append(LabWorkSession(True, 2, 5, date(2023, 9, 15)))
+        store.append_values(False, -1, -1, NO_DATE_ORDINAL)
+        copy = LabWorkSessionsStore()
+        copy.extend_records(store.records)
+        copy.extend_records(store.records.tobytes())
+        self.assertEqual(len(copy), 4)
+        self.assertEqual(list(copy.iter_values())[:2], [(1, 2, 5, date(2023, 9, 15).toordinal()),
+                                                        (0, -1, -1, NO_DATE_ORDINAL)])
+        self.assertIsNone(copy[-1].lab_work_date)
+        self.assertEqual(str(copy[2]), str(store[0]))
+        with self.assertRaises(IndexError):
+            copy[4]
+
+    def test_view_has_only_own_slots(self):
+        view = self._student.lab_work_session(0)
+        self.assertIsInstance(view, LabWorkSessionBase)
+        self.assertNotIsInstance(view, LabWorkSession)
+        self.assertFalse(hasattr(view, '__dict__'))
+        self.assertEqual([slot for cls in type(view).__mro__ for slot in getattr(cls, '__slots__', ())],
+                         ['_store', '_index'])
+
+
+class ParseSessionDateTest(unittest.TestCase):
+    def test_matches_strptime(self):
+        texts = [f"{day}:{month}:{year}" for day in ('1', '01', '9', '15', '28', '31')
+                 for month in ('1', '02', '9', '12') for year in ('00', '23', '68', '69', '99')]
+        texts += ['29:2:24', '7:07:7', '007:1:23', '1:1:2023', ' 1:1:23', '15.9.23', '31:4:23', '29:2:23', '0:1:23',
+                  '1:13:23', '1::23', '', 'a:b:c', '１:1:23']
+        for text in texts:
+            with self.subTest(text=text):
+                try:
+                    expected = datetime.strptime(text, SESSION_DATE_FORMAT).date()
+                except ValueError:
+                    with self.assertRaises(ValueError):
+                        parse_session_date(text)
+                else:
+                    self.assertEqual(parse_session_date(text), expected)
+
+    def test_results_are_cached(self):
+        parse_session_date.cache_clear()
+        for _ in range(3):
+            for text in ('15:9:23', '22:9:23'):
+                parse_session_date(text)
+        info = session_date_cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (4, 2, 2))
+
+
+class StudentsSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._file_path = os.path.join(self._tmp_dir.name, 'students.bin')
+        save_students_binary(self._file_path, _make_students())
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        students = _make_students(4)
+        students[1] = Student(1, "Имя ✓", "Фамилия\n", 6401, 2)
+        students[2].append_lab_work_session(LabWorkSession(False, -1, -1, None))
+        file_path = os.path.join(self._tmp_dir.name, 'round_trip.bin')
+        save_students_binary(file_path, iter(students))
+        with load_students_binary(file_path) as snapshot:
+            self.assertEqual(len(snapshot), 4)
+            self.assertEqual(snapshot.sessions_count, 4)
+            self.assertEqual([student_to_compact(student) for student in snapshot],
+                             [student_to_compact(student) for student in students])
+            self.assertEqual(str(snapshot[-1]), str(students[-1]))
+            with self.assertRaises(IndexError):
+                snapshot[4]
+        self.assertIsNone(load_students_binary(os.path.join(self._tmp_dir.name, 'missing.bin')))
+
+    def test_not_a_snapshot(self):
+        file_path = os.path.join(self._tmp_dir.name, 'students.json')
+        write_students_json(file_path, _make_students())
+        with self.assertRaises(ValueError):
+            load_students_binary(file_path)
+        with open(file_path, 'wb') as output_file:
+            output_file.write(b'STDB')
+        with self.assertRaises(ValueError):
+            load_students_binary(file_path)
+
+    def test_close_with_referenced_sessions_buffer(self):
+        snapshot = load_students_binary(self._file_path)
+        buffer = snapshot.sessions_buffer()
+        self.assertEqual(len(buffer), 3 * 16)
+        snapshot.close()
+        snapshot.close()
+        with self.assertRaises(ValueError):
+            buffer.tobytes()
+        with self.assertRaises(ValueError):
+            snapshot.sessions_buffer()
+
+    def test_with_block_with_referenced_sessions_buffer(self):
+        with load_students_binary(self._file_path) as snapshot:
+            buffer = snapshot.sessions_buffer()
+            self.assertEqual(snapshot[1].unique_id, 1)
+        snapshot.close()
+        del buffer
+
+
+class FromTrustedRowsTest(unittest.TestCase):
+    @staticmethod
+    def _columns(n_rows: int, seed: int):
+        rng = random.Random(seed)
+        names = [rng.choice(["Имя", "", None, 5, "Другое имя"]) for _ in range(n_rows)]
+        surnames = [rng.choice(["Фамилия", "", "Ещё"]) for _ in range(n_rows)]
+        groups = [rng.choice([6400, 6401, 0, -1, "6400", 6400.0]) for _ in range(n_rows)]
+        subgroups = [rng.choice([1, 2, 0]) for _ in range(n_rows)]
+        counts = [rng.randrange(4) for _ in range(n_rows)]
+        day = date(2023, 9, 15).toordinal()
+        sessions = [rng.choice([[1, 1, 4, day], [1, 2, -1, day], [0, -1, -1, day], [0, -1, -1, NO_DATE_ORDINAL],
+                                [0, 3, -1, day], [1, -1, 5, day], [1, 2, 5, NO_DATE_ORDINAL], [2, 1, 4, day]])
+                    for _ in range(sum(counts))]
+        return list(range(n_rows)), names, surnames, groups, subgroups, counts, sessions
+
+    @staticmethod
+    def _one_by_one(unique_ids, names, surnames, groups, subgroups, counts, sessions):
+        """
+        Те же студенты, созданные по одному через Student и LabWorkSession с проверками
+        """
+        students, bad_rows, bad_sessions = [], [], []
+        offsets = [0]
+        for count in counts:
+            offsets.append(offsets[-1] + count)
+        for row in range(len(unique_ids)):
+            try:
+                student = Student(unique_ids[row], names[row], surnames[row], groups[row], subgroups[row])
+            except ValueError:
+                student = None
+                bad_rows.append(row)
+            for index in range(offsets[row], offsets[row + 1]):
+                presence, number, mark, ordinal = sessions[index]
+                try:
+                    if presence not in (0, 1):
+                        raise ValueError(presence)
+                    session = LabWorkSession(bool(presence), number, mark,
+                                             None if ordinal == NO_DATE_ORDINAL else date.fromordinal(ordinal))
+                except ValueError:
+                    bad_sessions.append(index)
+                    continue
+                if student is not None:
+                    student.append_lab_work_session(session)
+            if student is not None:
+                students.append(student)
+        return students, bad_rows, bad_sessions
+
+    def test_matches_validated_construction(self):
+        import numpy as np
+        for n_rows, seed in ((0, 0), (1, 1), (50, 2), (500, 3)):
+            columns = self._columns(n_rows, seed)
+            expected, bad_rows, bad_sessions = self._one_by_one(*columns)
+            unique_ids, names, surnames, groups, subgroups, counts, sessions = columns
+            for as_arrays in (False, True):
+                with self.subTest(n_rows=n_rows, as_arrays=as_arrays):
+                    arguments = list(columns)
+                    if as_arrays:
+                        arguments[0] = np.array(unique_ids)
+                        arguments[5] = np.array(counts)
+                        arguments[6] = np.array(sessions, dtype=np.int32).reshape(-1, 4)
+                    result = Student.from_trusted_rows(*arguments)
+                    self.assertEqual([student_to_compact(student) for student in result.students],
+                                     [student_to_compact(student) for student in expected])
+                    self.assertEqual(result.bad_rows.tolist(), bad_rows)
+                    self.assertEqual(result.bad_sessions.tolist(), bad_sessions)
+
+    def test_integer_array_columns(self):
+        import numpy as np
+        result = Student.from_trusted_rows(np.arange(3), ["Имя"] * 3, ["Фамилия"] * 3, np.array([6400, 0, 6401]),
+                                           np.array([1, 1, -2]))
+        self.assertEqual([student.unique_id for student in result.students], [0])
+        self.assertEqual(result.bad_rows.tolist(), [1, 2])
+        self.assertEqual(result.bad_sessions.tolist(), [])
+        self.assertEqual(list(result.students[0].lab_work_sessions), [])
+
+    def test_sessions_without_session_counts(self):
+        with self.assertRaisesRegex(ValueError, "Student::from_trusted_rows error"):
+            Student.from_trusted_rows([1], ["Имя"], ["Фамилия"], [6400], [1], sessions=[[1, 1, 4, 20230915]])
+
+    def test_length_mismatch_messages(self):
+        with self.assertRaisesRegex(ValueError, "2 unique_ids for 1 rows"):
+            Student.from_trusted_rows([1, 2], ["Имя"], ["Фамилия"], [6400], [1])
+        with self.assertRaisesRegex(ValueError, "1 names, 1 surnames, 2 groups, 1 subgroups"):
+            Student.from_trusted_rows([1], ["Имя"], ["Фамилия"], [6400, 6401], [1])
+        with self.assertRaisesRegex(ValueError, "1 counts for 1 rows, 2 sessions counted, 1 passed"):
+            Student.from_trusted_rows([1], ["Имя"], ["Фамилия"], [6400], [1], session_counts=[2],
+                                      sessions=[[1, 1, 4, 20230915]])
+
+
+class WritersRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._students = _make_students(5)
+        self._students[1] = Student(1, 'Имя; с "кавычками"', 'Фамилия\r\nс переводом\rстроки', 6401, 2)
+        self._students[1].append_lab_work_session(LabWorkSession(False, -1, -1, date(2023, 9, 16)))
+        self._students[1].append_lab_work_session(LabWorkSession(True, 2, 5, date(2023, 10, 1)))
+        self._students[3] = Student(3, "Имя\n", "\rФамилия", 6400, 1)
+        self._students[3].append_lab_work_session(LabWorkSession(True, 1, 3, date(2023, 9, 15)))
+        self._students[4] = Student(4, "Имя", "Фамилия", 6400, 1)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        expected = [student_to_compact(student) for student in self._students]
+        # студент без занятий не попадает в csv: строка csv - это занятие
+        expected_csv = [compact for compact, student in zip(expected, self._students)
+                        if list(student.lab_work_sessions)]
+        for writer, loader, file_name, students_expected in (
+                (write_students_json, load_students_json, 'students.json', expected),
+                (write_students_csv, load_students_csv, 'students.csv', expected_csv)):
+            file_path = os.path.join(self._tmp_dir.name, file_name)
+            for buffer_size in (1, 7, 1 << 16):
+                with self.subTest(writer=writer.__name__, buffer_size=buffer_size):
+                    writer(file_path, iter(self._students), buffer_size=buffer_size)
+                    self.assertEqual([student_to_compact(student) for student in loader(file_path)],
+                                     students_expected)
+
+    def test_csv_field_quoting(self):
+        self.assertEqual(_csv_field('Имя'), 'Имя')
+        for value in ('a;b', 'a"b', 'a\nb', 'a\rb'):
+            with self.subTest(value=value):
+                self.assertEqual(_csv_field(value), '"' + value.replace('"', '""') + '"')
+
+
+def _baseline_load_students_csv(file_path: str):
+    """
+    Исходный load_students_csv: файл читается целиком, на каждого студента ровно четыре строки подряд
+    """
+    with open(file_path, 'rt', encoding='utf-8') as input_file:
+        lines = input_file.readlines()
+    headers = lines[0].strip().split(';')
+    lab_session = [dict(zip(headers[5:], line.strip().split(';')[5:])) for line in lines[1:]]
+    students = []
+    for first, line in enumerate(lines[1::4]):
+        student_dict = dict(zip(headers[:5], line.replace('"', "").split(';')[:5]))
+        student_dict['lab_works_sessions'] = lab_session[first * 4: first * 4 + 4]
+        students.append(_load_student(student_dict))
+    return students
+
+
+class CsvStreamTest(unittest.TestCase):
+    HEADER = 'unique_id;name;surname;group;subgroup;date;presence;lab_work_n;lab_work_mark\n'
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._file_path = os.path.join(self._tmp_dir.name, 'students.csv')
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _write(self, text: str):
+        with open(self._file_path, 'wt', encoding='utf-8', newline='') as output_file:
+            output_file.write(text)
+
+    def test_matches_baseline(self):
+        file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'students.csv')
+        errors = LoadErrors()
+        self.assertEqual([str(student) for student in iter_students_csv(file_path, errors)],
+                         [str(student) for student in _baseline_load_students_csv(file_path)])
+        self.assertEqual(len(errors), 0)
+
+    def test_rows_are_grouped_by_consecutive_unique_id(self):
+        self._write(self.HEADER +
+                    '1;Имя;Фамилия;6400;1;15:9:23;1;1;5\n'
+                    '\n'
+                    '1;Имя;Фамилия;6400;1;22:9:23;0;-1;-1\n'
+                    '2;"Имя; два";Фамилия;6401;2;"15:9:23";1;1;4\n'
+                    '1;Имя;Фамилия;6400;1;29:9:23;1;2;3\n')
+        students = iter_students_csv(self._file_path, LoadErrors())
+        self.assertTrue(inspect.isgenerator(students))
+        students = list(students)
+        self.assertEqual([(student.unique_id, len(list(student.lab_work_sessions))) for student in students],
+                         [(1, 2), (2, 1), (1, 1)])
+        self.assertEqual(students[1].name, "Имя; два")
+
+    def test_invalid_rows_are_reported(self):
+        self._write(self.HEADER +
+                    '1;Имя;Фамилия;не число;1;15:9:23;1;1;5\n'
+                    '2;Имя;Фамилия;6400;1;15:9:23;1;1;5\n'
+                    '2;Имя;Фамилия;6400;1;32:9:23;1;2;5\n'
+                    '3;Имя;Фамилия;6400;1;15:9:23;1;1;5\n')
+        errors = LoadErrors()
+        students = list(iter_students_csv(self._file_path, errors))
+        self.assertEqual([(student.unique_id, len(list(student.lab_work_sessions))) for student in students],
+                         [(2, 1), (3, 1)])
+        self.assertEqual(errors.counts, {"ValueError": 2})
+
+    def test_empty_files(self):
+        for text in ('', self.HEADER, self.HEADER + '\n\n'):
+            with self.subTest(text=text):
+                self._write(text)
+                self.assertEqual(load_students_csv(self._file_path), [])
+        self.assertIsNone(load_students_csv(os.path.join(self._tmp_dir.name, 'missing.csv')))
+
+
+class LoadErrorsTest(unittest.TestCase):
+    def test_counts_and_samples(self):
+        errors = LoadErrors(samples_per_kind=2)
+        for index in range(3):
+            errors.report(ValueError(f"ошибка {index}"), f"unique_id {index}")
+        errors.report(KeyError("date"))
+        self.assertEqual(len(errors), 4)
+        self.assertEqual(errors.counts, {"ValueError": 3, "KeyError": 1})
+        self.assertEqual(errors.samples["ValueError"], ["unique_id 0: ошибка 0", "unique_id 1: ошибка 1"])
+        self.assertEqual(str(errors).splitlines(),
+                         ["ValueError: 3", "\tunique_id 0: ошибка 0", "\tunique_id 1: ошибка 1", "KeyError: 1",
+                          "\t'date'"])
+
+    def test_loaders_abort_after_max_errors(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, 'students.csv')
+            with open(file_path, 'wt', encoding='utf-8') as output_file:
+                output_file.write(CsvStreamTest.HEADER + ''.join(f'{unique_id};Имя;Фамилия;0;1;15:9:23;1;1;5\n'
+                                                                 for unique_id in range(10)))
+            errors = LoadErrors(max_errors=3)
+            with self.assertRaises(LoadAbortedError) as context:
+                load_students_csv(file_path, errors)
+            self.assertIs(context.exception.errors, errors)
+            self.assertEqual(errors.total, 4)
+
+            errors = LoadErrors(max_errors=10)
+            self.assertEqual(load_students_csv(file_path, errors), [])
+            self.assertEqual(errors.counts, {"ValueError": 10})
+
+    def test_print_errors_is_the_default(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, 'students.json')
+            with open(file_path, 'wt', encoding='utf-8') as output_file:
+                json.dump({"students": [{"unique_id": 1, "name": "Имя"}]}, output_file, ensure_ascii=False)
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                self.assertEqual(load_students_json(file_path), [])
+            self.assertIn("surname", output.getvalue())
+
+
+class LoadStudentsManyTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        first = _make_students(3)
+        second = _make_students(4)[1:]
+        for student in second:
+            student.name = "Другое"
+            student.append_lab_work_session(LabWorkSession(True, 2, 5, date(2023, 9, 22)))
+        self._file_paths = [os.path.join(self._tmp_dir.name, 'first.json'),
+                            os.path.join(self._tmp_dir.name, 'second.csv')]
+        write_students_json(self._file_paths[0], first)
+        write_students_csv(self._file_paths[1], second)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _load(self, file_paths, merge_policy="last"):
+        results = [load_students_many(file_paths, workers=workers, merge_policy=merge_policy) for workers in (1, 2)]
+        self.assertEqual([[str(student) for student in result.students] for result in results[1:]],
+                         [[str(student) for student in results[0].students]])
+        self.assertEqual([report[:2] + report[3:] for report in results[1].reports],
+                         [report[:2] + report[3:] for report in results[0].reports])
+        return results[0]
+
+    def test_merge_policies(self):
+        expected = {
+            "last": [("Имя0", 1), ("Другое", 2), ("Другое", 2), ("Другое", 2)],
+            "first": [("Имя0", 1), ("Имя1", 1), ("Имя2", 1), ("Другое", 2)],
+            "merge": [("Имя0", 1), ("Имя1", 3), ("Имя2", 3), ("Другое", 2)],
+        }
+        for merge_policy, students in expected.items():
+            with self.subTest(merge_policy=merge_policy):
+                result = self._load(self._file_paths, merge_policy)
+                self.assertEqual([(student.name, len(list(student.lab_work_sessions))) for student in result.students],
+                                 students)
+                self.assertEqual([report.students_count for report in result.reports], [3, 3])
+                self.assertEqual(result.failed, [])
+
+    def test_matches_sequential_loads(self):
+        bundled = [os.path.join(os.path.dirname(os.path.abspath(__file__)), file_name)
+                   for file_name in ('students.json', 'students.csv')]
+        file_paths = bundled + self._file_paths
+        expected = {}
+        for file_path in file_paths:
+            loader = load_students_json if file_path.endswith('.json') else load_students_csv
+            for student in loader(file_path):
+                expected[student.unique_id] = str(student)
+        result = self._load(file_paths)
+        self.assertEqual([str(student) for student in result.students], list(expected.values()))
+        self.assertEqual(result.failed, [])
+
+    def test_unknown_merge_policy(self):
+        with self.assertRaises(ValueError):
+            load_students_many(self._file_paths, merge_policy="newest")
+
+    def test_missing_and_unreadable_files_are_reported(self):
+        missing = os.path.join(self._tmp_dir.name, 'missing.json')
+        result = self._load([self._file_paths[0], missing, self._tmp_dir.name])
+        self.assertEqual([student.unique_id for student in result.students], [0, 1, 2])
+        self.assertEqual([report.file_path for report in result.failed], [missing, self._tmp_dir.name])
+        self.assertEqual(result.failed[0].error, "file not found")
+        self.assertIn("IsADirectoryError", result.failed[1].error)
+        self.assertIsNone(result.reports[0].error)
+
+
+class JsonStreamReaderTest(unittest.TestCase):
+    DOCUMENT = '{"a": 1.5e10, "b": -12345, "c": [0.25, 1E-3, true, null], "d": "x y", ' \
+               '"students": [{"unique_id": 123456789, "mark": 4.75}, 2.5e+3, -0.001, 17], "e": 98765}'
+
+    def test_every_chunk_size(self):
+        expected = json.loads(self.DOCUMENT)["students"]
+        for chunk_size in range(1, len(self.DOCUMENT) + 1):
+            with self.subTest(chunk_size=chunk_size):
+                items = list(_iter_json_array(io.StringIO(self.DOCUMENT), "students", chunk_size))
+                self.assertEqual(items, expected)
+
+    def test_every_chunk_size_with_raw(self):
+        for chunk_size in range(1, len(self.DOCUMENT) + 1):
+            with self.subTest(chunk_size=chunk_size):
+                for value, raw in _iter_json_array(io.StringIO(self.DOCUMENT), "students", chunk_size, with_raw=True):
+                    self.assertEqual(json.loads(raw), value)
+
+
+class IterStudentsJsonTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._file_path = os.path.join(self._tmp_dir.name, 'students.json')
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    @staticmethod
+    def _record(unique_id: int, name: str, group="6400") -> dict:
+        return {"unique_id": unique_id, "name": name, "surname": "Фамилия", "group": group, "subgroup": 1,
+                "lab_works_sessions": [{"presence": 1, "lab_work_n": 1, "lab_work_mark": 5, "date": "15:09:23"}]}
+
+    @staticmethod
+    def _baseline_load_students_json(file_path: str):
+        """
+        Исходный load_students_json: файл разбирается целиком через json.load, при повторе остаётся последний
+        """
+        with open(file_path, 'rt', encoding='utf-8') as input_file:
+            students_list = json.load(input_file).get("students", [])
+        students_raw = {}
+        for student_data in students_list:
+            if student_data.get("unique_id") is not None:
+                students_raw[student_data["unique_id"]] = _load_student(student_data)
+        return list(students_raw.values())
+
+    def test_load_matches_baseline(self):
+        bundled = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'students.json')
+        records = [self._record(unique_id % 4, f"Имя {unique_id}") for unique_id in range(10)]
+        records.insert(3, {"name": "без unique_id"})
+        with open(self._file_path, 'wt', encoding='utf-8') as output_file:
+            json.dump({"before": {"students": []}, "students": records, "after": [1, 2]}, output_file,
+                      ensure_ascii=False, indent=3)
+        for file_path in (bundled, self._file_path):
+            with self.subTest(file_path=os.path.basename(file_path)):
+                self.assertEqual([str(student) for student in load_students_json(file_path, errors=LoadErrors())],
+                                 [str(student) for student in self._baseline_load_students_json(file_path)])
+        students = load_students_json(self._file_path, dedupe=False, errors=LoadErrors())
+        self.assertEqual([student.name for student in students], [f"Имя {unique_id}" for unique_id in range(10)])
+
+    def test_truncated_file_keeps_read_students(self):
+        with open(self._file_path, 'wt', encoding='utf-8') as output_file:
+            output_file.write(json.dumps({"students": [self._record(1, "Первый"), self._record(2, "Второй")]})[:-40])
+        errors = LoadErrors()
+        self.assertEqual([student.unique_id for student in load_students_json(self._file_path, errors=errors)], [1])
+        self.assertEqual(list(errors.counts), ["JSONDecodeError"])
+
+    def test_skip_duplicates_keeps_first_valid_record(self):
+        records = [self._record(1, "Ошибка", group="не число"), self._record(1, "Первый"),
+                   self._record(2, "Второй"), self._record(1, "Повтор")]
+        with open(self._file_path, 'wt', encoding='utf-8') as output_file:
+            json.dump({"students": records}, output_file, ensure_ascii=False)
+        for chunk_size in (1, 16, 1 << 16):
+            with self.subTest(chunk_size=chunk_size):
+                errors = LoadErrors()
+                students = list(iter_students_json(self._file_path, skip_duplicates=True, chunk_size=chunk_size,
+                                                   errors=errors))
+                self.assertEqual([(student.unique_id, student.name) for student in students],
+                                 [(1, "Первый"), (2, "Второй")])
+                self.assertEqual(len(errors), 1)
+                students = list(iter_students_json(self._file_path, chunk_size=chunk_size, errors=LoadErrors()))
+                self.assertEqual([student.name for student in students], ["Первый", "Второй", "Повтор"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Проверки индексов StudentRepository. Запуск из каталога lab_1:
+    python -m pytest test_students_repository.py
+"""
+from datetime import date
+import unittest
+
+from students_reader_task import Student, LabWorkSession
+from students_repository import StudentRepository
+from students_benchmark import make_synthetic_students
+
+DAY = date(2023, 9, 15)
+
+
+def _student(unique_id: int, group: int, subgroup: int, presence: bool) -> Student:
+    student = Student(unique_id, f"Имя{unique_id}", f"Фамилия{unique_id}", group, subgroup)
+    student.append_lab_work_session(LabWorkSession(presence, 1 if presence else -1, 4 if presence else -1, DAY))
+    return student
+
+
+class AbsentOnTest(unittest.TestCase):
+    def setUp(self):
+        self.repository = StudentRepository([_student(1, 6400, 1, False), _student(2, 6400, 2, False),
+                                             _student(3, 6401, 1, False), _student(4, 6400, 1, True)])
+
+    def _ids(self, students):
+        return sorted(student.unique_id for student in students)
+
+    def test_filters(self):
+        self.assertEqual(self._ids(self.repository.absent_on(DAY)), [1, 2, 3])
+        self.assertEqual(self._ids(self.repository.absent_on(DAY, group=6400)), [1, 2])
+        self.assertEqual(self._ids(self.repository.absent_on(DAY, group=6400, subgroup=1)), [1])
+        self.assertEqual(self._ids(self.repository.absent_on(DAY, subgroup=1)), [1, 3])
+        self.assertEqual(self.repository.absent_on(date(2023, 9, 16), group=6400), [])
+
+    def test_appended_and_removed_sessions(self):
+        self.repository.get(4).append_lab_work_session(LabWorkSession(False, -1, -1, DAY))
+        self.assertEqual(self._ids(self.repository.absent_on(DAY, group=6400)), [1, 2, 4])
+        self.repository.remove(1)
+        self.assertEqual(self._ids(self.repository.absent_on(DAY, group=6400)), [2, 4])
+        self.assertEqual(self._ids(student for student, _ in self.repository.sessions_by_lab(-1)), [2, 3, 4])
+
+
+class LinearScanParityTest(unittest.TestCase):
+    def setUp(self):
+        self.students = make_synthetic_students(120, n_sessions=6)
+        self.repository = StudentRepository(self.students)
+
+    @staticmethod
+    def _pairs(pairs):
+        return sorted((student.unique_id, str(session)) for student, session in pairs)
+
+    def _scan_sessions(self, predicate):
+        return self._pairs((student, session) for student in self.students for session in student.lab_work_sessions
+                           if predicate(session))
+
+    def test_queries(self):
+        def ids(students):
+            return sorted(student.unique_id for student in students)
+
+        dates = sorted({session.lab_work_date for student in self.students for session in student.lab_work_sessions})
+        for group in (6400, 6413, 7001):
+            for subgroup in (None, 1, 2):
+                with self.subTest(group=group, subgroup=subgroup):
+                    self.assertEqual(ids(self.repository.by_group(group, subgroup)),
+                                     ids(student for student in self.students if student.group == group and
+                                         subgroup in (None, student.subgroup)))
+                    for day in dates:
+                        self.assertEqual(ids(self.repository.absent_on(day, group, subgroup)),
+                                         ids(student for student in self.students if student.group == group and
+                                             subgroup in (None, student.subgroup) and
+                                             any(not session.presence and session.lab_work_date == day
+                                                 for session in student.lab_work_sessions)))
+        for lab in (-1, 1, 3, 6, 7):
+            with self.subTest(lab=lab):
+                self.assertEqual(self._pairs(self.repository.sessions_by_lab(lab)),
+                                 self._scan_sessions(lambda session: session.lab_work_number == lab))
+                self.assertEqual(ids(self.repository.without_lab(lab)),
+                                 ids(student for student in self.students
+                                     if all(session.lab_work_number != lab for session in student.lab_work_sessions)))
+        for day in dates:
+            with self.subTest(day=day):
+                expected = self._scan_sessions(lambda session: session.lab_work_date == day)
+                self.assertEqual(self._pairs(self.repository.sessions_on(day)), expected)
+                self.assertEqual(self._pairs(self.repository.sessions_on(day.strftime("%d:%m:%y"))), expected)
+
+    def test_replace_student(self):
+        replacement = _student(5, 7000, 1, False)
+        self.repository.add(replacement)
+        self.assertEqual(len(self.repository), 120)
+        self.assertIs(self.repository.get(5), replacement)
+        self.assertEqual([student.unique_id for student in self.repository.by_group(7000)], [5])
+        self.assertNotIn(5, [student.unique_id for student, _ in self.repository.sessions_by_lab(2)])
+        # занятия заменённого студента больше не попадают в индексы
+        self.students[5].append_lab_work_session(LabWorkSession(False, -1, -1, DAY))
+        self.assertEqual([student.unique_id for student in self.repository.absent_on(DAY, 7000)], [5])
+        self.assertIsNone(self.repository.remove(1000))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,644 @@
+"""
+Замеры скорости методов Regression.
+Запуск из каталога lab_2:
+    python regression_benchmark.py
+        сравнения с прежними реализациями
+    python regression_benchmark.py harness --output results.json [--baseline baseline.json] [--threshold 1.25]
+        сетка замеров по n и d с записью в json и сравнением с результатами другой ревизии
+"""
+from collections import namedtuple
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Tuple, Callable, List, Dict, Union, Iterable
+
+import numpy as np
+
+from regression_task import Regression
+
+
+def _distance_field_loop(x: np.ndarray, y: np.ndarray, k: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Прежняя реализация поля расстояний: вызов distance_sum для каждой пары (k, b)
+    """
+    return np.array([[Regression.distance_sum(x, y, k_i, b_i) for k_i in k.flat] for b_i in b.flat])
+
+
+def distance_field_benchmark(n_points: int = 1000000, grid_size: int = 4096, loop_grid_size: int = 32) -> None:
+    print(f"distance field benchmark, points: {n_points}, grid: {grid_size}x{grid_size}")
+    x, y = Regression.test_data_along_line_rng(n_points=n_points, seed=0)
+
+    k = np.linspace(-2.0, 2.0, loop_grid_size)
+    b = np.linspace(-2.0, 2.0, loop_grid_size)
+    t = time.perf_counter()
+    expected = _distance_field_loop(x, y, k, b)
+    t_loop = (time.perf_counter() - t) * (grid_size / loop_grid_size) ** 2
+    assert np.allclose(Regression.distance_field(x, y, k, b), expected)
+
+    k = np.linspace(-2.0, 2.0, grid_size)
+    b = np.linspace(-2.0, 2.0, grid_size)
+    t = time.perf_counter()
+    Regression.distance_field(x, y, k, b)
+    t_vectorized = time.perf_counter() - t
+
+    print(f"       python loop: {t_loop:.1f} s (extrapolated from {loop_grid_size}x{loop_grid_size})")
+    print(f"        vectorized: {t_vectorized:.3f} s")
+
+
+def generators_benchmark(n_points: int = 10000000, loop_n_points: int = 100000) -> None:
+    print(f"test data generators benchmark, points: {n_points}")
+    for name, loop_generator, rng_generator in (
+            ("along line", Regression.test_data_along_line, Regression.test_data_along_line_rng),
+            ("surface 2d", Regression.second_order_surface_2d, Regression.second_order_surface_2d_rng),
+            ("plane 2d", Regression.test_data_2d, Regression.test_data_2d_rng),
+            ("plane nd", Regression.test_data_nd, Regression.test_data_nd_rng)):
+        t = time.perf_counter()
+        loop_generator(n_points=loop_n_points)
+        t_loop = (time.perf_counter() - t) * n_points / loop_n_points
+        t = time.perf_counter()
+        rng_generator(n_points=n_points, seed=0)
+        t_rng = time.perf_counter() - t
+        print(f"{name:>12}: python loop {t_loop:.2f} s (extrapolated), numpy generator {t_rng:.3f} s")
+
+
+def _n_linear_regression_loop(data_rows: np.ndarray) -> np.ndarray:
+    """
+    Прежняя реализация n_linear_regression: отдельный np.dot для каждой пары столбцов
+    """
+    rows, cols = data_rows.shape
+    hessian = np.zeros((cols, cols,), dtype=float)
+    grad = np.zeros((cols,), dtype=float)
+    x_0 = np.zeros((cols,), dtype=float)
+    cols -= 1
+    for row in range(cols):
+        x_0[row] = 1.0
+        for col in range(row + 1):
+            hessian[row, col] = np.dot(data_rows[:, row], data_rows[:, col])
+            hessian[col, row] = hessian[row, col]
+    for i in range(cols + 1):
+        hessian[i, cols] = np.sum(data_rows[:, i])
+        hessian[cols, i] = hessian[i, cols]
+    hessian[cols, cols] = data_rows.shape[0]
+    for row in range(cols):
+        grad[row] = np.sum(hessian[row, 0: cols]) - np.dot(data_rows[:, cols], data_rows[:, row])
+    grad[cols] = np.sum(hessian[cols, 0: cols]) - np.sum(data_rows[:, cols])
+    return x_0 + np.linalg.solve(hessian, -grad)
+
+
+def n_linear_regression_benchmark(dimensions: Tuple[int, ...] = (10, 100, 500),
+                                  n_points: Tuple[int, ...] = (100000, 1000000, 10000000),
+                                  max_data_bytes: int = 1 << 30, loop_n_points: int = 20000) -> None:
+    """
+    Сравнение n_linear_regression с прежней реализацией.
+    Сочетания, для которых данные занимают больше max_data_bytes, пропускаются;
+    время прежней реализации экстраполируется с loop_n_points точек.
+    """
+    print("n linear regression benchmark")
+    for n_dims in dimensions:
+        surf_settings = np.linspace(-1.0, 1.0, n_dims + 1)
+        data = Regression.test_data_nd_rng(surf_settings, n_points=loop_n_points, seed=0)
+        t = time.perf_counter()
+        expected = _n_linear_regression_loop(data)
+        t_loop = (time.perf_counter() - t) / loop_n_points
+        assert np.allclose(Regression.n_linear_regression(data), expected)
+        for n in n_points:
+            if n * (n_dims + 1) * 8 > max_data_bytes:
+                print(f"  d: {n_dims:>4}, n: {n:>9}: skipped, data exceeds {max_data_bytes >> 20} Mb")
+                continue
+            data = Regression.test_data_nd_rng(surf_settings, n_points=n, seed=0)
+            t = time.perf_counter()
+            coefficients = Regression.n_linear_regression(data)
+            t_gram = time.perf_counter() - t
+            assert np.allclose(coefficients, surf_settings, atol=1e-2)
+            print(f"  d: {n_dims:>4}, n: {n:>9}: column pairs loop {t_loop * n:8.2f} s (extrapolated), "
+                  f"gram matrix {t_gram:.3f} s")
+            del data
+
+
+def write_synthetic_npy(file_path: str, n_points: int, n_dims: int, block_rows: int = 1 << 18) -> None:
+    """
+    Записывает .npy файл со строками [x_0,...,x_n, z] блоками, не держа весь массив в памяти
+    """
+    surf_settings = np.linspace(-1.0, 1.0, n_dims + 1)
+    rng = Regression.make_rng(0)
+    data = np.lib.format.open_memmap(file_path, mode='w+', dtype=np.float64, shape=(n_points, n_dims + 1))
+    for first in range(0, n_points, block_rows):
+        block = data[first: first + block_rows]
+        Regression.test_data_nd_rng(surf_settings, n_points=block.shape[0], seed=rng, out=block)
+    data.flush()
+    del data
+
+
+def _read_file(file_path: str, buffer_size: int = 1 << 24) -> int:
+    """
+    Последовательное чтение файла в буфер: оценка пропускной способности диска
+    """
+    buffer = bytearray(buffer_size)
+    total = 0
+    with open(file_path, 'rb', buffering=0) as input_file:
+        while True:
+            size = input_file.readinto(buffer)
+            if not size:
+                return total
+            total += size
+
+
+def _peak_rss() -> int:
+    """
+    Пиковый RSS текущего процесса в КБ. ru_maxrss наследуется через exec от родителя,
+    поэтому по возможности берётся VmHWM
+    """
+    try:
+        with open('/proc/self/status', 'rt') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _measure_in_child(func: Callable, file_path: str, queue) -> None:
+    t = time.perf_counter()
+    func(file_path)
+    t = time.perf_counter() - t
+    queue.put((t, _peak_rss()))
+
+
+def measure_peak_rss(func: Callable, file_path: str) -> Tuple[float, int]:
+    """
+    Запускает func(file_path) в отдельном процессе и возвращает (время, пиковый RSS в КБ)
+    """
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_measure_in_child, args=(func, file_path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def npy_regression_benchmark(n_points: int = 10000000, n_dims: int = 20) -> None:
+    """
+    Регрессия по .npy файлу через отображение в память: время, пропускная способность и пиковый RSS
+    в сравнении с простым чтением файла и с загрузкой массива целиком.
+    """
+    print(f"npy regression benchmark, points: {n_points}, dimensions: {n_dims}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, 'data.npy')
+        write_synthetic_npy(file_path, n_points, n_dims)
+        size = os.path.getsize(file_path)
+        print(f"file size: {size / 2 ** 20:.1f} MB")
+        for name, func in (("read file", _read_file),
+                           ("np.load + n_linear", _n_linear_regression_in_memory),
+                           ("n_linear npy", Regression.n_linear_regression_npy)):
+            elapsed, max_rss = measure_peak_rss(func, file_path)
+            print(f"{name:>20}: {elapsed:.3f} s, {size / 2 ** 20 / elapsed:8.1f} MB/s, "
+                  f"peak rss {max_rss / 1024:.1f} MB")
+
+
+def _n_linear_regression_in_memory(file_path: str) -> np.ndarray:
+    return Regression.n_linear_regression(np.load(file_path))
+
+
+def batch_regression_benchmark(batch: int = 100000, n_points: int = 50) -> None:
+    """
+    Пачка независимых линейных и билинейных регрессий: цикл по наборам против batch-методов
+    на массивах (batch, n) и на одномерных массивах с offsets (наборы разной длины)
+    """
+    print(f"batch regression benchmark, fits: {batch}, points per fit: {n_points}")
+    rng = Regression.make_rng(0)
+    x = rng.random((batch, n_points))
+    y = rng.random((batch, n_points))
+    z = 2.0 * x - 3.0 * y + 1.0 + 0.1 * rng.random((batch, n_points))
+    counts = rng.integers(n_points // 2, 2 * n_points, batch)
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    x_flat, y_flat, z_flat = (rng.random(counts.sum()) for _ in range(3))
+
+    for name, loop, stacked, ragged in (
+            ("linear",
+             lambda: [Regression.linear_regression(x[i], z[i]) for i in range(batch)],
+             lambda: Regression.linear_regression_batch(x, z),
+             lambda: Regression.linear_regression_batch(x_flat, z_flat, offsets)),
+            ("bi linear",
+             lambda: [Regression.bi_linear_regression(x[i], y[i], z[i]) for i in range(batch)],
+             lambda: Regression.bi_linear_regression_batch(x, y, z),
+             lambda: Regression.bi_linear_regression_batch(x_flat, y_flat, z_flat, offsets))):
+        timings = []
+        for func in (loop, stacked, ragged):
+            t = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - t)
+        print(f"{name:>10}: python loop {timings[0]:.3f} s, (batch, n) {timings[1]:.3f} s, "
+              f"ragged {timings[2]:.3f} s")
+
+
+def _poly_regression_vandermonde(x: np.ndarray, y: np.ndarray, order: int) -> np.ndarray:
+    """
+    Прежняя реализация poly_regression: полная матрица степеней и lstsq
+    """
+    return np.linalg.lstsq(np.column_stack([x ** i for i in range(order + 1)]), y, rcond=None)[0]
+
+
+def _polynom_vandermonde(x: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.dot(np.column_stack([x ** i for i in range(len(b))]), b)
+
+
+def _measure(func: Callable, *args):
+    """
+    (результат, время, пик памяти по tracemalloc в МБ)
+    """
+    tracemalloc.start()
+    t = time.perf_counter()
+    result = func(*args)
+    t = time.perf_counter() - t
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, t, peak / 2 ** 20
+
+
+def poly_regression_benchmark(n_points: int = 10000000, order: int = 30, vandermonde_n_points: int = 1000000) -> None:
+    """
+    Полиномиальная регрессия высокого порядка: полная матрица степеней (на vandermonde_n_points точках)
+    против poly_fit и вычисления по схемам Кленшоу и Горнера
+    """
+    print(f"poly regression benchmark, order: {order}")
+    rng = Regression.make_rng(0)
+    for n in (vandermonde_n_points, n_points):
+        x = rng.uniform(-3.0, 5.0, n)
+        y = np.sin(x) + 0.01 * rng.standard_normal(n)
+        if n <= vandermonde_n_points:
+            b, t_fit, peak_fit = _measure(_poly_regression_vandermonde, x, y, order)
+            y_, t_eval, peak_eval = _measure(_polynom_vandermonde, x, b)
+            print(f"  n: {n:>9}, vandermonde: fit {t_fit:.3f} s / {peak_fit:.1f} MB, "
+                  f"eval {t_eval:.3f} s / {peak_eval:.1f} MB, max error {np.abs(y_ - np.sin(x)).max():.2e}")
+        fit, t_fit, peak_fit = _measure(Regression.poly_fit, x, y, order)
+        y_, t_eval, peak_eval = _measure(fit, x)
+        print(f"  n: {n:>9},    poly_fit: fit {t_fit:.3f} s / {peak_fit:.1f} MB, "
+              f"eval {t_eval:.3f} s / {peak_eval:.1f} MB, max error {np.abs(y_ - np.sin(x)).max():.2e}")
+        b = fit.monomial()
+        _, t_eval, peak_eval = _measure(Regression.polynom, x, b)
+        print(f"  n: {n:>9},      horner: eval {t_eval:.3f} s / {peak_eval:.1f} MB")
+        del x, y, y_
+
+
+def _quadratic_regression_2d_loop(x: np.ndarray, y: np.ndarray, z: np.ndarray) -> np.ndarray:
+    """
+    Прежняя реализация quadratic_regression_2d: отдельная сумма для каждой ячейки матрицы 6x6
+    """
+    b = np.array([np.sum(x ** 2 * z), np.sum(x * y * z), np.sum(y ** 2 * z), np.sum(x * z), np.sum(y * z), np.sum(z)])
+    d = np.column_stack([x ** 2, x * y, y ** 2, x, y, np.ones_like(x)])
+    a = np.zeros((6, 6))
+    for i in range(6):
+        for j in range(6):
+            a[i, j] = np.sum(d[:, i] * d[:, j])
+    return np.linalg.solve(a, b)
+
+
+def surface_regression_benchmark(n_points: int = 10000000, degrees: Tuple[int, ...] = (2, 4)) -> None:
+    """
+    quadratic_regression_2d: прежняя реализация против одного прохода D^T * D в float64 и float32,
+    плюс поверхности более высокой степени
+    """
+    print(f"surface regression benchmark, points: {n_points}")
+    x, y, z = Regression.second_order_surface_2d_rng(n_points=n_points, seed=0)
+    expected, t_loop, peak_loop = _measure(_quadratic_regression_2d_loop, x, y, z)
+    print(f"      cells loop: {t_loop:.3f} s, {peak_loop:.1f} MB")
+    for degree in degrees:
+        for dtype in (np.float64, np.float32):
+            args = (x, y, z) if dtype == np.float64 else (x.astype(dtype), y.astype(dtype), z.astype(dtype))
+            coefficients, t, peak = _measure(Regression.surface_regression_2d, *args, degree)
+            if degree == 2:
+                assert np.allclose(coefficients, expected, atol=1e-3)
+            print(f"  degree {degree} {np.dtype(dtype).name}: {t:.3f} s, {peak:.1f} MB")
+
+
+def _select_poly_order_refit(x: np.ndarray, y: np.ndarray, orders: range, folds: int) -> int:
+    """
+    Перебор порядков с обучением каждого порядка на каждом фолде заново через poly_fit
+    """
+    parts = np.array_split(Regression.make_rng(0).permutation(x.size), folds)
+    errors = []
+    for order in orders:
+        error = 0.0
+        for fold in range(folds):
+            train = np.concatenate(parts[:fold] + parts[fold + 1:])
+            fit = Regression.poly_fit(x[train], y[train], order)
+            error += np.mean((fit(x[parts[fold]]) - y[parts[fold]]) ** 2)
+        errors.append(error / folds)
+    return orders[int(np.argmin(errors))]
+
+
+def poly_order_selection_benchmark(n_points: int = 1000000, max_order: int = 20, folds: int = 5) -> None:
+    print(f"poly order selection benchmark, points: {n_points}, orders: 0..{max_order}, folds: {folds}")
+    rng = Regression.make_rng(0)
+    x = rng.uniform(-3.0, 5.0, n_points)
+    y = np.sin(x) + 0.1 * rng.standard_normal(n_points)
+    orders = range(max_order + 1)
+    t = time.perf_counter()
+    order = _select_poly_order_refit(x, y, orders, folds)
+    print(f"      refit each order: {time.perf_counter() - t:.3f} s, order {order}")
+    for workers in (1, None):
+        t = time.perf_counter()
+        selection = Regression.select_poly_order(x, y, orders, folds, workers=workers)
+        elapsed = time.perf_counter() - t
+        fold_times = ', '.join(f"{fold_time:.3f}" for fold_time in selection.fold_times)
+        print(f"  shared gram, workers {workers or os.cpu_count()}: {elapsed:.3f} s, order {selection.order}, "
+              f"folds: {fold_times} s")
+
+
+def ridge_path_benchmark(n_points: int = 1000000, n_dims: int = 50, n_lambdas: int = 100) -> None:
+    """
+    Путь гребневой регрессии из n_lambdas значений: одна обычная регрессия, путь через одно разложение
+    и отдельная регрессия для каждого λ с пересчётом матрицы Грама
+    """
+    print(f"ridge path benchmark, points: {n_points}, dimensions: {n_dims}, lambdas: {n_lambdas}")
+    rng = Regression.make_rng(0)
+    data = Regression.test_data_nd_rng(np.linspace(-1.0, 1.0, n_dims + 1), n_points=n_points, seed=rng)
+    weights = rng.random(n_points)
+    lambdas = np.logspace(-3.0, 3.0, n_lambdas)
+    for name, func in (("single fit", lambda: Regression.n_linear_regression(data, weights)),
+                       ("path", lambda: Regression.n_linear_regression_ridge(data, lambdas, weights)),
+                       ("fit per lambda", lambda: [Regression.n_linear_regression_ridge(data, lam, weights)
+                                                   for lam in lambdas[:10]])):
+        t = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - t
+        if name == "fit per lambda":
+            elapsed *= n_lambdas / 10
+            name += " (extrapolated)"
+        print(f"{name:>30}: {elapsed:.3f} s")
+
+
+IMPORT_TIME_MODULES = (("regression_task", os.path.dirname(os.path.abspath(__file__))),
+                       ("log_regression", os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lab_3')))
+# модули, которых не должно быть среди импортированных при импорте численных модулей
+IMPORT_TIME_FORBIDDEN = ("matplotlib",)
+# число запусков интерпретатора при замере времени импорта, в результаты идёт медиана
+IMPORT_TIME_REPEATS = 7
+
+
+def measure_import_time(module: str, cwd: str) -> Tuple[float, List[str]]:
+    """
+    Импортирует module в новом интерпретаторе с -X importtime.
+    Возвращает (суммарное время импорта module в мс, список всех импортированных модулей)
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=cwd, capture_output=True, text=True, check=True)
+    cumulative, imported = 0.0, []
+    # строки вида "import time:       self [us] |  cumulative | imported package"
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or line.endswith("imported package"):
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        imported.append(name.strip())
+        if name.strip() == module:
+            cumulative = int(cumulative_us) / 1000.0
+    return cumulative, imported
+
+
+def measure_import_time_median(module: str, cwd: str, repeats: int = IMPORT_TIME_REPEATS) -> Tuple[float, List[str]]:
+    """
+    Медиана времени импорта module (в мс) по repeats запускам measure_import_time
+    и список импортированных модулей последнего запуска
+    """
+    samples, imported = [], []
+    for _ in range(max(1, repeats)):
+        cumulative, imported = measure_import_time(module, cwd)
+        samples.append(cumulative)
+    return float(np.median(samples)), imported
+
+
+def import_time_benchmark() -> bool:
+    """
+    Время импорта численных модулей и проверка, что они не импортируют matplotlib.
+    Возвращает False, если проверка не прошла.
+    """
+    print("import time benchmark")
+    passed = True
+    for module, cwd in IMPORT_TIME_MODULES:
+        cumulative, imported = measure_import_time(module, cwd)
+        forbidden = sorted({name for name in imported if name.split('.')[0] in IMPORT_TIME_FORBIDDEN})
+        passed &= not forbidden
+        print(f"{module:>16}: {cumulative:.1f} ms, {len(imported)} modules"
+              f"{', imports ' + ', '.join(forbidden[:3]) if forbidden else ''}")
+    return passed
+
+
+HARNESS_SEED = 0
+HARNESS_REPEATS = 3
+HARNESS_SIZES = (10000, 100000, 1000000)
+HARNESS_DIMENSIONS = (2, 10, 30)
+HARNESS_DISTANCE_FIELD_GRID = 256
+# во сколько раз время может вырасти относительно базовых результатов, прежде чем замер считается замедлением
+DEFAULT_SLOWDOWN_THRESHOLD = 1.25
+# то же для времени импорта: запуск интерпретатора шумит сильнее численных замеров
+DEFAULT_IMPORT_SLOWDOWN_THRESHOLD = 1.5
+# замеры быстрее этого времени (в секундах) слишком шумные, чтобы судить о замедлении
+DEFAULT_MIN_COMPARED_TIME = 1e-3
+
+
+class BenchmarkCase(namedtuple("BenchmarkCase", "name, sweeps_d, setup, run")):
+    """
+    Замер харнесса: setup(n, d, rng) готовит аргументы, run(*args) - замеряемый вызов.
+    Если sweeps_d ложно, замер выполняется один раз для каждого n, а d задаёт сам setup.
+    """
+
+    def __new__(cls, **args):
+        return super(BenchmarkCase, cls).__new__(cls, **args)
+
+
+def _poly_setup(n: int, d: int, rng: np.random.Generator):
+    x, y = Regression.test_data_along_line_rng(n_points=n, seed=rng)
+    return x, y, d
+
+
+def _distance_field_setup(n: int, d: int, rng: np.random.Generator):
+    x, y = Regression.test_data_along_line_rng(n_points=n, seed=rng)
+    grid = np.linspace(-2.0, 2.0, HARNESS_DISTANCE_FIELD_GRID)
+    return x, y, grid, grid
+
+
+HARNESS_CASES = (
+    BenchmarkCase(name="linear_regression", sweeps_d=False,
+                  setup=lambda n, d, rng: Regression.test_data_along_line_rng(n_points=n, seed=rng),
+                  run=Regression.linear_regression),
+    BenchmarkCase(name="bi_linear_regression", sweeps_d=False,
+                  setup=lambda n, d, rng: Regression.test_data_2d_rng(n_points=n, seed=rng),
+                  run=Regression.bi_linear_regression),
+    BenchmarkCase(name="n_linear_regression", sweeps_d=True,
+                  setup=lambda n, d, rng: (Regression.test_data_nd_rng(np.linspace(-1.0, 1.0, d + 1),
+                                                                       n_points=n, seed=rng),),
+                  run=Regression.n_linear_regression),
+    BenchmarkCase(name="poly_regression", sweeps_d=True, setup=_poly_setup, run=Regression.poly_regression),
+    BenchmarkCase(name="quadratic_regression_2d", sweeps_d=False,
+                  setup=lambda n, d, rng: Regression.second_order_surface_2d_rng(n_points=n, seed=rng),
+                  run=Regression.quadratic_regression_2d),
+    BenchmarkCase(name="distance_field", sweeps_d=False, setup=_distance_field_setup, run=Regression.distance_field),
+)
+
+
+def _case_dimension(case: BenchmarkCase, d: int) -> int:
+    """
+    d, под которым замер записывается в результаты
+    """
+    if case.sweeps_d:
+        return d
+    return {"linear_regression": 1, "distance_field": HARNESS_DISTANCE_FIELD_GRID}.get(case.name, 2)
+
+
+def measure_call(run: Callable, args: tuple, repeats: int = HARNESS_REPEATS) -> Dict[str, Union[float, int]]:
+    """
+    Замер одного вызова run(*args) после прогревочного:
+    time - лучшее время из repeats вызовов (без tracemalloc),
+    peak_bytes - пик памяти, выделенной во время вызова (tracemalloc),
+    allocations - число блоков памяти, выделенных во время вызова, по снимку tracemalloc сразу после вызова,
+    пока на результат ещё есть ссылка. tracemalloc запускается непосредственно перед вызовом,
+    поэтому блоки, выделенные до него, в снимок не попадают
+    """
+    run(*args)
+    times = []
+    for _ in range(max(1, repeats)):
+        t = time.perf_counter()
+        run(*args)
+        times.append(time.perf_counter() - t)
+
+    tracemalloc.start()
+    try:
+        result = run(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del result
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+    allocations = sum(stat.count for stat in snapshot.statistics('filename'))
+    return {"time": min(times), "peak_bytes": peak, "allocations": allocations}
+
+
+def _revision() -> Union[str, None]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def run_harness(sizes: Iterable[int] = HARNESS_SIZES, dimensions: Iterable[int] = HARNESS_DIMENSIONS,
+                repeats: int = HARNESS_REPEATS, cases: Iterable[BenchmarkCase] = HARNESS_CASES,
+                seed: int = HARNESS_SEED) -> dict:
+    """
+    Замеры всех cases для всех n из sizes (и d из dimensions для cases со sweeps_d).
+    Данные каждого замера генерируются заново из seed, поэтому результаты воспроизводимы.
+    Время импорта численных модулей (медиана по IMPORT_TIME_REPEATS запускам) записывается отдельными замерами с n = d = 0.
+    :return: словарь {"meta": {...}, "results": [{"name", "n", "d", "time", "peak_bytes", "allocations"}, ...]}
+    """
+    results = []
+    for case in cases:
+        for n in sizes:
+            for d in (dimensions if case.sweeps_d else (None,)):
+                args = case.setup(n, d, Regression.make_rng(seed))
+                record = {"name": case.name, "n": n, "d": _case_dimension(case, d)}
+                record.update(measure_call(case.run, args, repeats))
+                results.append(record)
+                print(f"{record['name']:>24} n={n:<9} d={record['d']:<5} {record['time'] * 1e3:10.3f} ms "
+                      f"peak {record['peak_bytes'] / 2 ** 20:9.2f} MB  allocations {record['allocations']}")
+                del args
+    for module, cwd in IMPORT_TIME_MODULES:
+        cumulative, imported = measure_import_time_median(module, cwd)
+        forbidden = sorted({name for name in imported if name.split('.')[0] in IMPORT_TIME_FORBIDDEN})
+        results.append({"name": f"import {module}", "n": 0, "d": 0, "time": cumulative / 1000.0,
+                        "peak_bytes": None, "allocations": None, "forbidden_imports": forbidden})
+        print(f"{'import ' + module:>24} {cumulative:.1f} ms{', imports ' + ', '.join(forbidden[:3]) if forbidden else ''}")
+    return {"meta": {"revision": _revision(), "python": platform.python_version(), "numpy": np.__version__,
+                     "platform": platform.platform(), "seed": seed, "repeats": repeats},
+            "results": results}
+
+
+def compare_results(current: dict, baseline: dict, threshold: float = DEFAULT_SLOWDOWN_THRESHOLD,
+                    min_time: float = DEFAULT_MIN_COMPARED_TIME,
+                    import_threshold: float = DEFAULT_IMPORT_SLOWDOWN_THRESHOLD) -> List[str]:
+    """
+    Сравнивает время замеров с базовыми по (name, n, d).
+    Возвращает описания замеров, время которых выросло больше чем в threshold раз
+    (для замеров импорта - в import_threshold раз; если хотя бы одно из времён меньше min_time, замер не оценивается),
+    и замеров импорта, потянувших запрещённые модули
+    """
+    baseline_times = {(record["name"], record["n"], record["d"]): record["time"] for record in baseline["results"]}
+    failures = []
+    for record in current["results"]:
+        key = (record["name"], record["n"], record["d"])
+        if record.get("forbidden_imports"):
+            failures.append(f"{record['name']}: imports {', '.join(record['forbidden_imports'])}")
+        base_time = baseline_times.get(key)
+        if not base_time:
+            continue
+        ratio = record["time"] / base_time
+        limit = import_threshold if record["name"].startswith("import ") else threshold
+        slowdown = ratio > limit and min(record["time"], base_time) >= min_time
+        print(f"{record['name']:>24} n={record['n']:<9} d={record['d']:<5} x{ratio:.2f}"
+              f"{'  SLOWDOWN' if slowdown else ''}")
+        if slowdown:
+            failures.append(f"{record['name']} n={record['n']} d={record['d']}: "
+                            f"{base_time * 1e3:.3f} ms -> {record['time'] * 1e3:.3f} ms (x{ratio:.2f})")
+    return failures
+
+
+def harness_main(args: argparse.Namespace) -> int:
+    results = run_harness(args.sizes, args.dimensions, args.repeats, seed=args.seed)
+    if args.output:
+        with open(args.output, 'wt', encoding='utf-8') as output_file:
+            json.dump(results, output_file, indent=2)
+    if not args.baseline:
+        return 0
+    with open(args.baseline, 'rt', encoding='utf-8') as baseline_file:
+        failures = compare_results(results, json.load(baseline_file), args.threshold, args.min_time,
+                                   args.import_threshold)
+    for failure in failures:
+        print(f"FAILED {failure}")
+    return 1 if failures else 0
+
+
+def demo_main() -> int:
+    if not import_time_benchmark():
+        sys.exit("numeric modules import matplotlib at module level")
+    distance_field_benchmark()
+    generators_benchmark()
+    n_linear_regression_benchmark()
+    npy_regression_benchmark()
+    batch_regression_benchmark()
+    poly_regression_benchmark()
+    surface_regression_benchmark()
+    poly_order_selection_benchmark()
+    ridge_path_benchmark()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regression benchmarks")
+    parser.add_argument("mode", nargs="?", choices=("demo", "harness"), default="demo",
+                        help="demo - comparisons with previous implementations, harness - n/d sweep with json output")
+    parser.add_argument("--output", metavar="FILE", help="write harness results to FILE as json")
+    parser.add_argument("--baseline", metavar="FILE", help="compare harness results with json results from FILE")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_SLOWDOWN_THRESHOLD,
+                        help="fail when time / baseline time exceeds this value")
+    parser.add_argument("--import-threshold", type=float, default=DEFAULT_IMPORT_SLOWDOWN_THRESHOLD,
+                        help="fail when import time / baseline import time exceeds this value")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_COMPARED_TIME,
+                        help="do not judge measurements faster than this many seconds")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(HARNESS_SIZES), help="values of n")
+    parser.add_argument("--dimensions", type=int, nargs="+", default=list(HARNESS_DIMENSIONS),
+                        help="values of d (dimensions for n_linear_regression, order for poly_regression)")
+    parser.add_argument("--repeats", type=int, default=HARNESS_REPEATS, help="timed calls per measurement")
+    parser.add_argument("--seed", type=int, default=HARNESS_SEED, help="seed for generated data")
+    arguments = parser.parse_args()
+    sys.exit(harness_main(arguments) if arguments.mode == "harness" else demo_main())
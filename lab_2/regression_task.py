@@ -1,11 +1,32 @@
 from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
-import matplotlib.pyplot as plt
-from typing import Tuple, Union
+from typing import Tuple, Union, Iterator, List, Iterable
 import numpy as np
+import argparse
 import random
+import mmap
+import time
+import sys
+import os
 
-from matplotlib import cm
+# общие для лабораторных модули лежат в lab_common в корне репозитория
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lab_common.plotting import set_headless, pyplot as _pyplot, show as _show  # noqa: E402
+
+
+@lru_cache(maxsize=None)
+def _solve_triangular():
+    """
+    scipy.linalg.solve_triangular или None, если SciPy не установлен.
+    SciPy импортируется при первом решении нормальных уравнений, а не при импорте модуля.
+    """
+    try:
+        from scipy.linalg import solve_triangular
+    except ImportError:
+        return None
+    return solve_triangular
 
 
 class DataGenerator(namedtuple("DataGenerator", "dimension, args_min, args_max, args_step, generator_func")):
@@ -13,6 +34,65 @@ class DataGenerator(namedtuple("DataGenerator", "dimension, args_min, args_max,
         return super(DataGenerator, cls).__new__(cls, **args)
 
 
+class PolynomialFit(namedtuple("PolynomialFit", "coefficients, shift, scale")):
+    """
+    Полином, найденный Regression.poly_fit: y = Σ c_i * T_i(t), где T_i - многочлены Чебышёва,
+    а t = (x - shift) / scale - аргумент, приведённый к отрезку [-1, 1].
+    В таком базисе система хорошо обусловлена и при высоких порядках.
+    """
+
+    def __new__(cls, **args):
+        return super(PolynomialFit, cls).__new__(cls, **args)
+
+    @property
+    def order(self) -> int:
+        return self.coefficients.size - 1
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        """
+        Значения полинома в точках x (схема Кленшоу, матрица базиса не строится)
+        """
+        return Regression.chebyshev_series(x, self.coefficients, self.shift, self.scale)
+
+    def monomial(self) -> np.ndarray:
+        """
+        Коэффициенты bi того же полинома в виде y = Σx^i*bi.
+        При высоких порядках они плохо обусловлены, для вычислений лучше использовать сам PolynomialFit.
+        """
+        in_t = np.polynomial.chebyshev.cheb2poly(self.coefficients)
+        # подстановка t = (x - shift) / scale по схеме Горнера над многочленами
+        result = np.array([in_t[-1]])
+        for coefficient in in_t[-2::-1]:
+            shifted = np.zeros(result.size + 1)
+            shifted[1:] = result / self.scale
+            shifted[:-1] -= result * (self.shift / self.scale)
+            shifted[0] += coefficient
+            result = shifted
+        return result
+
+
+class PolyOrderSelection(namedtuple("PolyOrderSelection", "order, orders, errors, fold_errors, fold_times, fit")):
+    """
+    Результат Regression.select_poly_order:
+    order - лучший порядок, orders - проверенные порядки, errors - средняя по фолдам ошибка (MSE) для каждого порядка,
+    fold_errors - ошибки по фолдам (folds x orders), fold_times - время обработки каждого фолда в секундах,
+    fit - PolynomialFit лучшего порядка по всем данным
+    """
+
+    def __new__(cls, **args):
+        return super(PolyOrderSelection, cls).__new__(cls, **args)
+
+
+# размер блока строк для временных массивов в генераторах тестовых данных
+GENERATOR_BLOCK_SIZE = 1 << 16
+# объём блока расширенной матрицы [X, 1, z] при построении матрицы Грама, байт
+GRAM_BLOCK_BYTES = 1 << 24
+# число обусловленности нормальных уравнений, выше которого вместо Холецкого используется lstsq
+NORMAL_EQUATIONS_MAX_CONDITION = 1e12
+# размер блока строк при построении признаков в RegressionAccumulator.partial_fit
+FEATURES_BLOCK_SIZE = 1 << 16
+
+
 class Regression:
     def __new__(cls, *args, **kwargs):
         raise RuntimeError("Regression class is static class")
@@ -101,6 +181,159 @@ class Regression:
         data[:, n_dims] += dz
         return data
 
+    @staticmethod
+    def make_rng(seed: Union[int, np.random.Generator, None] = None) -> np.random.Generator:
+        """
+        Генератор случайных чисел NumPy: seed - число, готовый генератор или None (случайное зерно)
+        """
+        if isinstance(seed, np.random.Generator):
+            return seed
+        return np.random.default_rng(seed)
+
+    @staticmethod
+    def _uniform_bounds(rand_range: Union[float, Tuple[float, float]]) -> Tuple[float, float]:
+        """
+        Границы равномерного распределения с тем же смыслом rand_range, что и у rand_in_range:
+        float - (-0.5 * rand_range, 0.5 * rand_range), кортеж - (rand_range[0], rand_range[1]), иначе (-0.5, 0.5)
+        """
+        if isinstance(rand_range, float):
+            return -0.5 * rand_range, 0.5 * rand_range
+        if isinstance(rand_range, tuple):
+            return rand_range[0], rand_range[1]
+        return -0.5, 0.5
+
+    @staticmethod
+    def _fill_uniform(rng: np.random.Generator, out: np.ndarray,
+                      rand_range: Union[float, Tuple[float, float]]) -> np.ndarray:
+        """
+        Заполняет out равномерным шумом с тем же смыслом rand_range, что и у rand_in_range
+        """
+        low, high = Regression._uniform_bounds(rand_range)
+        rng.random(dtype=out.dtype, out=out)
+        out *= high - low
+        out += low
+        return out
+
+    @staticmethod
+    def _prepare_out(out: Union[np.ndarray, None], shape: Tuple[int, ...], dtype) -> np.ndarray:
+        if out is None:
+            return np.empty(shape, dtype=dtype)
+        if out.shape != shape or out.dtype != np.dtype(dtype) or not out.flags.c_contiguous:
+            raise ValueError(f"Regression::out buffer error... expected contiguous {np.dtype(dtype)} array of shape "
+                             f"{shape}, got {out.dtype} array of shape {out.shape}")
+        return out
+
+    @staticmethod
+    def test_data_along_line_rng(k: float = 1.0, b: float = 0.1, arg_range: float = 1.0,
+                                 rand_range: float = 0.05, n_points: int = 100,
+                                 seed: Union[int, np.random.Generator, None] = None, dtype=np.float64,
+                                 out: Union[Tuple[np.ndarray, np.ndarray], None] = None) -> \
+            Tuple[np.ndarray, np.ndarray]:
+        """
+        То же, что test_data_along_line, но массивы заполняются целиком через numpy.random.Generator.
+        :param seed: зерно или генератор для воспроизводимости
+        :param dtype: тип элементов (float32 или float64)
+        :param out: пара буферов (x, y) формы (n_points,), в которые записывается результат
+        :return: кортеж значений по x и y
+        """
+        rng = Regression.make_rng(seed)
+        x = Regression._prepare_out(None if out is None else out[0], (n_points,), dtype)
+        y = Regression._prepare_out(None if out is None else out[1], (n_points,), dtype)
+        step = arg_range / max(n_points - 1, 1)
+        for i in range(0, n_points, GENERATOR_BLOCK_SIZE):
+            x_b = x[i: i + GENERATOR_BLOCK_SIZE]
+            x_b[:] = np.arange(i, i + x_b.size)
+            x_b *= step
+        Regression._fill_uniform(rng, y, rand_range)
+        y += b
+        Regression._add_scaled(y, k, x)
+        return x, y
+
+    @staticmethod
+    def second_order_surface_2d_rng(surf_params:
+    Tuple[float, float, float, float, float, float] = (1.0, -2.0, 3.0, 1.0, 2.0, -3.0),
+                                    args_range: float = 1.0, rand_range: float = .1, n_points: int = 1000,
+                                    seed: Union[int, np.random.Generator, None] = None, dtype=np.float64,
+                                    out: Union[Tuple[np.ndarray, np.ndarray, np.ndarray], None] = None) -> \
+            Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        То же, что second_order_surface_2d, но массивы заполняются целиком через numpy.random.Generator.
+        :param seed: зерно или генератор для воспроизводимости
+        :param dtype: тип элементов (float32 или float64)
+        :param out: тройка буферов (x, y, z) формы (n_points,), в которые записывается результат
+        :return: кортеж значений по x, y и z
+        """
+        rng = Regression.make_rng(seed)
+        x, y, z = (Regression._prepare_out(None if out is None else out[i], (n_points,), dtype) for i in range(3))
+        Regression._fill_uniform(rng, x, args_range)
+        Regression._fill_uniform(rng, y, args_range)
+        Regression._fill_uniform(rng, z, rand_range)
+        a, b, c, d, e, f = surf_params
+        z += f
+        for i in range(0, n_points, GENERATOR_BLOCK_SIZE):
+            x_b, y_b = x[i: i + GENERATOR_BLOCK_SIZE], y[i: i + GENERATOR_BLOCK_SIZE]
+            z[i: i + GENERATOR_BLOCK_SIZE] += (a * x_b + b * y_b + d) * x_b + (c * y_b + e) * y_b
+        return x, y, z
+
+    @staticmethod
+    def test_data_2d_rng(kx: float = -2.0, ky: float = 2.0, b: float = 12.0, args_range: float = 1.0,
+                         rand_range: float = 1.0, n_points: int = 100,
+                         seed: Union[int, np.random.Generator, None] = None, dtype=np.float64,
+                         out: Union[Tuple[np.ndarray, np.ndarray, np.ndarray], None] = None) -> \
+            Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        То же, что test_data_2d, но массивы заполняются целиком через numpy.random.Generator.
+        :param seed: зерно или генератор для воспроизводимости
+        :param dtype: тип элементов (float32 или float64)
+        :param out: тройка буферов (x, y, z) формы (n_points,), в которые записывается результат
+        :returns: кортеж значенией по x, y и z
+        """
+        rng = Regression.make_rng(seed)
+        x, y, z = (Regression._prepare_out(None if out is None else out[i], (n_points,), dtype) for i in range(3))
+        Regression._fill_uniform(rng, x, args_range)
+        Regression._fill_uniform(rng, y, args_range)
+        Regression._fill_uniform(rng, z, rand_range)
+        z += b
+        Regression._add_scaled(z, kx, x)
+        Regression._add_scaled(z, ky, y)
+        return x, y, z
+
+    @staticmethod
+    def test_data_nd_rng(surf_settings: np.ndarray = np.array([1.0, 2.0, 3.0, 4.0, 5.0, 12.0]),
+                         args_range: float = 1.0, rand_range: float = 0.1, n_points: int = 125,
+                         seed: Union[int, np.random.Generator, None] = None, dtype=np.float64,
+                         out: Union[np.ndarray, None] = None) -> np.ndarray:
+        """
+        То же, что test_data_nd, но массив заполняется целиком через numpy.random.Generator.
+        :param seed: зерно или генератор для воспроизводимости
+        :param dtype: тип элементов (float32 или float64)
+        :param out: буфер формы (n_points, surf_settings.size), в который записывается результат
+        :returns: массив из строк вида x_0, x_1,...,x_n, f(x_0, x_1,...,x_n)
+        """
+        rng = Regression.make_rng(seed)
+        n_dims = surf_settings.size - 1
+        data = Regression._prepare_out(out, (n_points, n_dims + 1), dtype)
+        args_low, args_high = Regression._uniform_bounds(args_range)
+        rand_low, rand_high = Regression._uniform_bounds(rand_range)
+        rng.random(dtype=data.dtype, out=data)
+        data[:, :n_dims] *= args_high - args_low
+        data[:, :n_dims] += args_low
+        data[:, n_dims] *= rand_high - rand_low
+        data[:, n_dims] += surf_settings[n_dims] + rand_low
+        weights = np.asarray(surf_settings[:n_dims], dtype=dtype)
+        for i in range(0, n_points, GENERATOR_BLOCK_SIZE):
+            block = data[i: i + GENERATOR_BLOCK_SIZE]
+            block[:, n_dims] += block[:, :n_dims] @ weights
+        return data
+
+    @staticmethod
+    def _add_scaled(out: np.ndarray, scale: float, values: np.ndarray) -> None:
+        """
+        out += scale * values блоками, чтобы временные массивы не зависели от размера данных
+        """
+        for i in range(0, out.size, GENERATOR_BLOCK_SIZE):
+            out[i: i + GENERATOR_BLOCK_SIZE] += scale * values[i: i + GENERATOR_BLOCK_SIZE]
+
     @staticmethod
     def distance_sum(x: np.ndarray, y: np.ndarray, k: float, b: float) -> float:
         """
@@ -112,7 +345,7 @@ class Regression:
         :param b: значение параметра b (смещение)
         :returns: F(k, b) = (Σ(yi -(k * xi + b))^2)^0.5
         """
-        return np.sqrt(np.power((y - x * k + b), 2.0).sum())
+        return np.sqrt(np.power((y - x * k - b), 2.0).sum())
 
     @staticmethod
     def distance_field(x: np.ndarray, y: np.ndarray, k: np.ndarray, b: np.ndarray) -> np.ndarray:
@@ -120,13 +353,69 @@ class Regression:
         Вычисляет сумму квадратов расстояний от набора точек до линии вида y = k*x + b, где k и b являются диапазонами
         значений. Формула расстояния для j-ого значения из набора k и k-ого значения из набора b:
         F(k_j, b_k) = (Σ(yi -(k_j * xi + b_k))^2)^0.5 (суммирование по i)
+        Сумма раскладывается через суммы по центрированным данным xci = xi - x̄, yci = yi - ȳ:\n
+        Σ(yi -(k * xi + b))^2 = Σyci^2 - 2 * k * Σxci*yci + k^2 * Σxci^2 + n * (b + k * x̄ - ȳ)^2,\n
+        поэтому после одного прохода по данным каждая ячейка поля считается за O(1).
         :param x: массив значений по x
         :param y: массив значений по y
         :param k: массив значений параметра k (наклоны)
         :param b: массив значений параметра b (смещения)
         :returns: поле расстояний вида F(k, b) = (Σ(yi -(k * xi + b))^2)^0.5 (суммирование по i)
         """
-        return np.array([[Regression.distance_sum(x, y, k_i, b_i) for k_i in k.flat] for b_i in b.flat])
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        x_mean, y_mean = x.mean(), y.mean()
+        x_c = x - x_mean
+        y_c = y - y_mean
+        sum_xx, sum_xy, sum_yy = np.dot(x_c, x_c), np.dot(x_c, y_c), np.dot(y_c, y_c)
+
+        k_row = np.asarray(k, dtype=float).reshape(1, -1)
+        b_col = np.asarray(b, dtype=float).reshape(-1, 1)
+        shift = b_col + (k_row * x_mean - y_mean)
+        field = (sum_yy - 2.0 * sum_xy * k_row + sum_xx * k_row * k_row) + x.size * shift * shift
+        # из-за округления квадрат может оказаться чуть меньше нуля
+        return np.sqrt(np.maximum(field, 0.0, out=field), out=field)
+
+    @staticmethod
+    def distance_field_tiled(x: np.ndarray, y: np.ndarray, k: np.ndarray, b: np.ndarray,
+                             tile_size: int = 256, points_chunk: int = 65536) -> np.ndarray:
+        """
+        То же поле расстояний, что и distance_field, с ограниченными временными массивами.
+        Центрированные суммы Σxci^2, Σxci*yci, Σyci^2 считаются за два прохода по точкам кусками по points_chunk,
+        затем поле по той же формуле за O(1) на ячейку заполняется плитками tile_size x tile_size,
+        поэтому кроме результата память ограничена размерами куска и плитки.
+        :param tile_size: размер плитки поля по k и b
+        :param points_chunk: число точек, обрабатываемых за раз
+        :returns: поле расстояний вида F(k, b) = (Σ(yi -(k * xi + b))^2)^0.5 (суммирование по i)
+        """
+        x = np.asarray(x).ravel()
+        y = np.asarray(y).ravel()
+        k = np.asarray(k, dtype=float).ravel()
+        b = np.asarray(b, dtype=float).ravel()
+        tile_size = max(1, tile_size)
+        points_chunk = max(1, points_chunk)
+        n = x.size
+        x_mean = sum(float(x[i: i + points_chunk].sum(dtype=float)) for i in range(0, n, points_chunk)) / n
+        y_mean = sum(float(y[i: i + points_chunk].sum(dtype=float)) for i in range(0, n, points_chunk)) / n
+        sum_xx = sum_xy = sum_yy = 0.0
+        for i in range(0, n, points_chunk):
+            # python float не повышает тип float32 массива, поэтому тип результата задаётся явно
+            x_c = np.subtract(x[i: i + points_chunk], x_mean, dtype=float)
+            y_c = np.subtract(y[i: i + points_chunk], y_mean, dtype=float)
+            sum_xx += float(np.dot(x_c, x_c))
+            sum_xy += float(np.dot(x_c, y_c))
+            sum_yy += float(np.dot(y_c, y_c))
+
+        field = np.empty((b.size, k.size), dtype=float)
+        for b_0 in range(0, b.size, tile_size):
+            b_col = b[b_0: b_0 + tile_size, np.newaxis]
+            for k_0 in range(0, k.size, tile_size):
+                k_row = k[np.newaxis, k_0: k_0 + tile_size]
+                tile = field[b_0: b_0 + tile_size, k_0: k_0 + tile_size]
+                shift = b_col + (k_row * x_mean - y_mean)
+                tile[:] = (sum_yy - 2.0 * sum_xy * k_row + sum_xx * k_row * k_row) + n * shift * shift
+                np.sqrt(np.maximum(tile, 0.0, out=tile), out=tile)
+        return field
 
     @staticmethod
     def linear_regression(x: np.ndarray, y: np.ndarray) -> Tuple[float, float]:
@@ -260,7 +549,200 @@ class Regression:
         return result
 
     @staticmethod
-    def n_linear_regression(data_rows: np.ndarray) -> np.ndarray:
+    def _root_weights(weights: Union[np.ndarray, None], size: int) -> Union[np.ndarray, None]:
+        """
+        Проверяет веса точек и возвращает sqrt(weights): умножение строк на них даёт взвешенные суммы
+        """
+        if weights is None:
+            return None
+        weights = np.asarray(weights, dtype=float).ravel()
+        if weights.size != size:
+            raise ValueError(f"Regression::weights error... expected {size} weights, got {weights.size}")
+        if np.any(weights < 0.0):
+            raise ValueError("Regression::weights error... weights must be non-negative")
+        return np.sqrt(weights)
+
+    @staticmethod
+    def _ridge_path(gram: np.ndarray, lambdas: np.ndarray) -> np.ndarray:
+        """
+        Гребневая регрессия сразу для набора lambdas по матрице Грама строк [признаки (p), 1, цель].\n
+        Свободный член не штрафуется, поэтому задача решается для центрированных данных:\n
+        S = Σ(xi - x̄)(xi - x̄)^T, s = Σ(xi - x̄)(zi - z̄), (S + λI) * k = s, b = z̄ - (x̄, k),\n
+        где S и s получаются из той же матрицы Грама. Одно разложение S = V * diag(e) * V^T
+        даёт решение для любого λ: k(λ) = V * diag(1 / (e + λ)) * V^T * s.
+        :param gram: матрица Грама размера (p + 2) x (p + 2)
+        :param lambdas: неотрицательные коэффициенты регуляризации
+        :return: массив (lambdas.size, p + 1) из строк [k_0,...,k_(p-1), b]
+        """
+        lambdas = np.asarray(lambdas, dtype=float).ravel()
+        if np.any(lambdas < 0.0):
+            raise ValueError("Regression::ridge error... lambdas must be non-negative")
+        p = gram.shape[0] - 2
+        total_weight = gram[p, p]
+        if total_weight <= 0.0:
+            raise ValueError("Regression::ridge error... no data")
+        mean = gram[p] / total_weight
+        centered = gram[:p, :p] - total_weight * np.outer(mean[:p], mean[:p])
+        rhs = gram[:p, p + 1] - total_weight * mean[:p] * mean[p + 1]
+        eigenvalues, vectors = np.linalg.eigh(centered)
+        eigenvalues = np.maximum(eigenvalues, 0.0)
+        projected = vectors.T @ rhs
+        denominators = eigenvalues[:, np.newaxis] + lambdas[np.newaxis, :]
+        # при λ = 0 и вырожденной S направления с нулевыми собственными числами отбрасываются (минимальная норма)
+        tolerance = max(eigenvalues.max(initial=0.0), 1.0) * p * np.finfo(float).eps
+        inverse = np.divide(1.0, denominators, out=np.zeros_like(denominators), where=denominators > tolerance)
+        coefficients = (vectors @ (projected[:, np.newaxis] * inverse)).T
+        return np.column_stack((coefficients, mean[p + 1] - coefficients @ mean[:p]))
+
+    @staticmethod
+    def _gram_matrix(data_rows: np.ndarray, block_rows: Union[int, None] = None,
+                     weights: Union[np.ndarray, None] = None) -> np.ndarray:
+        """
+        Матрица Грама расширенной матрицы B = [X, 1, z] для строк вида [x_0,x_1,...,x_n, z]:\n
+        M = B^T * B, M[:n+1, :n+1] - матрица нормальных уравнений, M[:n+1, n+1] - их правая часть.\n
+        С весами строк w считается M = B^T * diag(w) * B: строки блока умножаются на sqrt(w).\n
+        Данные проходятся один раз блоками строк, размер блока по умолчанию ограничен GRAM_BLOCK_BYTES.
+        :param data_rows: массив строк вида [x_0,x_1,...,x_n, z]
+        :param block_rows: число строк в блоке
+        :param weights: неотрицательные веса строк или None
+        :return: матрица размера (n + 2) x (n + 2)
+        """
+        rows, cols = data_rows.shape
+        root_weights = Regression._root_weights(weights, rows)
+        dims = cols - 1
+        if block_rows is None:
+            block_rows = GRAM_BLOCK_BYTES // (8 * (cols + 1))
+        block_rows = max(1, min(block_rows, rows))
+        augmented = np.empty((block_rows, cols + 1), dtype=float)
+        augmented[:, dims] = 1.0
+        gram = np.zeros((cols + 1, cols + 1), dtype=float)
+        for first in range(0, rows, block_rows):
+            block = data_rows[first: first + block_rows]
+            size = block.shape[0]
+            augmented[:size, :dims] = block[:, :dims]
+            augmented[:size, dims + 1] = block[:, dims]
+            if root_weights is not None:
+                augmented[:size, dims] = 1.0
+                augmented[:size] *= root_weights[first: first + size, np.newaxis]
+            gram += augmented[:size].T @ augmented[:size]
+        return gram
+
+    @staticmethod
+    def _solve_normal_equations(gram: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+        """
+        Решает симметричную систему нормальных уравнений gram * c = rhs.\n
+        Матрица масштабируется по диагонали и раскладывается по Холецкому: gram = L * L^T,
+        затем решаются треугольные системы L * z = rhs и L^T * c = z: прямой и обратной подстановкой
+        scipy.linalg.solve_triangular, если SciPy установлен, иначе общим np.linalg.solve.
+        Если разложение невозможно или число обусловленности, оценённое по диагонали L,
+        больше NORMAL_EQUATIONS_MAX_CONDITION, решение ищется через lstsq.
+        :param gram: симметричная матрица системы
+        :param rhs: правая часть
+        :return: вектор решения
+        """
+        diagonal = np.diag(gram)
+        if np.all(diagonal > 0.0):
+            scale = 1.0 / np.sqrt(diagonal)
+            try:
+                lower = np.linalg.cholesky(gram * scale[:, np.newaxis] * scale[np.newaxis, :])
+            except np.linalg.LinAlgError:
+                lower = None
+            if lower is not None:
+                lower_diagonal = np.abs(np.diag(lower))
+                if (lower_diagonal.max() / lower_diagonal.min()) ** 2 <= NORMAL_EQUATIONS_MAX_CONDITION:
+                    solve_triangular = _solve_triangular()
+                    if solve_triangular is None:
+                        return scale * np.linalg.solve(lower.T, np.linalg.solve(lower, scale * rhs))
+                    z = solve_triangular(lower, scale * rhs, lower=True, check_finite=False)
+                    return scale * solve_triangular(lower, z, lower=True, trans='T', check_finite=False)
+        return np.linalg.lstsq(gram, rhs, rcond=None)[0]
+
+    @staticmethod
+    def _batch_dot(a: np.ndarray, b: Union[np.ndarray, None], offsets: Union[np.ndarray, None]) -> np.ndarray:
+        """
+        Суммы Σa*b (или Σa, если b равно None) для каждого набора пачки:
+        по строкам массива (batch, n) или по отрезкам одномерного массива, начинающимся с offsets
+        """
+        if offsets is None:
+            return a.sum(axis=-1) if b is None else np.einsum('ij,ij->i', a, b)
+        return np.add.reduceat(a if b is None else a * b, offsets)
+
+    @staticmethod
+    def _batch_counts(size: int, offsets: Union[np.ndarray, None], shape: Tuple[int, ...],
+                      min_count: int) -> Tuple[Union[np.ndarray, None], np.ndarray]:
+        """
+        Проверяет разбиение на наборы и возвращает (offsets, количество точек в каждом наборе)
+        """
+        if offsets is None:
+            if len(shape) != 2:
+                raise ValueError(f"Regression::batch error... expected (batch, n) arrays, got shape {shape}")
+            counts = np.full(shape[0], shape[1], dtype=float)
+        else:
+            offsets = np.asarray(offsets, dtype=np.intp).ravel()
+            counts = np.diff(np.append(offsets, size)).astype(float)
+            if offsets.size == 0 or offsets[0] != 0:
+                raise ValueError("Regression::batch error... offsets must start with 0")
+        if np.any(counts < min_count):
+            raise ValueError(f"Regression::batch error... every data set needs at least {min_count} points")
+        return offsets, counts
+
+    @staticmethod
+    def linear_regression_batch(x: np.ndarray, y: np.ndarray, offsets: Union[np.ndarray, None] = None) -> \
+            Tuple[np.ndarray, np.ndarray]:
+        """
+        linear_regression сразу для пачки независимых наборов точек.
+        Наборы задаются либо строками массивов формы (batch, n), либо отрезками одномерных массивов:
+        набор i - это элементы с offsets[i] по offsets[i + 1] (последний - до конца массива).
+        Суммы всех наборов считаются за один проход, k и b - по тем же формулам, что и в linear_regression.
+        :param x: массив значений по x
+        :param y: массив значений по y
+        :param offsets: начала наборов в одномерных x и y, None для массивов формы (batch, n)
+        :returns: массивы k и b длины batch
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        offsets, n = Regression._batch_counts(x.size, offsets, x.shape, 2)
+        sum_xi = Regression._batch_dot(x, None, offsets)
+        sum_yi = Regression._batch_dot(y, None, offsets)
+        sum_xi_squared = Regression._batch_dot(x, x, offsets)
+        sum_xi_yi = Regression._batch_dot(x, y, offsets)
+        k = (sum_xi_yi - sum_xi * sum_yi / n) / (sum_xi_squared - sum_xi ** 2 / n)
+        b = (sum_yi - k * sum_xi) / n
+        return k, b
+
+    @staticmethod
+    def bi_linear_regression_batch(x: np.ndarray, y: np.ndarray, z: np.ndarray,
+                                   offsets: Union[np.ndarray, None] = None) -> np.ndarray:
+        """
+        bi_linear_regression сразу для пачки независимых наборов точек (см. linear_regression_batch).
+        Для каждого набора составляется система H * (kx, ky, b) = (Σzi*xi, Σzi*yi, Σzi)
+        с той же матрицей Гессе, что и в bi_linear_regression, и все системы решаются одним np.linalg.solve.
+        :param x: массив значений по x
+        :param y: массив значений по y
+        :param z: массив значений по z
+        :param offsets: начала наборов в одномерных x, y и z, None для массивов формы (batch, n)
+        :returns: массив формы (batch, 3) из строк (kx, ky, b)
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        z = np.asarray(z, dtype=float)
+        offsets, n = Regression._batch_counts(x.size, offsets, x.shape, 3)
+        sum_x = Regression._batch_dot(x, None, offsets)
+        sum_y = Regression._batch_dot(y, None, offsets)
+        hessian = np.empty((n.size, 3, 3), dtype=float)
+        hessian[:, 0, 0] = Regression._batch_dot(x, x, offsets)
+        hessian[:, 0, 1] = hessian[:, 1, 0] = Regression._batch_dot(x, y, offsets)
+        hessian[:, 1, 1] = Regression._batch_dot(y, y, offsets)
+        hessian[:, 0, 2] = hessian[:, 2, 0] = sum_x
+        hessian[:, 1, 2] = hessian[:, 2, 1] = sum_y
+        hessian[:, 2, 2] = n
+        rhs = np.stack((Regression._batch_dot(z, x, offsets),
+                        Regression._batch_dot(z, y, offsets),
+                        Regression._batch_dot(z, None, offsets)), axis=-1)
+        return np.linalg.solve(hessian, rhs[..., np.newaxis])[..., 0]
+
+    @staticmethod
+    def n_linear_regression(data_rows: np.ndarray, weights: Union[np.ndarray, None] = None) -> np.ndarray:
         """
         H_ij = Σx_i * x_j, i in [0, rows - 1] , j in [0, rows - 1]
         H_ij = Σx_i, j = rows i in [rows, :]
@@ -276,74 +758,474 @@ class Regression:
         grad = | Σ xi * yi + Σ yi^2    - Σzi * yi|\n
                | Σxi       + Σ yi      - Σzi     |\n
 
+        Решение x_0 - H^-1 * grad совпадает с решением системы H * c = r, где r = | Σzi * xi; Σzi * yi; Σzi |,
+        поэтому H и r берутся из одной матрицы Грама расширенной матрицы [X, 1, z] (см. _gram_matrix).
+
         :param data_rows:  состоит из строк вида: [x_0,x_1,...,x_n, f(x_0,x_1,...,x_n)]
-        :return:
+        :param weights: веса строк (взвешенный МНК) или None
+        :return: коэффициенты [k_0,k_1,...,k_n, b]
         """
-        rows, cols = data_rows.shape
+        gram = Regression._gram_matrix(data_rows, weights=weights)
+        cols = data_rows.shape[1]
+        return Regression._solve_normal_equations(gram[:cols, :cols], gram[:cols, cols])
 
-        hessian = np.zeros((cols, cols,), dtype=float)
-        grad = np.zeros((cols,), dtype=float)
-        x_0 = np.zeros((cols,), dtype=float)
+    @staticmethod
+    def n_linear_regression_ridge(data_rows: np.ndarray, lambdas: Union[float, np.ndarray] = 1.0,
+                                  weights: Union[np.ndarray, None] = None) -> np.ndarray:
+        """
+        Гребневая (ridge) n_linear_regression: Σw_i * (zi - (k, xi) - b)^2 + λ * |k|^2 -> min,
+        свободный член b не штрафуется. Матрица Грама считается один раз, а решения для всех lambdas
+        получаются из одного спектрального разложения (см. _ridge_path), поэтому путь из сотни λ
+        стоит почти как одна регрессия.
+        :param data_rows: состоит из строк вида: [x_0,x_1,...,x_n, f(x_0,x_1,...,x_n)]
+        :param lambdas: коэффициент регуляризации или массив коэффициентов
+        :param weights: веса строк или None
+        :return: коэффициенты [k_0,k_1,...,k_n, b]; для массива lambdas - массив из таких строк
+        """
+        path = Regression._ridge_path(Regression._gram_matrix(data_rows, weights=weights), lambdas)
+        return path[0] if np.ndim(lambdas) == 0 else path
+
+    @staticmethod
+    def _npy_row_blocks(file_path: str, block_rows: Union[int, None] = None) -> Iterator[np.ndarray]:
+        """
+        Блоки строк .npy файла, открытого через np.load(mmap_mode='r').
+        Страницы уже обработанных блоков отдаются системе (madvise), поэтому RSS не растёт с размером файла.
+        :param file_path: путь к .npy файлу с двумерным массивом
+        :param block_rows: число строк в блоке, по умолчанию блок занимает около GRAM_BLOCK_BYTES
+        """
+        data = np.load(file_path, mmap_mode='r')
+        if data.ndim != 2:
+            raise ValueError(f"Regression::npy file error... expected 2d array, got shape {data.shape}")
+        rows, cols = data.shape
+        row_bytes = cols * data.itemsize
+        if block_rows is None:
+            block_rows = GRAM_BLOCK_BYTES // row_bytes
+        block_rows = max(1, block_rows)
+        mapping = getattr(data, '_mmap', None)
+        releasable = mapping is not None and hasattr(mapping, 'madvise') and data.flags.c_contiguous
+        # массив начинается не с начала отображения, а со смещения внутри страницы выравнивания
+        start = data.offset % mmap.ALLOCATIONGRANULARITY if releasable else 0
+        try:
+            for first in range(0, rows, block_rows):
+                yield data[first: first + block_rows]
+                if releasable:
+                    end = (start + min(first + block_rows, rows) * row_bytes) // mmap.PAGESIZE * mmap.PAGESIZE
+                    if end > 0:
+                        mapping.madvise(mmap.MADV_DONTNEED, 0, end)
+        finally:
+            del data
+
+    @staticmethod
+    def n_linear_regression_npy(file_path: str, block_rows: Union[int, None] = None) -> np.ndarray:
+        """
+        n_linear_regression для .npy файла со строками вида [x_0,x_1,...,x_n, f(x_0,x_1,...,x_n)].
+        Файл не загружается целиком: блоки строк читаются через отображение в память.
+        :param file_path: путь к .npy файлу
+        :param block_rows: число строк в блоке
+        :return: коэффициенты [k_0,k_1,...,k_n, b]
+        """
+        accumulator = RegressionAccumulator("n_linear")
+        for block in Regression._npy_row_blocks(file_path, block_rows):
+            accumulator.partial_fit(block)
+        return accumulator.solve()
+
+    @staticmethod
+    def poly_regression_npy(file_path: str, order: int = 5, block_rows: Union[int, None] = None) -> np.ndarray:
+        """
+        poly_regression для .npy файла со строками вида [x, y].
+        Файл не загружается целиком: блоки строк читаются через отображение в память за два прохода -
+        сначала ищется отрезок значений x, затем блоки добавляются к треугольной матрице R в базисе Чебышёва
+        (см. poly_fit). В коэффициенты при степенях x решение переводится один раз, в конце.
+        :param file_path: путь к .npy файлу
+        :param order: порядок полинома
+        :param block_rows: число строк в блоке
+        :return: набор коэффициентов bi полинома y = Σx^i*bi
+        """
+        if order < 0:
+            raise ValueError(f"Regression::poly_regression_npy error... order must be non-negative, got {order}")
+        # первый проход - отрезок значений x для перевода в [-1, 1]
+        x_min, x_max, rows = np.inf, -np.inf, 0
+        for block in Regression._npy_row_blocks(file_path, block_rows):
+            if block.shape[1] != 2:
+                raise ValueError(f"Regression::npy file error... expected rows [x, y], got {block.shape[1]} columns")
+            if block.shape[0] > 0:
+                x_min, x_max = min(x_min, block[:, 0].min()), max(x_max, block[:, 0].max())
+                rows += block.shape[0]
+        if rows == 0:
+            raise ValueError("Regression::poly_regression_npy error... file contains no rows")
+        shift, scale = Regression._chebyshev_scale(np.array([x_min, x_max]))
+        # второй проход - блочное QR-разложение в базисе Чебышёва, как в poly_fit
+        parts_rows = max(1, min(GRAM_BLOCK_BYTES // (8 * (order + 2)), rows))
+        blocks = ((block[:, 0], block[:, 1], None) for block in Regression._npy_row_blocks(file_path, block_rows))
+        r = Regression._chebyshev_r(blocks, order, shift, scale, parts_rows)
+        return PolynomialFit(coefficients=Regression._solve_chebyshev_r(r, order), shift=shift,
+                             scale=scale).monomial()
+
+    @staticmethod
+    def _chebyshev_columns(t: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """
+        Заполняет столбцы out значениями T_0(t), T_1(t),...: каждый следующий столбец получается
+        из двух предыдущих по формуле T_k = 2 * t * T_(k-1) - T_(k-2), без возведения в степень
+        """
+        columns = out.shape[1]
+        out[:, 0] = 1.0
+        if columns > 1:
+            out[:, 1] = t
+        for k in range(2, columns):
+            np.multiply(out[:, k - 1], t, out=out[:, k])
+            out[:, k] *= 2.0
+            out[:, k] -= out[:, k - 2]
+        return out
+
+    @staticmethod
+    def _chebyshev_scale(x: np.ndarray) -> Tuple[float, float]:
+        """
+        (shift, scale), переводящие отрезок [min(x), max(x)] в [-1, 1]
+        """
+        x_min, x_max = x.min(), x.max()
+        return float(0.5 * (x_max + x_min)), float(0.5 * (x_max - x_min)) if x_max > x_min else 1.0
+
+    @staticmethod
+    def _chebyshev_gram(x: np.ndarray, y: np.ndarray, order: int, shift: float, scale: float,
+                        block_rows: Union[int, None] = None, weights: Union[np.ndarray, None] = None) -> np.ndarray:
+        """
+        Матрица Грама строк [T_0(t),...,T_order(t), y], t = (x - shift) / scale, за один проход блоками
+        (с весами точек - строк, умноженных на sqrt(w)).
+        Её левый верхний угол (k + 1) x (k + 1) - матрица нормальных уравнений для порядка k,
+        поэтому одна матрица годится для всех порядков до order.
+        """
+        root_weights = Regression._root_weights(weights, x.size)
+        cols = order + 2
+        if block_rows is None:
+            block_rows = GRAM_BLOCK_BYTES // (8 * cols)
+        block_rows = max(1, min(block_rows, x.size))
+        rows = np.empty((block_rows, cols), dtype=float, order='F')
+        t = np.empty(block_rows, dtype=float)
+        gram = np.zeros((cols, cols), dtype=float)
+        for first in range(0, x.size, block_rows):
+            size = min(block_rows, x.size - first)
+            np.subtract(x[first: first + size], shift, out=t[:size])
+            t[:size] /= scale
+            Regression._chebyshev_columns(t[:size], rows[:size, :order + 1])
+            rows[:size, order + 1] = y[first: first + size]
+            if root_weights is not None:
+                rows[:size] *= root_weights[first: first + size, np.newaxis]
+            gram += rows[:size].T @ rows[:size]
+        return gram
+
+    @staticmethod
+    def _chebyshev_r(blocks: Iterable[Tuple[np.ndarray, np.ndarray, Union[np.ndarray, None]]], order: int,
+                     shift: float, scale: float, block_rows: int) -> np.ndarray:
+        """
+        Треугольная матрица R блочного QR-разложения (TSQR) строк [T_0(t),...,T_order(t), y], t = (x - shift) / scale.
+        Блоки (x, y, sqrt(w) или None) любого размера делятся на части не длиннее block_rows, каждая часть
+        заполняется в заранее выделенном буфере и добавляется к R: R = qr([R; часть]).
+        """
+        cols = order + 2
+        # первые cols строк буфера - текущая матрица R, за ними - очередная часть данных
+        buffer = np.zeros((cols + block_rows, cols), dtype=float, order='F')
+        t = np.empty(block_rows, dtype=float)
+        for x, y, root_weights in blocks:
+            for first in range(0, x.size, block_rows):
+                size = min(block_rows, x.size - first)
+                np.subtract(x[first: first + size], shift, out=t[:size])
+                t[:size] /= scale
+                rows = buffer[cols: cols + size]
+                Regression._chebyshev_columns(t[:size], rows[:, :order + 1])
+                rows[:, order + 1] = y[first: first + size]
+                if root_weights is not None:
+                    rows *= root_weights[first: first + size, np.newaxis]
+                r = np.linalg.qr(buffer[:cols + size], mode='r')
+                buffer[:cols] = 0.0
+                buffer[:r.shape[0]] = r
+        return buffer[:cols]
 
-        cols -= 1
+    @staticmethod
+    def _solve_chebyshev_r(r: np.ndarray, order: int) -> np.ndarray:
+        """
+        Коэффициенты c при T_0,...,T_order из R[:order+1, :order+1] * c = R[:order+1, order+1]
+        """
+        rhs = r[:order + 1, order + 1]
+        r = r[:order + 1, :order + 1]
+        diagonal = np.abs(np.diag(r))
+        # число обусловленности R - корень из числа обусловленности нормальных уравнений
+        if diagonal.min() * np.sqrt(NORMAL_EQUATIONS_MAX_CONDITION) > diagonal.max():
+            return np.linalg.solve(r, rhs)
+        # точек меньше, чем нужно для такого порядка: решение с минимальной нормой
+        return np.linalg.lstsq(r, rhs, rcond=None)[0]
 
-        for row in range(cols):
-            x_0[row] = 1.0
-            for col in range(row + 1):
-                hessian[row, col] = np.dot(data_rows[:, row], data_rows[:, col])
-                hessian[col, row] = hessian[row, col]
+    @staticmethod
+    def poly_fit(x: np.ndarray, y: np.ndarray, order: int = 5, block_rows: Union[int, None] = None,
+                 weights: Union[np.ndarray, None] = None) -> PolynomialFit:
+        """
+        Полиномиальная регрессия в базисе многочленов Чебышёва от t = (x - shift) / scale, t in [-1, 1].\n
+        Матрица базиса целиком не строится: блоки строк [T_0(t),...,T_order(t), y] заполняются в заранее
+        выделенном буфере и по очереди добавляются к треугольной матрице R блочным QR-разложением (TSQR):
+        R = qr([R; блок]). После последнего блока R[:order+1, :order+1] * c = R[:order+1, order+1]
+        даёт решение задачи наименьших квадратов. Память ограничена размером блока при любом числе точек.
+        С весами точек строки блока умножаются на sqrt(w), что даёт взвешенный МНК.
+        :param x: массив значений по x
+        :param y: массив значений по y
+        :param order: порядок полинома
+        :param block_rows: число строк в блоке, по умолчанию блок занимает около GRAM_BLOCK_BYTES
+        :param weights: веса точек или None
+        :return: PolynomialFit
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        if order < 0:
+            raise ValueError(f"Regression::poly_fit error... order must be non-negative, got {order}")
+        if x.size != y.size or x.size == 0:
+            raise ValueError(f"Regression::poly_fit error... x and y must be non-empty and of equal size, "
+                             f"got {x.size} and {y.size}")
+        root_weights = Regression._root_weights(weights, x.size)
+        shift, scale = Regression._chebyshev_scale(x)
+        if block_rows is None:
+            block_rows = GRAM_BLOCK_BYTES // (8 * (order + 2))
+        block_rows = max(1, min(block_rows, x.size))
+        blocks = ((x[first: first + block_rows], y[first: first + block_rows],
+                   None if root_weights is None else root_weights[first: first + block_rows])
+                  for first in range(0, x.size, block_rows))
+        r = Regression._chebyshev_r(blocks, order, shift, scale, block_rows)
+        return PolynomialFit(coefficients=Regression._solve_chebyshev_r(r, order), shift=shift, scale=scale)
 
-        for i in range(cols + 1):
-            hessian[i, cols] = np.sum(data_rows[:, i])
-            hessian[cols, i] = hessian[i, cols]
+    @staticmethod
+    def select_poly_order(x: np.ndarray, y: np.ndarray, orders: Iterable[int] = range(11), folds: int = 5,
+                          workers: Union[int, None] = None,
+                          seed: Union[int, np.random.Generator, None] = 0) -> PolyOrderSelection:
+        """
+        Выбор порядка полинома k-кратной перекрёстной проверкой.\n
+        Точки случайно делятся на folds фолдов, для каждого фолда в пуле процессов считается матрица Грама
+        G_f строк [T_0(t),...,T_max(t), y] для наибольшего порядка из orders (см. _chebyshev_gram).
+        Обучающая матрица фолда - G - G_f, где G = Σ G_f, а для порядка k берётся её левый верхний угол,
+        поэтому более высокий порядок использует те же суммы, что и более низкий.
+        Ошибка на проверочном фолде тоже считается по G_f без повторного прохода по точкам:\n
+        Σ(yi - Σ c_j * T_j(ti))^2 = Σyi^2 - 2 * c^T * Σ T(ti) * yi + c^T * (Σ T(ti) * T(ti)^T) * c
+        :param x: массив значений по x
+        :param y: массив значений по y
+        :param orders: проверяемые порядки
+        :param folds: число фолдов
+        :param workers: число процессов пула, None - по числу ядер, 0 или 1 - без пула
+        :param seed: зерно или генератор для разбиения на фолды
+        :return: PolyOrderSelection
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        orders = sorted(set(int(order) for order in orders))
+        if not orders or orders[0] < 0:
+            raise ValueError(f"Regression::select_poly_order error... orders must be non-negative, got {orders}")
+        if x.size != y.size:
+            raise ValueError(f"Regression::select_poly_order error... x and y must be of equal size, "
+                             f"got {x.size} and {y.size}")
+        if not 2 <= folds <= x.size:
+            raise ValueError(f"Regression::select_poly_order error... folds must be in [2, {x.size}], got {folds}")
 
-        hessian[cols, cols] = data_rows.shape[0]
+        max_order = orders[-1]
+        shift, scale = Regression._chebyshev_scale(x)
+        permutation = Regression.make_rng(seed).permutation(x.size)
+        parts = [permutation[fold::folds] for fold in range(folds)]
+        jobs = [(x[part], y[part], max_order, shift, scale) for part in parts]
+        if workers is not None and workers <= 1:
+            results = [_timed_chebyshev_gram(*job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                results = list(pool.map(_timed_chebyshev_gram, *zip(*jobs)))
 
-        for row in range(cols):
-            grad[row] = np.sum(hessian[row, 0: cols]) - np.dot(data_rows[:, cols], data_rows[:, row])
+        total = sum(gram for gram, _ in results)
+        fold_errors = np.empty((folds, len(orders)), dtype=float)
+        fold_times = []
+        for fold, (gram, gram_time) in enumerate(results):
+            t = time.perf_counter()
+            train = total - gram
+            for column, order in enumerate(orders):
+                size = order + 1
+                c = Regression._solve_normal_equations(train[:size, :size], train[:size, -1])
+                error = gram[-1, -1] - 2.0 * np.dot(c, gram[:size, -1]) + c @ gram[:size, :size] @ c
+                fold_errors[fold, column] = max(error, 0.0) / parts[fold].size
+            fold_times.append(gram_time + time.perf_counter() - t)
 
-        grad[cols] = np.sum(hessian[cols, 0: cols]) - np.sum(data_rows[:, cols])
+        errors = fold_errors.mean(axis=0)
+        best = orders[int(np.argmin(errors))]
+        coefficients = Regression._solve_normal_equations(total[:best + 1, :best + 1], total[:best + 1, -1])
+        return PolyOrderSelection(order=best, orders=orders, errors=errors, fold_errors=fold_errors,
+                                  fold_times=fold_times,
+                                  fit=PolynomialFit(coefficients=coefficients, shift=shift, scale=scale))
 
-        solution = np.linalg.solve(hessian, -grad)
-        return x_0 + solution
+    @staticmethod
+    def poly_fit_ridge(x: np.ndarray, y: np.ndarray, order: int = 5, lambdas: Union[float, np.ndarray] = 1.0,
+                       weights: Union[np.ndarray, None] = None) -> Union[PolynomialFit, List[PolynomialFit]]:
+        """
+        Гребневая полиномиальная регрессия в базисе poly_fit: Σw_i * (yi - Σ c_j * T_j(ti))^2 + λ * Σ_(j>0) c_j^2,
+        свободный член c_0 при T_0 = 1 не штрафуется. Матрица Грама считается один раз (см. _chebyshev_gram),
+        решения для всех lambdas - из одного спектрального разложения (см. _ridge_path).
+        :param x: массив значений по x
+        :param y: массив значений по y
+        :param order: порядок полинома
+        :param lambdas: коэффициент регуляризации или массив коэффициентов
+        :param weights: веса точек или None
+        :return: PolynomialFit; для массива lambdas - список PolynomialFit
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        if order < 0:
+            raise ValueError(f"Regression::poly_fit_ridge error... order must be non-negative, got {order}")
+        if x.size != y.size or x.size == 0:
+            raise ValueError(f"Regression::poly_fit_ridge error... x and y must be non-empty and of equal size, "
+                             f"got {x.size} and {y.size}")
+        shift, scale = Regression._chebyshev_scale(x)
+        gram = Regression._chebyshev_gram(x, y, order, shift, scale, weights=weights)
+        # _ridge_path ждёт единичный столбец перед целевым: [T_1,...,T_order, T_0, y]
+        columns = list(range(1, order + 1)) + [0, order + 1]
+        path = Regression._ridge_path(gram[np.ix_(columns, columns)], lambdas)
+        fits = [PolynomialFit(coefficients=np.roll(row, 1), shift=shift, scale=scale) for row in path]
+        return fits[0] if np.ndim(lambdas) == 0 else fits
 
     @staticmethod
-    def poly_regression(x: np.ndarray, y: np.ndarray, order: int = 5) -> np.ndarray:
+    def poly_regression(x: np.ndarray, y: np.ndarray, order: int = 5,
+                        weights: Union[np.ndarray, None] = None) -> np.ndarray:
         """
         Полином: y = Σ_j x^j * bj\n
         Отклонение: ei =  yi - Σ_j xi^j * bj\n
         Минимизируем: Σ_i(yi - Σ_j xi^j * bj)^2 -> min\n
         Σ_i(yi - Σ_j xi^j * bj)^2 = Σ_iyi^2 - 2 * yi * Σ_j xi^j * bj +(Σ_j xi^j * bj)^2\n
         условие минимума:\n d/dbj Σ_i ei = d/dbj (Σ_i yi^2 - 2 * yi * Σ_j xi^j * bj +(Σ_j xi^j * bj)^2) = 0\n
+        Решение ищется через poly_fit и переводится в коэффициенты при степенях x.
         :param x: массив значений по x
         :param y: массив значений по y
         :param order: порядок полинома
+        :param weights: веса точек (взвешенный МНК) или None
         :return: набор коэффициентов bi полинома y = Σx^i*bi
         """
-        n = len(x)  # Количество наблюдений
-
-        # Создаем матрицу X с степенями x от 0 до order
-        X = np.column_stack([x ** i for i in range(order + 1)])
-
-        # Решаем систему уравнений для получения коэффициентов
-        coefficients = np.linalg.lstsq(X, y, rcond=None)[0]
-
-        return coefficients
+        return Regression.poly_fit(x, y, order, weights=weights).monomial()
 
     @staticmethod
     def polynom(x: np.ndarray, b: np.ndarray) -> np.ndarray:
         """
+        Вычисление по схеме Горнера: y = (...(b_n * x + b_(n-1)) * x + ...) * x + b_0,
+        блоками по FEATURES_BLOCK_SIZE точек, без матрицы степеней x.
         :param x: массив значений по x\n
         :param b: массив коэффициентов полинома\n
         :returns: возвращает полином yi = Σxi^j*bj\n
         """
-        order = len(b) - 1
-        powers = np.column_stack([x ** i for i in range(order + 1)])
+        x = np.asarray(x, dtype=float)
+        b = np.asarray(b, dtype=float).ravel()
+        y = np.empty_like(x)
+        x_flat, y_flat = x.reshape(-1), y.reshape(-1)
+        for first in range(0, x_flat.size, FEATURES_BLOCK_SIZE):
+            x_block = x_flat[first: first + FEATURES_BLOCK_SIZE]
+            y_block = y_flat[first: first + FEATURES_BLOCK_SIZE]
+            y_block[:] = b[-1]
+            for coefficient in b[-2::-1]:
+                y_block *= x_block
+                y_block += coefficient
+        return y
+
+    @staticmethod
+    def chebyshev_series(x: np.ndarray, c: np.ndarray, shift: float = 0.0, scale: float = 1.0) -> np.ndarray:
+        """
+        Вычисляет y = Σ c_i * T_i(t), t = (x - shift) / scale, по схеме Кленшоу
+        (аналог схемы Горнера для многочленов Чебышёва), блоками по FEATURES_BLOCK_SIZE точек:\n
+        b_k = c_k + 2 * t * b_(k+1) - b_(k+2), y = c_0 + t * b_1 - b_2
+        :param x: массив значений по x
+        :param c: коэффициенты при T_i
+        :param shift: сдвиг аргумента
+        :param scale: масштаб аргумента
+        :returns: массив значений y
+        """
+        x = np.asarray(x, dtype=float)
+        c = np.asarray(c, dtype=float).ravel()
+        y = np.empty_like(x)
+        x_flat, y_flat = x.reshape(-1), y.reshape(-1)
+        t = np.empty(min(FEATURES_BLOCK_SIZE, x_flat.size), dtype=float)
+        b_1, b_2 = np.empty_like(t), np.empty_like(t)
+        for first in range(0, x_flat.size, FEATURES_BLOCK_SIZE):
+            x_block = x_flat[first: first + FEATURES_BLOCK_SIZE]
+            size = x_block.size
+            t_b, b_1b, b_2b = t[:size], b_1[:size], b_2[:size]
+            np.subtract(x_block, shift, out=t_b)
+            t_b /= scale
+            b_1b[:] = 0.0
+            b_2b[:] = 0.0
+            for coefficient in c[:0:-1]:
+                # b_2 <- c_k + 2 * t * b_1 - b_2, затем b_1 и b_2 меняются местами
+                b_2b *= -1.0
+                b_2b += coefficient
+                b_2b += 2.0 * t_b * b_1b
+                b_1b, b_2b = b_2b, b_1b
+            y_block = y_flat[first: first + size]
+            np.multiply(t_b, b_1b, out=y_block)
+            y_block -= b_2b
+            y_block += c[0]
+        return y
 
-        # Перемножаем матрицу степеней x на вектор коэффициентов
-        y_pred = np.dot(powers, b)
+    @staticmethod
+    def surface_2d_terms(degree: int) -> List[Tuple[int, int]]:
+        """
+        Степени (x, y) одночленов поверхности степени degree в порядке убывания полной степени:
+        для degree = 2 это x^2, x * y, y^2, x, y, 1
+        """
+        return [(i, total - i) for total in range(degree, -1, -1) for i in range(total, -1, -1)]
 
-        return y_pred
+    @staticmethod
+    def _surface_2d_rows(x: np.ndarray, y: np.ndarray, z: np.ndarray, degree: int, out: np.ndarray) -> np.ndarray:
+        """
+        Заполняет out строками [одночлены из surface_2d_terms(degree), z].
+        Степени x и y считаются последовательным умножением, каждый одночлен - одним умножением в out.
+        """
+        x_powers, y_powers = [None, x], [None, y]
+        for _ in range(2, degree + 1):
+            x_powers.append(x_powers[-1] * x)
+            y_powers.append(y_powers[-1] * y)
+        for column, (i, j) in enumerate(Regression.surface_2d_terms(degree)):
+            if i and j:
+                np.multiply(x_powers[i], y_powers[j], out=out[:, column])
+            elif i:
+                out[:, column] = x_powers[i]
+            elif j:
+                out[:, column] = y_powers[j]
+            else:
+                out[:, column] = 1.0
+        out[:, -1] = z
+        return out
+
+    @staticmethod
+    def surface_regression_2d(x: np.ndarray, y: np.ndarray, z: np.ndarray, degree: int = 2,
+                              dtype=None, block_rows: Union[int, None] = None) -> np.ndarray:
+        """
+        Поверхность z(x, y) = Σ c_k * x^i_k * y^j_k произвольной полной степени degree,
+        одночлены идут в порядке surface_2d_terms(degree) (для degree = 2 - как в quadratic_regression_2d).\n
+        Строки расширенной матрицы [D | z] строятся блоками в заранее выделенном буфере,
+        и за один проход накапливается M = [D | z]^T * [D | z]: A = M[:-1, :-1], B = M[:-1, -1], C = A^-1 * B.
+        :param x: массив значений по x
+        :param y: массив значений по y
+        :param z: массив значений по z
+        :param degree: полная степень поверхности
+        :param dtype: тип блоков D; по умолчанию float32, если все входные массивы float32, иначе float64.
+                      Суммы по блокам в любом случае складываются в float64
+        :param block_rows: число строк в блоке, по умолчанию блок занимает около GRAM_BLOCK_BYTES
+        :return: коэффициенты c_k
+        """
+        x, y, z = (np.asarray(array).ravel() for array in (x, y, z))
+        if not x.size == y.size == z.size:
+            raise ValueError(f"Regression::surface_regression_2d error... x, y and z must be of equal size, "
+                             f"got {x.size}, {y.size} and {z.size}")
+        if degree < 0:
+            raise ValueError(f"Regression::surface_regression_2d error... degree must be non-negative, got {degree}")
+        if dtype is None:
+            dtype = np.float32 if all(array.dtype == np.float32 for array in (x, y, z)) else np.float64
+        dtype = np.dtype(dtype)
+        cols = len(Regression.surface_2d_terms(degree)) + 1
+        if block_rows is None:
+            block_rows = GRAM_BLOCK_BYTES // (dtype.itemsize * cols)
+        block_rows = max(1, min(block_rows, x.size))
+        rows = np.empty((block_rows, cols), dtype=dtype)
+        gram = np.zeros((cols, cols), dtype=float)
+        for first in range(0, x.size, block_rows):
+            size = min(block_rows, x.size - first)
+            block = Regression._surface_2d_rows(*(array[first: first + size].astype(dtype, copy=False)
+                                                  for array in (x, y, z)), degree, rows[:size])
+            gram += block.T @ block
+        return Regression._solve_normal_equations(gram[:-1, :-1], gram[:-1, -1])
 
     @staticmethod
     def quadratic_regression_2d(x: np.ndarray, y: np.ndarray, z: np.ndarray) -> np.ndarray:
@@ -373,36 +1255,13 @@ class Regression:
         Матричный элемент матрицы A выражается из матрицы D следующим образом:
         a_ij = (D[:,i], D[:,j]), где (*, *) - скалярное произведение.
         Матрица A - симметричная и имеет размерность 6x6.
+        A и B берутся из одной матрицы Грама расширенной матрицы [D | z] (см. surface_regression_2d).
         :param x:
         :param y:
         :param z:
         :return:
         """
-        n = len(x)  # Количество наблюдений
-
-        # Рассчитываем вектор B
-        B = np.array([
-            np.sum(x ** 2 * z),
-            np.sum(x * y * z),
-            np.sum(y ** 2 * z),
-            np.sum(x * z),
-            np.sum(y * z),
-            np.sum(z)
-        ])
-
-        # Создаем матрицу D
-        D = np.column_stack([x ** 2, x * y, y ** 2, x, y, np.ones_like(x)])
-
-        # Рассчитываем матрицу A
-        A = np.zeros((6, 6))
-        for i in range(6):
-            for j in range(6):
-                A[i, j] = np.sum(D[:, i] * D[:, j])
-
-        # Решаем систему уравнений для получения коэффициентов
-        coefficients = np.linalg.solve(A, B)
-
-        return coefficients
+        return Regression.surface_regression_2d(x, y, z, 2)
 
     @staticmethod
     def distance_field_example():
@@ -414,6 +1273,7 @@ class Regression:
         4) Проанализировать результат (смысл этой картинки в чём...)\n
         :return:
         """
+        plt = _pyplot()
         print("distance field test:")
         x, y = Regression.test_data_along_line()
         k_, b_ = Regression.linear_regression(x, y)
@@ -426,7 +1286,7 @@ class Regression:
         plt.xlabel("k")
         plt.ylabel("b")
         plt.grid(True)
-        plt.show()
+        _show("distance_field_example")
 
     @staticmethod
     def linear_reg_example():
@@ -438,6 +1298,7 @@ class Regression:
            регрессионную прямую вида: y = k*x + b\n
         :return:
         """
+        plt = _pyplot()
         print("linear reg test:")
 
         # Генерируем тестовые данные
@@ -453,7 +1314,7 @@ class Regression:
         plt.ylabel('y')
         plt.title('Линейная регрессия')
         plt.legend()
-        plt.show()
+        _show("linear_reg_example")
 
     @staticmethod
     def bi_linear_reg_example():
@@ -465,6 +1326,7 @@ class Regression:
            регрессионную плоскость вида:\n z = kx*x + ky*y + b\n
         :return:
         """
+        plt = _pyplot()
         x, y, z = Regression.test_data_2d()
         kx, ky, b = Regression.bi_linear_regression(x, y, z)
         print("\nbi linear regression test:")
@@ -477,7 +1339,7 @@ class Regression:
         plt.xlabel("x")
         plt.ylabel("y")
         fig.colorbar(surf, shrink=0.5, aspect=5)
-        plt.show()
+        _show("bi_linear_reg_example")
 
     @staticmethod
     def poly_reg_example():
@@ -489,6 +1351,7 @@ class Regression:
            регрессионную кривую. Для построения кривой использовать метод polynom\n
         :return:
         """
+        plt = _pyplot()
         print('\npoly regression test:')
         x, y = Regression.test_data_along_line()
         coefficients = Regression.poly_regression(x, y)
@@ -496,7 +1359,7 @@ class Regression:
         print(f"y(x) = {' + '.join(f'{coefficients[i]:.4} * x^{i}' for i in range(coefficients.size))}\n")
         plt.plot(x, y_, 'g')
         plt.plot(x, y, 'r.')
-        plt.show()
+        _show("poly_reg_example")
 
     @staticmethod
     def n_linear_reg_example():
@@ -510,6 +1373,7 @@ class Regression:
     def quadratic_reg_example():
         """
         """
+        plt = _pyplot()
         x, y, z = Regression.second_order_surface_2d()
         coeffs = Regression.quadratic_regression_2d(x, y, z)
         # y_ = polynom(x, coefficients)
@@ -527,10 +1391,178 @@ class Regression:
         plt.xlabel("x")
         plt.ylabel("y")
         fig.colorbar(surf, shrink=0.5, aspect=5)
-        plt.show()
+        _show("quadratic_reg_example")
+
+
+def _timed_chebyshev_gram(x: np.ndarray, y: np.ndarray, order: int, shift: float, scale: float) -> \
+        Tuple[np.ndarray, float]:
+    """
+    Regression._chebyshev_gram для пула процессов: (матрица Грама, время счёта)
+    """
+    t = time.perf_counter()
+    gram = Regression._chebyshev_gram(x, y, order, shift, scale)
+    return gram, time.perf_counter() - t
+
+
+def _linear_features(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    return np.column_stack((x, np.ones_like(x), y))
+
+
+def _bi_linear_features(x: np.ndarray, y: np.ndarray, z: np.ndarray) -> np.ndarray:
+    return np.column_stack((x, y, np.ones_like(x), z))
+
+
+def _quadratic_2d_features(x: np.ndarray, y: np.ndarray, z: np.ndarray) -> np.ndarray:
+    return _surface_2d_features(x, y, z, 2)
+
+
+def _surface_2d_features(x: np.ndarray, y: np.ndarray, z: np.ndarray, degree: int) -> np.ndarray:
+    rows = np.empty((x.size, len(Regression.surface_2d_terms(degree)) + 1), dtype=float)
+    return Regression._surface_2d_rows(x, y, z, degree, rows)
+
+
+def _poly_features(x: np.ndarray, y: np.ndarray, order: int) -> np.ndarray:
+    """
+    Строки [x, x^2,...,x^order, 1, y]: степени считаются последовательным умножением в заранее выделенном массиве
+    """
+    rows = np.empty((x.size, order + 2), dtype=float)
+    if order > 0:
+        rows[:, 0] = x
+    for i in range(1, order):
+        np.multiply(rows[:, i - 1], x, out=rows[:, i])
+    rows[:, order] = 1.0
+    rows[:, order + 1] = y
+    return rows
+
+
+# вид регрессии: (число аргументов partial_fit, построение строк [признаки, 1, цель] или None, если строки уже
+# готовы и единичный столбец добавляет Regression._gram_matrix, нужен ли построению порядок)
+_ACCUMULATOR_KINDS = {
+    "linear": (2, _linear_features, False),
+    "bi_linear": (3, _bi_linear_features, False),
+    "n_linear": (1, None, False),
+    "quadratic_2d": (3, _quadratic_2d_features, False),
+    "surface_2d": (3, _surface_2d_features, True),
+    "poly": (2, _poly_features, True),
+}
+
+
+class RegressionAccumulator:
+    """
+    Потоковая регрессия: накапливает матрицу Грама расширенной матрицы [признаки, 1, цель]
+    (см. Regression._gram_matrix), которой достаточно для решения нормальных уравнений.
+    Данные подаются кусками через partial_fit, накопители с разных кусков или процессов
+    складываются через merge, solve возвращает те же коэффициенты, что и соответствующий метод Regression:\n
+    "linear"       - partial_fit(x, y),    решение как у Regression.linear_regression\n
+    "bi_linear"    - partial_fit(x, y, z), решение как у Regression.bi_linear_regression\n
+    "n_linear"     - partial_fit(data_rows), решение как у Regression.n_linear_regression\n
+    "quadratic_2d" - partial_fit(x, y, z), решение как у Regression.quadratic_regression_2d\n
+    "surface_2d"   - partial_fit(x, y, z), решение как у Regression.surface_regression_2d со степенью order\n
+    "poly"         - partial_fit(x, y),    решение как у Regression.poly_regression с порядком order\n
+    Объект сериализуется pickle, поэтому его можно возвращать из процессов пула.
+    """
+
+    def __init__(self, kind: str = "n_linear", order: int = 5):
+        if kind not in _ACCUMULATOR_KINDS:
+            raise ValueError(f"RegressionAccumulator::kind error... unknown kind \"{kind}\", "
+                             f"expected one of {', '.join(_ACCUMULATOR_KINDS)}")
+        if order < 0:
+            raise ValueError(f"RegressionAccumulator::order error... order must be non-negative, got {order}")
+        self._kind = kind
+        self._order = order
+        self._gram: Union[np.ndarray, None] = None
+
+    @property
+    def kind(self) -> str:
+        return self._kind
+
+    @property
+    def order(self) -> int:
+        """
+        Порядок полинома для видов "poly" и "surface_2d"
+        """
+        return self._order
+
+    @property
+    def n_points(self) -> int:
+        """
+        Число учтённых точек
+        """
+        if self._gram is None:
+            return 0
+        return int(round(self._gram[-2, -2]))
+
+    @property
+    def gram(self) -> Union[np.ndarray, None]:
+        """
+        Накопленная матрица Грама или None, если данных ещё не было
+        """
+        return self._gram
+
+    def _add_gram(self, gram: np.ndarray) -> None:
+        if self._gram is None:
+            self._gram = gram.copy()
+            return
+        if self._gram.shape != gram.shape:
+            raise ValueError(f"RegressionAccumulator::dimensions error... accumulated {self._gram.shape[0] - 2} "
+                             f"features, got {gram.shape[0] - 2}")
+        self._gram += gram
+
+    def partial_fit(self, *columns: np.ndarray) -> 'RegressionAccumulator':
+        """
+        Учитывает очередной кусок данных
+        :param columns: массивы в том же порядке, что и у соответствующего метода Regression
+        :return: self
+        """
+        args_count, features, ordered = _ACCUMULATOR_KINDS[self._kind]
+        if len(columns) != args_count:
+            raise ValueError(f"RegressionAccumulator::partial_fit error... \"{self._kind}\" expects "
+                             f"{args_count} arrays, got {len(columns)}")
+        if features is None:
+            self._add_gram(Regression._gram_matrix(np.asarray(columns[0], dtype=float)))
+            return self
+        columns = tuple(np.asarray(column, dtype=float).ravel() for column in columns)
+        if any(column.size != columns[0].size for column in columns):
+            raise ValueError("RegressionAccumulator::partial_fit error... arrays have different sizes")
+        for first in range(0, columns[0].size, FEATURES_BLOCK_SIZE):
+            block = tuple(column[first: first + FEATURES_BLOCK_SIZE] for column in columns)
+            rows = features(*block, self._order) if ordered else features(*block)
+            self._add_gram(rows.T @ rows)
+        return self
+
+    def merge(self, other: 'RegressionAccumulator') -> 'RegressionAccumulator':
+        """
+        Добавляет статистики другого накопителя того же вида
+        :return: self
+        """
+        if other.kind != self._kind or (_ACCUMULATOR_KINDS[self._kind][2] and other.order != self._order):
+            raise ValueError(f"RegressionAccumulator::merge error... can't merge \"{other.kind}\" "
+                             f"into \"{self._kind}\"")
+        if other.gram is not None:
+            self._add_gram(other.gram)
+        return self
+
+    def solve(self) -> Union[Tuple[float, float], np.ndarray]:
+        """
+        Коэффициенты регрессии по всем учтённым данным
+        """
+        if self._gram is None:
+            raise ValueError("RegressionAccumulator::solve error... no data")
+        cols = self._gram.shape[0] - 1
+        solution = Regression._solve_normal_equations(self._gram[:cols, :cols], self._gram[:cols, cols])
+        if self._kind == "linear":
+            return float(solution[0]), float(solution[1])
+        if self._kind == "poly":
+            # свободный член стоит после степеней x, а у poly_regression он первый
+            return np.roll(solution, 1)
+        return solution
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regression examples")
+    parser.add_argument("--headless", metavar="DIR", default=None,
+                        help="render example figures with Agg and save them to DIR instead of showing windows")
+    set_headless(parser.parse_args().headless)
     Regression.distance_field_example()
     Regression.linear_reg_example()
     Regression.bi_linear_reg_example()
@@ -0,0 +1,91 @@
+"""
+Проверки харнесса regression_benchmark. Запуск из каталога lab_2:
+    python -m pytest test_regression_benchmark.py
+"""
+import contextlib
+import io
+import unittest
+
+import numpy as np
+
+from regression_benchmark import (HARNESS_CASES, IMPORT_TIME_MODULES, compare_results, measure_call,
+                                  run_harness)
+
+
+def _results(*records) -> dict:
+    return {"meta": {}, "results": [dict(zip(("name", "n", "d", "time"), record)) for record in records]}
+
+
+def _compare(current: dict, baseline: dict, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return compare_results(current, baseline, **kwargs)
+
+
+class CompareResultsTest(unittest.TestCase):
+    def test_slowdown_threshold(self):
+        baseline = _results(("poly_regression", 1000, 2, 0.010), ("poly_regression", 1000, 10, 0.010))
+        current = _results(("poly_regression", 1000, 2, 0.012), ("poly_regression", 1000, 10, 0.013))
+        failures = _compare(current, baseline, threshold=1.25)
+        self.assertEqual(len(failures), 1)
+        self.assertTrue(failures[0].startswith("poly_regression n=1000 d=10:"))
+        self.assertEqual(_compare(current, baseline, threshold=1.5), [])
+        # ускорение замедлением не считается
+        self.assertEqual(_compare(baseline, current, threshold=1.0), [])
+
+    def test_min_time(self):
+        baseline = _results(("linear_regression", 100, 1, 0.0001))
+        current = _results(("linear_regression", 100, 1, 0.01))
+        self.assertEqual(_compare(current, baseline), [])
+        self.assertEqual(len(_compare(current, baseline, min_time=0.0)), 1)
+
+    def test_import_threshold(self):
+        baseline = _results(("import regression_task", 0, 0, 0.100), ("linear_regression", 10, 1, 0.100))
+        current = _results(("import regression_task", 0, 0, 0.140), ("linear_regression", 10, 1, 0.140))
+        failures = _compare(current, baseline, threshold=1.25, import_threshold=1.5)
+        self.assertEqual(len(failures), 1)
+        self.assertTrue(failures[0].startswith("linear_regression"))
+        self.assertEqual(len(_compare(current, baseline, threshold=1.25, import_threshold=1.3)), 2)
+
+    def test_forbidden_imports_and_missing_baseline(self):
+        current = _results(("import log_regression", 0, 0, 0.1), ("distance_field", 10, 256, 1.0))
+        current["results"][0]["forbidden_imports"] = ["matplotlib"]
+        # замеры без пары в базовых результатах не сравниваются, запрещённые импорты отмечаются всегда
+        self.assertEqual(_compare(current, _results()), ["import log_regression: imports matplotlib"])
+
+
+class MeasureCallTest(unittest.TestCase):
+    def test_counts_allocations_during_call(self):
+        retained = []
+        record = measure_call(lambda size: retained.append([object() for _ in range(size)]), (1000,), repeats=2)
+        self.assertEqual(set(record), {"time", "peak_bytes", "allocations"})
+        self.assertGreaterEqual(record["allocations"], 1000)
+        self.assertGreater(record["time"], 0.0)
+        # прогрев, повторы и замер с tracemalloc
+        self.assertEqual(len(retained), 4)
+        # блоки, выделенные до вызова, не считаются
+        self.assertLess(measure_call(len, (retained,), repeats=1)["allocations"], 1000)
+
+    def test_peak_bytes(self):
+        record = measure_call(lambda size: float(np.ones(size).sum()), (1 << 20,), repeats=1)
+        self.assertGreaterEqual(record["peak_bytes"], 8 << 20)
+
+
+class RunHarnessTest(unittest.TestCase):
+    def test_records(self):
+        cases = [case for case in HARNESS_CASES if case.name in ("linear_regression", "poly_regression")]
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = run_harness(sizes=(100, 200), dimensions=(2, 3), repeats=1, cases=cases)
+        keys = [(record["name"], record["n"], record["d"]) for record in results["results"]]
+        self.assertEqual(keys[:6], [("linear_regression", 100, 1), ("linear_regression", 200, 1),
+                                    ("poly_regression", 100, 2), ("poly_regression", 100, 3),
+                                    ("poly_regression", 200, 2), ("poly_regression", 200, 3)])
+        self.assertEqual(keys[6:], [(f"import {module}", 0, 0) for module, _ in IMPORT_TIME_MODULES])
+        self.assertEqual([record["forbidden_imports"] for record in results["results"][6:]],
+                         [[] for _ in IMPORT_TIME_MODULES])
+        self.assertEqual((results["meta"]["repeats"], results["meta"]["numpy"]), (1, np.__version__))
+        # результаты сравнимы сами с собой
+        self.assertEqual(_compare(results, results), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
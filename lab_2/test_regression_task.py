@@ -0,0 +1,577 @@
+"""
+Проверки Regression. Запуск из каталога lab_2:
+    python -m pytest test_regression_task.py
+"""
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+from regression_task import Regression, RegressionAccumulator, set_headless
+
+
+def _rmse(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.sqrt(np.mean((a - b) ** 2)))
+
+
+class GeneratorsTest(unittest.TestCase):
+    def test_seed_reproducibility(self):
+        for generator in (Regression.test_data_along_line_rng, Regression.second_order_surface_2d_rng,
+                          Regression.test_data_2d_rng, Regression.test_data_nd_rng):
+            with self.subTest(generator=generator.__name__):
+                first, second = generator(seed=7), generator(seed=np.random.default_rng(7))
+                for left, right in zip(first, second):
+                    np.testing.assert_array_equal(left, right)
+                self.assertFalse(np.array_equal(np.asarray(generator(seed=8)), np.asarray(first)))
+
+    def test_same_model_as_baseline(self):
+        # отклонение от модели у новых и исходных генераторов лежит в одном и том же диапазоне шума
+        x, y = Regression.test_data_along_line_rng(k=2.0, b=0.5, arg_range=3.0, rand_range=0.2, n_points=1000, seed=0)
+        x_0, y_0 = Regression.test_data_along_line(k=2.0, b=0.5, arg_range=3.0, rand_range=0.2, n_points=1000)
+        np.testing.assert_allclose(x, x_0)
+        for noise in (y - 2.0 * x - 0.5, y_0 - 2.0 * x_0 - 0.5):
+            self.assertTrue(np.all(np.abs(noise) <= 0.1 + 1e-12))
+
+        x, y, z = Regression.second_order_surface_2d_rng((1.0, -2.0, 3.0, 1.0, 2.0, -3.0), args_range=2.0,
+                                                         rand_range=0.1, n_points=2000, seed=0)
+        self.assertTrue(np.all(np.abs(x) <= 1.0) and np.all(np.abs(y) <= 1.0))
+        noise = z - (x * x - 2.0 * x * y + 3.0 * y * y + x + 2.0 * y - 3.0)
+        self.assertTrue(np.all(np.abs(noise) <= 0.05 + 1e-12))
+
+        x, y, z = Regression.test_data_2d_rng(kx=-2.0, ky=2.0, b=12.0, args_range=(0.0, 4.0), rand_range=1.0,
+                                              n_points=2000, seed=0)
+        self.assertTrue(np.all((x >= 0.0) & (x <= 4.0)))
+        self.assertTrue(np.all(np.abs(z - (-2.0 * x + 2.0 * y + 12.0)) <= 0.5 + 1e-12))
+
+        settings = np.array([1.0, -2.0, 0.5, 3.0])
+        data = Regression.test_data_nd_rng(settings, args_range=2.0, rand_range=0.1, n_points=3000, seed=0)
+        self.assertEqual(data.shape, (3000, 4))
+        self.assertTrue(np.all(np.abs(data[:, :3]) <= 1.0))
+        self.assertTrue(np.all(np.abs(data[:, 3] - data[:, :3] @ settings[:3] - settings[3]) <= 0.05 + 1e-12))
+
+    def test_dtype_and_out_buffers(self):
+        x, y = np.empty(50, dtype=np.float32), np.empty(50, dtype=np.float32)
+        result = Regression.test_data_along_line_rng(n_points=50, seed=1, dtype=np.float32, out=(x, y))
+        self.assertIs(result[0], x)
+        self.assertIs(result[1], y)
+        out = np.empty((10, 6), dtype=np.float32)
+        self.assertIs(Regression.test_data_nd_rng(n_points=10, seed=1, dtype=np.float32, out=out), out)
+        for bad in (np.empty((10, 5)), np.empty((10, 6), dtype=np.float64), np.empty((6, 10), dtype=np.float32).T):
+            with self.subTest(shape=bad.shape, dtype=bad.dtype):
+                with self.assertRaises(ValueError):
+                    Regression.test_data_nd_rng(n_points=10, seed=1, dtype=np.float32, out=bad)
+
+
+class DistanceFieldTest(unittest.TestCase):
+    def setUp(self):
+        self._x, self._y = Regression.test_data_along_line_rng(k=1.5, b=0.3, n_points=200, seed=0)
+        self._k = np.linspace(-2.0, 4.0, 37)
+        self._b = np.linspace(-1.0, 1.0, 23)
+
+    def _baseline(self, x, y):
+        return np.array([[Regression.distance_sum(x, y, k, b) for k in self._k] for b in self._b])
+
+    def test_matches_distance_sum(self):
+        expected = self._baseline(self._x, self._y)
+        np.testing.assert_allclose(Regression.distance_field(self._x, self._y, self._k, self._b), expected,
+                                   rtol=1e-10)
+        for tile_size, points_chunk in ((256, 65536), (1, 1), (5, 7), (40, 199)):
+            with self.subTest(tile_size=tile_size, points_chunk=points_chunk):
+                np.testing.assert_allclose(Regression.distance_field_tiled(self._x, self._y, self._k, self._b,
+                                                                           tile_size, points_chunk),
+                                           expected, rtol=1e-10)
+
+    def test_shapes_and_inputs(self):
+        self.assertEqual(Regression.distance_field(self._x, self._y, 1.5, 0.3).shape, (1, 1))
+        self.assertEqual(Regression.distance_field_tiled(self._x, self._y, self._k, 0.3).shape, (1, self._k.size))
+        # float32 данные суммируются в float64
+        x, y = self._x.astype(np.float32), self._y.astype(np.float32)
+        np.testing.assert_allclose(Regression.distance_field_tiled(x, y, self._k, self._b),
+                                   self._baseline(x.astype(float), y.astype(float)), rtol=1e-10)
+
+    def test_exact_fit_is_zero(self):
+        x = np.arange(10.0) + 1e6
+        field = Regression.distance_field(x, 2.0 * x + 1.0, np.array([2.0]), np.array([1.0]))
+        self.assertLess(field[0, 0], 1e-3)
+        self.assertTrue(np.all(field >= 0.0))
+
+
+def _baseline_n_linear_regression(data_rows: np.ndarray) -> np.ndarray:
+    """
+    Исходный n_linear_regression: матрица Гессе и градиент в точке [1,...,1, 0] по отдельным суммам
+    """
+    rows, cols = data_rows.shape
+    hessian = np.zeros((cols, cols), dtype=float)
+    grad = np.zeros(cols, dtype=float)
+    x_0 = np.zeros(cols, dtype=float)
+    cols -= 1
+    for row in range(cols):
+        x_0[row] = 1.0
+        for col in range(row + 1):
+            hessian[row, col] = hessian[col, row] = np.dot(data_rows[:, row], data_rows[:, col])
+    for i in range(cols):
+        hessian[i, cols] = hessian[cols, i] = np.sum(data_rows[:, i])
+    hessian[cols, cols] = rows
+    for row in range(cols):
+        grad[row] = np.sum(hessian[row, :cols]) - np.dot(data_rows[:, cols], data_rows[:, row])
+    grad[cols] = np.sum(hessian[cols, :cols]) - np.sum(data_rows[:, cols])
+    return x_0 + np.linalg.solve(hessian, -grad)
+
+
+class GramSolveTest(unittest.TestCase):
+    def setUp(self):
+        self._data = Regression.test_data_nd_rng(np.array([1.0, -2.0, 3.0, 0.5, 7.0]), n_points=2000, seed=3)
+
+    def test_matches_baseline_and_lstsq(self):
+        expected = np.linalg.lstsq(np.column_stack([self._data[:, :-1], np.ones(len(self._data))]), self._data[:, -1],
+                                   rcond=None)[0]
+        np.testing.assert_allclose(Regression.n_linear_regression(self._data), expected, rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(_baseline_n_linear_regression(self._data), expected, rtol=1e-9, atol=1e-12)
+
+    def test_gram_blocks(self):
+        augmented = np.column_stack([self._data[:, :-1], np.ones(len(self._data)), self._data[:, -1]])
+        for block_rows in (None, 1, 7, 1999, 5000):
+            with self.subTest(block_rows=block_rows):
+                np.testing.assert_allclose(Regression._gram_matrix(self._data, block_rows), augmented.T @ augmented,
+                                           rtol=1e-12)
+
+    def test_degenerate_columns_fall_back_to_lstsq(self):
+        data = self._data.copy()
+        # второй признак повторяет первый: система вырождена, берётся решение с минимальной нормой
+        data[:, 1] = data[:, 0]
+        expected = np.linalg.lstsq(np.column_stack([data[:, :-1], np.ones(len(data))]), data[:, -1], rcond=None)[0]
+        np.testing.assert_allclose(Regression.n_linear_regression(data), expected, rtol=1e-6, atol=1e-9)
+
+    def test_badly_scaled_columns(self):
+        data = self._data.copy()
+        data[:, 0] *= 1e6
+        data[:, 2] += 1e4
+        design = np.column_stack([data[:, :-1], np.ones(len(data))])
+        expected = np.linalg.lstsq(design, data[:, -1], rcond=None)[0]
+        coefficients = Regression.n_linear_regression(data)
+        # нормальные уравнения теряют часть точности свободного члена, но не качество приближения
+        np.testing.assert_allclose(coefficients, expected, rtol=1e-5)
+        self.assertAlmostEqual(_rmse(design @ coefficients, data[:, -1]) / _rmse(design @ expected, data[:, -1]), 1.0,
+                               places=9)
+
+
+class NpyRegressionTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._file_path = os.path.join(self._tmp_dir.name, 'points.npy')
+        rng = np.random.default_rng(1)
+        self._x = rng.uniform(-3.0, 5.0, 50_000)
+        self._y = np.sin(2.0 * self._x) + 0.1 * rng.normal(size=self._x.size)
+        np.save(self._file_path, np.column_stack([self._x, self._y]))
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def test_poly_matches_poly_fit(self):
+        for order in (0, 3, 15, 20):
+            for block_rows in (None, 1, 7001):
+                if block_rows == 1 and order > 3:
+                    continue
+                with self.subTest(order=order, block_rows=block_rows):
+                    fit = Regression.poly_fit(self._x, self._y, order)
+                    b = Regression.poly_regression_npy(self._file_path, order, block_rows)
+                    self.assertEqual(b.size, order + 1)
+                    np.testing.assert_allclose(b, fit.monomial(), rtol=1e-8, atol=1e-10)
+                    self.assertAlmostEqual(_rmse(Regression.polynom(self._x, b), self._y),
+                                           _rmse(fit(self._x), self._y), places=10)
+
+    def test_poly_high_order_fits_noise_level(self):
+        # шум 0.1: при порядке 20 синус на отрезке длиной 8 приближается до уровня шума
+        b = Regression.poly_regression_npy(self._file_path, 20)
+        self.assertLess(_rmse(Regression.polynom(self._x, b), self._y), 0.101)
+
+    def test_linear_matches_lstsq(self):
+        rng = np.random.default_rng(2)
+        x = rng.normal(size=(10_000, 3))
+        z = x @ np.array([1.5, -2.0, 0.5]) + 3.0 + 0.01 * rng.normal(size=x.shape[0])
+        np.save(self._file_path, np.column_stack([x, z]))
+        expected = np.linalg.lstsq(np.column_stack([x, np.ones(x.shape[0])]), z, rcond=None)[0]
+        np.testing.assert_allclose(Regression.n_linear_regression_npy(self._file_path, block_rows=999), expected,
+                                   rtol=1e-9, atol=1e-12)
+
+    def test_invalid_files(self):
+        np.save(self._file_path, np.zeros((10, 3)))
+        with self.assertRaises(ValueError):
+            Regression.poly_regression_npy(self._file_path)
+        np.save(self._file_path, np.zeros(10))
+        with self.assertRaises(ValueError):
+            Regression.poly_regression_npy(self._file_path)
+        np.save(self._file_path, np.zeros((0, 2)))
+        with self.assertRaises(ValueError):
+            Regression.poly_regression_npy(self._file_path)
+        with self.assertRaises(ValueError):
+            Regression.poly_regression_npy(self._file_path, -1)
+
+
+class AccumulatorTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self._x = rng.uniform(-1.0, 1.0, 5_000)
+        self._y = rng.uniform(-1.0, 1.0, 5_000)
+        self._z = 1.0 + 2.0 * self._x - 3.0 * self._y + self._x * self._y + 0.05 * rng.normal(size=self._x.size)
+
+    def _chunked(self, kind: str, columns, order: int = 5, parts: int = 4) -> RegressionAccumulator:
+        # половина кусков - в одном накопителе, половина - в другом, затем merge
+        first, second = RegressionAccumulator(kind, order), RegressionAccumulator(kind, order)
+        bounds = np.linspace(0, columns[0].shape[0], parts + 1).astype(int)
+        for index, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:])):
+            (first if index % 2 else second).partial_fit(*(column[start: stop] for column in columns))
+        return first.merge(second)
+
+    def test_matches_regression_methods(self):
+        x, y, z = self._x, self._y, self._z
+        data_rows = np.column_stack([x, y, z])
+        cases = (("linear", (x, z), 5, Regression.linear_regression(x, z)),
+                 ("bi_linear", (x, y, z), 5, Regression.bi_linear_regression(x, y, z)),
+                 ("n_linear", (data_rows,), 5, Regression.n_linear_regression(data_rows)),
+                 ("quadratic_2d", (x, y, z), 5, Regression.quadratic_regression_2d(x, y, z)),
+                 ("surface_2d", (x, y, z), 3, Regression.surface_regression_2d(x, y, z, 3)),
+                 ("poly", (x, z), 4, Regression.poly_regression(x, z, 4)))
+        for kind, columns, order, expected in cases:
+            with self.subTest(kind=kind):
+                accumulator = self._chunked(kind, columns, order)
+                self.assertEqual(accumulator.n_points, x.size)
+                np.testing.assert_allclose(accumulator.solve(), expected, rtol=1e-8, atol=1e-10)
+        self.assertIsInstance(self._chunked("linear", (x, z)).solve(), tuple)
+
+    def test_pickle_round_trip(self):
+        accumulator = RegressionAccumulator("poly", 3).partial_fit(self._x, self._z)
+        restored = pickle.loads(pickle.dumps(accumulator))
+        self.assertEqual((restored.kind, restored.order, restored.n_points), ("poly", 3, self._x.size))
+        np.testing.assert_array_equal(restored.solve(), accumulator.solve())
+
+    def test_empty(self):
+        accumulator = RegressionAccumulator("bi_linear")
+        self.assertEqual(accumulator.n_points, 0)
+        self.assertIsNone(accumulator.gram)
+        with self.assertRaises(ValueError):
+            accumulator.solve()
+        # пустой накопитель при слиянии ничего не меняет
+        accumulator.partial_fit(self._x, self._y, self._z).merge(RegressionAccumulator("bi_linear"))
+        self.assertEqual(accumulator.n_points, self._x.size)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            RegressionAccumulator("cubic")
+        with self.assertRaises(ValueError):
+            RegressionAccumulator("poly", -1)
+        with self.assertRaises(ValueError):
+            RegressionAccumulator("linear").partial_fit(self._x)
+        with self.assertRaises(ValueError):
+            RegressionAccumulator("linear").partial_fit(self._x, self._y[:10])
+        with self.assertRaises(ValueError):
+            RegressionAccumulator("linear").merge(RegressionAccumulator("bi_linear"))
+        with self.assertRaises(ValueError):
+            RegressionAccumulator("poly", 3).merge(RegressionAccumulator("poly", 4))
+        accumulator = RegressionAccumulator("n_linear").partial_fit(np.column_stack([self._x, self._z]))
+        with self.assertRaises(ValueError):
+            accumulator.partial_fit(np.column_stack([self._x, self._y, self._z]))
+
+
+class BatchRegressionTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(4)
+        self._x = rng.uniform(-2.0, 2.0, (20, 50))
+        self._y = rng.uniform(-2.0, 2.0, (20, 50))
+        self._z = (rng.normal(size=(20, 1)) * self._x + rng.normal(size=(20, 1)) * self._y + rng.normal(size=(20, 1))
+                   + 0.1 * rng.normal(size=self._x.shape))
+
+    def test_rows_match_single_regressions(self):
+        k, b = Regression.linear_regression_batch(self._x, self._z)
+        expected = np.array([Regression.linear_regression(x, z) for x, z in zip(self._x, self._z)])
+        np.testing.assert_allclose(np.column_stack([k, b]), expected, rtol=1e-10, atol=1e-12)
+        expected = np.array([Regression.bi_linear_regression(*row) for row in zip(self._x, self._y, self._z)])
+        np.testing.assert_allclose(Regression.bi_linear_regression_batch(self._x, self._y, self._z), expected,
+                                   rtol=1e-9, atol=1e-12)
+
+    def test_offsets_match_single_regressions(self):
+        # наборы разной длины, склеенные в одномерные массивы
+        sizes = np.arange(3, 23)
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        x, y, z = (np.concatenate([row[:size] for row, size in zip(array, sizes)])
+                   for array in (self._x, self._y, self._z))
+        k, b = Regression.linear_regression_batch(x, z, offsets)
+        for index, (start, size) in enumerate(zip(offsets, sizes)):
+            with self.subTest(set=index):
+                part = slice(start, start + size)
+                np.testing.assert_allclose((k[index], b[index]), Regression.linear_regression(x[part], z[part]),
+                                           rtol=1e-9, atol=1e-12)
+        result = Regression.bi_linear_regression_batch(x, y, z, offsets)
+        self.assertEqual(result.shape, (sizes.size, 3))
+        for index, (start, size) in enumerate(zip(offsets, sizes)):
+            part = slice(start, start + size)
+            np.testing.assert_allclose(result[index], Regression.bi_linear_regression(x[part], y[part], z[part]),
+                                       rtol=1e-8, atol=1e-10)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            Regression.linear_regression_batch(self._x.ravel(), self._z.ravel())
+        with self.assertRaises(ValueError):
+            Regression.linear_regression_batch(self._x[:, :1], self._z[:, :1])
+        with self.assertRaises(ValueError):
+            Regression.linear_regression_batch(self._x.ravel(), self._z.ravel(), [5, 10])
+        with self.assertRaises(ValueError):
+            Regression.linear_regression_batch(self._x.ravel(), self._z.ravel(), [])
+        with self.assertRaises(ValueError):
+            Regression.bi_linear_regression_batch(self._x.ravel(), self._y.ravel(), self._z.ravel(), [0, 2])
+
+
+def _baseline_poly_regression(x: np.ndarray, y: np.ndarray, order: int) -> np.ndarray:
+    """
+    poly_regression до перехода на базис Чебышёва: lstsq по матрице степеней x
+    """
+    return np.linalg.lstsq(np.column_stack([x ** i for i in range(order + 1)]), y, rcond=None)[0]
+
+
+class PolyFitTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self._x = rng.uniform(-2.0, 3.0, 20_000)
+        self._y = np.cos(self._x) + 0.05 * rng.normal(size=self._x.size)
+
+    def test_poly_regression_matches_baseline(self):
+        for order in (0, 1, 3, 6):
+            with self.subTest(order=order):
+                np.testing.assert_allclose(Regression.poly_regression(self._x, self._y, order),
+                                           _baseline_poly_regression(self._x, self._y, order), rtol=1e-7, atol=1e-9)
+
+    def test_poly_fit_blocks(self):
+        fit = Regression.poly_fit(self._x, self._y, 8)
+        self.assertEqual(fit.order, 8)
+        for block_rows in (1, 999):
+            with self.subTest(block_rows=block_rows):
+                np.testing.assert_allclose(Regression.poly_fit(self._x, self._y, 8, block_rows).coefficients,
+                                           fit.coefficients, rtol=1e-9, atol=1e-12)
+
+    def test_evaluation_matches_numpy(self):
+        x = np.linspace(-3.0, 3.0, 1001).reshape(7, 143)
+        b = np.array([0.5, -1.0, 0.25, 2.0, -0.125])
+        np.testing.assert_allclose(Regression.polynom(x, b), np.polynomial.polynomial.polyval(x, b), rtol=1e-12)
+        np.testing.assert_allclose(Regression.polynom(x, [3.0]), np.full(x.shape, 3.0))
+        c = np.array([1.0, -0.5, 0.25, 0.125, 2.0])
+        np.testing.assert_allclose(Regression.chebyshev_series(x, c, 0.5, 4.0),
+                                   np.polynomial.chebyshev.chebval((x - 0.5) / 4.0, c), rtol=1e-12, atol=1e-14)
+        self.assertEqual(Regression.chebyshev_series(x[:0, :0], c).shape, (0, 0))
+
+    def test_monomial_matches_fit(self):
+        fit = Regression.poly_fit(self._x, self._y, 5)
+        np.testing.assert_allclose(Regression.polynom(self._x, fit.monomial()), fit(self._x), rtol=1e-10, atol=1e-12)
+
+    def test_exact_polynomial(self):
+        x = np.linspace(-1.0, 4.0, 50)
+        b = np.array([1.0, -2.0, 0.5, 0.25])
+        np.testing.assert_allclose(Regression.poly_regression(x, Regression.polynom(x, b), 3), b,
+                                   rtol=1e-9, atol=1e-10)
+        # точек меньше, чем коэффициентов: решение всё равно проходит через все точки
+        fit = Regression.poly_fit(x[:3], b[:3], 5)
+        np.testing.assert_allclose(fit(x[:3]), b[:3], atol=1e-9)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            Regression.poly_fit(self._x, self._y, -1)
+        with self.assertRaises(ValueError):
+            Regression.poly_fit(self._x, self._y[:-1])
+        with self.assertRaises(ValueError):
+            Regression.poly_fit([], [])
+
+
+def _baseline_quadratic_regression_2d(x: np.ndarray, y: np.ndarray, z: np.ndarray) -> np.ndarray:
+    """
+    quadratic_regression_2d до перехода на блочную матрицу Грама
+    """
+    d = np.column_stack([x ** 2, x * y, y ** 2, x, y, np.ones_like(x)])
+    return np.linalg.solve(d.T @ d, d.T @ z)
+
+
+class SurfaceRegressionTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(6)
+        self._x = rng.uniform(-1.5, 1.5, 30_000)
+        self._y = rng.uniform(-1.0, 2.0, 30_000)
+        self._z = (0.5 * self._x ** 2 - self._x * self._y + 2.0 * self._y ** 2 - self._x + 3.0
+                   + 0.1 * self._x ** 3 + 0.05 * rng.normal(size=self._x.size))
+
+    def test_quadratic_matches_baseline(self):
+        np.testing.assert_allclose(Regression.quadratic_regression_2d(self._x, self._y, self._z),
+                                   _baseline_quadratic_regression_2d(self._x, self._y, self._z),
+                                   rtol=1e-9, atol=1e-12)
+
+    def test_surface_matches_lstsq(self):
+        for degree in (0, 1, 3, 4):
+            with self.subTest(degree=degree):
+                design = np.column_stack([self._x ** i * self._y ** j for i, j in Regression.surface_2d_terms(degree)])
+                expected = np.linalg.lstsq(design, self._z, rcond=None)[0]
+                for block_rows in (None, 1000):
+                    np.testing.assert_allclose(
+                        Regression.surface_regression_2d(self._x, self._y, self._z, degree, block_rows=block_rows),
+                        expected, rtol=1e-8, atol=1e-10)
+
+    def test_float32(self):
+        x, y, z = (array.astype(np.float32) for array in (self._x, self._y, self._z))
+        expected = _baseline_quadratic_regression_2d(*(array.astype(float) for array in (x, y, z)))
+        np.testing.assert_allclose(Regression.surface_regression_2d(x, y, z), expected, rtol=1e-3, atol=1e-3)
+        np.testing.assert_allclose(Regression.surface_regression_2d(x, y, z, dtype=float), expected,
+                                   rtol=1e-9, atol=1e-12)
+
+    def test_terms(self):
+        self.assertEqual(Regression.surface_2d_terms(0), [(0, 0)])
+        self.assertEqual(Regression.surface_2d_terms(2), [(2, 0), (1, 1), (0, 2), (1, 0), (0, 1), (0, 0)])
+        self.assertEqual(len(Regression.surface_2d_terms(5)), 21)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            Regression.surface_regression_2d(self._x, self._y[:-1], self._z)
+        with self.assertRaises(ValueError):
+            Regression.surface_regression_2d(self._x, self._y, self._z, -1)
+
+
+class SelectPolyOrderTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self._x = rng.uniform(-2.0, 2.0, 3_000)
+        self._y = Regression.polynom(self._x, [1.0, -2.0, 0.0, 0.5]) + 0.2 * rng.normal(size=self._x.size)
+
+    def test_matches_explicit_cross_validation(self):
+        orders, folds = range(6), 4
+        selection = Regression.select_poly_order(self._x, self._y, orders, folds, workers=1, seed=11)
+        permutation = Regression.make_rng(11).permutation(self._x.size)
+        for fold in range(folds):
+            test = permutation[fold::folds]
+            train = np.setdiff1d(permutation, test)
+            for order in orders:
+                fit = Regression.poly_fit(self._x[train], self._y[train], order)
+                self.assertAlmostEqual(selection.fold_errors[fold, order],
+                                       np.mean((fit(self._x[test]) - self._y[test]) ** 2), places=9)
+        np.testing.assert_allclose(selection.errors, selection.fold_errors.mean(axis=0))
+        self.assertEqual(len(selection.fold_times), folds)
+
+    def test_picks_true_order(self):
+        selection = Regression.select_poly_order(self._x, self._y, range(9), workers=1)
+        self.assertEqual(selection.order, 3)
+        self.assertEqual(selection.orders, list(range(9)))
+        np.testing.assert_allclose(selection.fit(self._x), Regression.poly_fit(self._x, self._y, 3)(self._x),
+                                   rtol=1e-9, atol=1e-9)
+
+    def test_pool_matches_serial(self):
+        serial = Regression.select_poly_order(self._x, self._y, (5, 1, 3, 3), workers=1)
+        pooled = Regression.select_poly_order(self._x, self._y, (5, 1, 3, 3), workers=2)
+        self.assertEqual(serial.orders, [1, 3, 5])
+        self.assertEqual(serial.order, pooled.order)
+        np.testing.assert_allclose(serial.fold_errors, pooled.fold_errors, rtol=1e-12)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            Regression.select_poly_order(self._x, self._y, [], workers=1)
+        with self.assertRaises(ValueError):
+            Regression.select_poly_order(self._x, self._y, [-1, 2], workers=1)
+        with self.assertRaises(ValueError):
+            Regression.select_poly_order(self._x, self._y[:-1], workers=1)
+        with self.assertRaises(ValueError):
+            Regression.select_poly_order(self._x, self._y, folds=1, workers=1)
+        with self.assertRaises(ValueError):
+            Regression.select_poly_order(self._x[:3], self._y[:3], folds=4, workers=1)
+
+
+def _explicit_ridge(design: np.ndarray, target: np.ndarray, penalty: np.ndarray, lam: float,
+                    weights: np.ndarray) -> np.ndarray:
+    """
+    (A^T * W * A + λ * diag(penalty)) * c = A^T * W * z
+    """
+    weighted = design * weights[:, np.newaxis]
+    return np.linalg.solve(weighted.T @ design + lam * np.diag(penalty), weighted.T @ target)
+
+
+class WeightedRidgeTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(8)
+        self._x = rng.normal(size=(2_000, 3))
+        self._z = self._x @ np.array([2.0, -1.0, 0.5]) + 4.0 + 0.3 * rng.normal(size=self._x.shape[0])
+        self._data_rows = np.column_stack([self._x, self._z])
+        self._design = np.column_stack([self._x, np.ones(self._x.shape[0])])
+        self._weights = rng.uniform(0.0, 3.0, self._x.shape[0])
+
+    def test_weighted_matches_lstsq(self):
+        root = np.sqrt(self._weights)
+        expected = np.linalg.lstsq(self._design * root[:, np.newaxis], self._z * root, rcond=None)[0]
+        np.testing.assert_allclose(Regression.n_linear_regression(self._data_rows, self._weights), expected,
+                                   rtol=1e-9, atol=1e-12)
+
+    def test_integer_and_zero_weights(self):
+        # вес 2 - то же, что повторить строку, вес 0 - то же, что её убрать
+        weights = np.tile([0.0, 1.0, 2.0], self._x.shape[0] // 3 + 1)[:self._x.shape[0]]
+        expected = Regression.n_linear_regression(np.repeat(self._data_rows, weights.astype(int), axis=0))
+        np.testing.assert_allclose(Regression.n_linear_regression(self._data_rows, weights), expected,
+                                   rtol=1e-9, atol=1e-12)
+        x, y = self._x[:, 0], self._z
+        np.testing.assert_allclose(Regression.poly_regression(x, y, 3, weights),
+                                   Regression.poly_regression(np.repeat(x, weights.astype(int)),
+                                                              np.repeat(y, weights.astype(int)), 3),
+                                   rtol=1e-9, atol=1e-12)
+
+    def test_n_linear_ridge_matches_explicit(self):
+        lambdas = np.array([0.0, 0.5, 10.0, 1e4])
+        path = Regression.n_linear_regression_ridge(self._data_rows, lambdas, self._weights)
+        self.assertEqual(path.shape, (lambdas.size, 4))
+        for lam, row in zip(lambdas, path):
+            with self.subTest(lam=lam):
+                np.testing.assert_allclose(row, _explicit_ridge(self._design, self._z, np.array([1.0, 1.0, 1.0, 0.0]),
+                                                                lam, self._weights), rtol=1e-8, atol=1e-10)
+        np.testing.assert_allclose(Regression.n_linear_regression_ridge(self._data_rows, 0.0),
+                                   Regression.n_linear_regression(self._data_rows), rtol=1e-9, atol=1e-12)
+
+    def test_poly_fit_ridge_matches_explicit(self):
+        x, y, order = self._x[:, 0], self._z, 4
+        fits = Regression.poly_fit_ridge(x, y, order, [0.0, 3.0], self._weights)
+        single = Regression.poly_fit_ridge(x, y, order, 3.0, self._weights)
+        np.testing.assert_allclose(single.coefficients, fits[1].coefficients)
+        design = np.polynomial.chebyshev.chebvander((x - single.shift) / single.scale, order)
+        penalty = np.ones(order + 1)
+        penalty[0] = 0.0
+        for lam, fit in zip((0.0, 3.0), fits):
+            with self.subTest(lam=lam):
+                np.testing.assert_allclose(fit.coefficients, _explicit_ridge(design, y, penalty, lam, self._weights),
+                                           rtol=1e-8, atol=1e-10)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            Regression.n_linear_regression(self._data_rows, self._weights[:-1])
+        with self.assertRaises(ValueError):
+            Regression.n_linear_regression(self._data_rows, -self._weights)
+        with self.assertRaises(ValueError):
+            Regression.n_linear_regression_ridge(self._data_rows, -1.0)
+        with self.assertRaises(ValueError):
+            Regression.n_linear_regression_ridge(self._data_rows, 1.0, np.zeros(self._x.shape[0]))
+        with self.assertRaises(ValueError):
+            Regression.poly_fit_ridge(self._x[:, 0], self._z, -1)
+
+
+class HeadlessTest(unittest.TestCase):
+    def test_import_does_not_load_matplotlib(self):
+        code = "import sys, regression_task; print('matplotlib' in sys.modules)"
+        output = subprocess.run([sys.executable, '-c', code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), "False")
+
+    def test_example_is_saved(self):
+        from lab_common import plotting
+        with tempfile.TemporaryDirectory() as figures_dir:
+            set_headless(figures_dir)
+            try:
+                self.assertEqual(plotting._figures_dir, figures_dir)
+                Regression.linear_reg_example()
+                self.assertTrue(os.path.isfile(os.path.join(figures_dir, "linear_reg_example.png")))
+            finally:
+                set_headless(None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,13 @@
 from typing import Tuple, Callable, Union, List
-import matplotlib.pyplot as plt
 import numpy as np
+import argparse
 import random
+import sys
+import os
+
+# общие для лабораторных модули лежат в lab_common в корне репозитория
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lab_common.plotting import set_headless, pyplot as _pyplot, show as _show  # noqa: E402
 
 """
 Пусть есть два события связаны соотношением:
@@ -215,12 +221,14 @@ def loss(groups_probs: np.ndarray, groups: np.ndarray) -> float:
     return (-groups * np.log(groups_probs) - (1.0 - groups) * np.log(1.0 - groups_probs)).mean()
 
 
-def draw_logistic_data(features: np.ndarray, groups: np.ndarray, theta: np.ndarray = None) -> None:
+def draw_logistic_data(features: np.ndarray, groups: np.ndarray, theta: np.ndarray = None,
+                       figure_name: str = "logistic_data") -> None:
+    plt = _pyplot()
     [plt.plot(features[i, 0], features[i, 1], '+b') if groups[i] == 0
      else plt.plot(features[i, 0], features[i, 1], '*r') for i in range(features.shape[0] // 2)]
 
     if theta is None:
-        plt.show()
+        _show(figure_name)
         return
 
     b = theta[0] / np.abs(theta[2])
@@ -242,7 +250,7 @@ def draw_logistic_data(features: np.ndarray, groups: np.ndarray, theta: np.ndarr
     x = [x_0, x_1]
     y = [b + x_0 * k, b + x_1 * k]
     plt.plot(x, y, 'k')
-    plt.show()
+    _show(figure_name)
 
 
 class LogisticRegression:
@@ -340,7 +348,7 @@ def log_reg_test():
     lg = LogisticRegression()
     lg.train(features, group)
     print(lg.thetas)
-    draw_logistic_data(features, group, lg.thetas)
+    draw_logistic_data(features, group, lg.thetas, figure_name="log_reg_test")
 
 
 def non_log_reg_test():
@@ -355,6 +363,7 @@ def non_log_reg_test():
         return thetas[0] + x * thetas[1] + y * thetas[2] + x * y * thetas[3] + x * x * thetas[4] + y * y * thetas[5]
 
     sections = march_squares_2d(_ellipsoid)
+    plt = _pyplot()
 
     for arc in sections:
         p_0, p_1 = arc
@@ -364,9 +373,13 @@ def non_log_reg_test():
     plt.ylabel("y")
     plt.grid(True)
     print(lg.thetas / np.abs(lg.thetas[0]))
-    draw_logistic_data(features, group)
+    draw_logistic_data(features, group, figure_name="non_log_reg_test")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Logistic regression tests")
+    parser.add_argument("--headless", metavar="DIR", default=None,
+                        help="render figures with Agg and save them to DIR instead of showing windows")
+    set_headless(parser.parse_args().headless)
     log_reg_test()
     non_log_reg_test()
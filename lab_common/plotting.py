@@ -0,0 +1,39 @@
+from typing import Union
+import os
+
+# каталог, в который сохраняются рисунки в безголовом режиме; None - рисунки показываются в окне
+_figures_dir: Union[str, None] = None
+
+
+def set_headless(figures_dir: Union[str, None]) -> None:
+    """
+    Безголовый режим: рисунки рисуются через Agg и сохраняются в figures_dir как <имя рисунка>.png.
+    None возвращает показ в окне.
+    """
+    global _figures_dir
+    _figures_dir = figures_dir
+
+
+def pyplot():
+    """
+    matplotlib.pyplot импортируется только при первом рисовании, чтобы численные методы не тянули за собой
+    matplotlib и GUI бэкенд. В безголовом режиме до этого выбирается Agg.
+    """
+    if _figures_dir is not None:
+        import matplotlib
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def show(name: str) -> None:
+    """
+    Показывает текущий рисунок или, в безголовом режиме, сохраняет его в <figures_dir>/<name>.png
+    """
+    plt = pyplot()
+    if _figures_dir is None:
+        plt.show()
+        return
+    os.makedirs(_figures_dir, exist_ok=True)
+    plt.savefig(os.path.join(_figures_dir, f"{name}.png"))
+    plt.close('all')